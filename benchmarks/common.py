@@ -0,0 +1,167 @@
+import json
+import math
+import time
+from pathlib import Path
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.launch_profiles import BrowserLauncher, get_launch_profile
+
+logger = DocumentExplorerLogger()
+
+BASEDIR = Path(__file__).resolve().parent.parent
+
+# Driver paths, same defaults as conftest.py
+gecko_driver_path = BASEDIR.joinpath("drivers/macos/geckodriver")
+chrome_driver_path = BASEDIR.joinpath("drivers/macos/chromedriver")
+
+
+class CommandCounter:
+    """
+    Counts WebDriver commands (HTTP round trips) sent by a driver.
+    """
+
+    def __init__(self, driver):
+        self.count = 0
+        self._execute = driver.execute
+        driver.execute = self._counting_execute
+
+    def _counting_execute(self, driver_command, params=None):
+        self.count += 1
+        return self._execute(driver_command, params)
+
+    def reset(self):
+        self.count = 0
+
+
+def create_headless_driver(browser="firefox", driver_path=None, profile="ci-fast"):
+    """
+    Method to create a headless web driver for benchmarks
+    :param browser: browser name [firefox, chrome]
+    :param driver_path: path of geckodriver/chromedriver, defaults to the conftest.py locations
+    :param profile: name of the headless launch profile to use
+    :return: webdriver object
+    """
+    logger.log_enter("benchmarks: create_headless_driver")
+
+    driver_paths = {"firefox": gecko_driver_path, "chrome": chrome_driver_path}
+    if driver_path:
+        driver_paths[browser] = driver_path
+    driver = BrowserLauncher(get_launch_profile(profile), driver_paths).launch(browser)
+
+    logger.log_exit("benchmarks: create_headless_driver")
+    return driver
+
+
+def write_table_page(directory, table_class, rows, cols=4):
+    """
+    Method to write a local HTML page with a table of rows x cols cells
+    :param directory: directory to write the page into
+    :param table_class: class attribute of the table element
+    :param rows: number of rows
+    :param cols: number of columns
+    :return: (string) file:// URL of the page
+    """
+    lines = ["<html><body><table class='{}'><tbody>".format(table_class)]
+    for row in range(rows):
+        cells = "".join("<td data-col='{}'>row_{}_col_{}</td>".format(col, row, col) for col in range(cols))
+        lines.append("<tr>{}</tr>".format(cells))
+    lines.append("</tbody></table></body></html>")
+
+    page = Path(directory).joinpath("table_{}.html".format(rows))
+    page.write_text("\n".join(lines))
+    return page.as_uri()
+
+
+def time_call(func, *args, **kwargs):
+    """
+    Method to time a call
+    :return: (tuple) result, elapsed secs
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def percentile(values, pct):
+    """
+    Method to compute a percentile with linear interpolation between the closest ranks
+    :param values: list of measurements
+    :param pct: percentile [0, 100]
+    :return: (float) percentile value, None for no values
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low, high = int(math.floor(rank)), int(math.ceil(rank))
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(timings, round_trips):
+    """
+    Method to summarise the measurements of a benchmark
+    :param timings: list of elapsed secs per run
+    :param round_trips: list of WebDriver round trips per run
+    :return: (Dict) runs, p50, p95, p99, mean and round_trips (mean per run)
+    """
+    return {
+        "runs": len(timings),
+        "p50": percentile(timings, 50),
+        "p95": percentile(timings, 95),
+        "p99": percentile(timings, 99),
+        "mean": sum(timings) / len(timings),
+        "round_trips": sum(round_trips) / len(round_trips),
+    }
+
+
+def load_baseline(path):
+    """
+    Method to load saved benchmark baselines
+    :param path: path of the baseline JSON file
+    :return: (Dict) benchmark key -> summary, empty if the file does not exist
+    """
+    try:
+        with open(str(path)) as baseline_file:
+            return json.load(baseline_file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results):
+    """
+    Method to save benchmark results as baselines, existing keys not in results are kept
+    :param path: path of the baseline JSON file
+    :param results: dict of benchmark key -> summary
+    :return:
+    """
+    baseline = load_baseline(path)
+    baseline.update(results)
+    with open(str(path), "w") as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+
+
+def compare_to_baseline(results, baseline, threshold=0.2, min_delta=0.01, metrics=("p50", "p95")):
+    """
+    Method to find the benchmarks which regressed against the baseline
+    :param results: dict of benchmark key -> summary
+    :param baseline: dict of benchmark key -> baseline summary
+    :param threshold: allowed relative slow down, e.g. 0.2 for 20%
+    :param min_delta: slow downs below this many secs are treated as noise
+    :param metrics: latency metrics to compare
+    :return: (List) list of regression messages
+    """
+    regressions = []
+    for key, summary in sorted(results.items()):
+        expected = baseline.get(key)
+        if not expected:
+            continue
+        for metric in metrics:
+            limit = max(expected[metric] * (1 + threshold), expected[metric] + min_delta)
+            if summary[metric] > limit:
+                regressions.append("{} {}: {:.4f}s > {:.4f}s (baseline {:.4f}s)".format(
+                    key, metric, summary[metric], limit, expected[metric]))
+        # polling waits make the round trips vary a little between runs
+        if summary["round_trips"] > expected["round_trips"] * (1 + threshold):
+            regressions.append("{} round_trips: {:.1f} > baseline {:.1f}".format(
+                key, summary["round_trips"], expected["round_trips"]))
+    return regressions
@@ -0,0 +1,131 @@
+"""
+Benchmark of the DriverUtils operations against the local stand-in application.
+
+Each operation runs --runs times per table size. Latency percentiles and WebDriver round trips
+are compared to the baselines in --baseline, the run fails when a regression exceeds --threshold.
+
+Usage:
+    python -m benchmarks.operations_benchmark --browser firefox --sizes 10 100 1000 --runs 20
+    python -m benchmarks.operations_benchmark --save-baseline
+"""
+import argparse
+import sys
+
+from benchmarks.common import (BASEDIR, CommandCounter, create_headless_driver, latency_summary, time_call,
+                               load_baseline, save_baseline, compare_to_baseline)
+from utils.driver_utils import DriverUtils
+from utils.document_explorer import Documents
+from utils.standin_server import StandinServer
+
+DEFAULT_BASELINE = BASEDIR.joinpath("benchmarks/baselines.json")
+
+COLLECTION_NAME = "abhishek"
+OPERATIONS = ["search_collection", "sort_collection", "create_collection", "upload_document", "search_document"]
+
+
+def benchmark_seed(size):
+    """
+    Method to build the stand-in seed for a table size
+    :param size: number of collections, and of documents in the benchmark collection
+    :return: (Dict) collection name -> list of document names
+    """
+    seed = {"collection_{:05d}".format(i): [] for i in range(size - 1)}
+    seed[COLLECTION_NAME] = ["document_{:05d}.pdf".format(i) for i in range(size)]
+    return seed
+
+
+def operation_calls(driver_utils, size):
+    """
+    Method to build the benchmarked calls
+    :param driver_utils: DriverUtils object
+    :param size: table size, used to pick names in the middle of the tables
+    :return: (Dict) operation name -> callable(driver, run)
+    """
+    document = Documents()
+    return {
+        "search_collection": lambda driver, run: driver_utils.search_collection(
+            driver, "collection_{:05d}".format(size // 2)),
+        "sort_collection": lambda driver, run: driver_utils.sort_collection(
+            driver, "ascending" if run % 2 else "descending"),
+        "create_collection": lambda driver, run: driver_utils.create_collection(
+            driver, "benchmark_create_{}".format(run)),
+        "upload_document": lambda driver, run: driver_utils.upload_document(
+            driver, COLLECTION_NAME, str(document.pdf_test_file_path)),
+        "search_document": lambda driver, run: driver_utils.search_document(
+            driver, COLLECTION_NAME, "document_{:05d}.pdf".format(size // 2)),
+    }
+
+
+def run(driver, sizes, runs, operations, warmup=1):
+    """
+    Method to run the benchmark, every table size gets a freshly seeded stand-in server
+    :param driver: webdriver object to use
+    :param sizes: list of table sizes
+    :param runs: number of measured runs per operation and size
+    :param operations: list of operation names
+    :param warmup: number of unmeasured runs before measuring
+    :return: (Dict) benchmark key (operation@size) -> summary
+    """
+    driver_utils = DriverUtils()
+    counter = CommandCounter(driver)
+    results = {}
+
+    for size in sizes:
+        with StandinServer(seed=benchmark_seed(size)) as server:
+            driver_utils.login(driver, server.app_url + "/document-explorer", server.username, server.password)
+            calls = operation_calls(driver_utils, size)
+            for operation in operations:
+                timings = []
+                round_trips = []
+                for i in range(warmup + runs):
+                    counter.reset()
+                    _, elapsed = time_call(calls[operation], driver, i)
+                    if i >= warmup:
+                        timings.append(elapsed)
+                        round_trips.append(counter.count)
+                key = "{}@{}".format(operation, size)
+                results[key] = latency_summary(timings, round_trips)
+                print("{:<28} {:>9.4f} {:>9.4f} {:>9.4f} {:>12.1f}".format(
+                    key, results[key]["p50"], results[key]["p95"], results[key]["p99"],
+                    results[key]["round_trips"]), flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", default="firefox", choices=["firefox", "chrome"])
+    parser.add_argument("--driver-path", default=None)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--operations", nargs="+", default=OPERATIONS, choices=OPERATIONS)
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative slow down against the baseline, e.g. 0.2 for 20%%")
+    parser.add_argument("--min-delta", type=float, default=0.01,
+                        help="slow downs below this many secs are treated as noise")
+    args = parser.parse_args()
+
+    driver = create_headless_driver(args.browser, args.driver_path)
+    try:
+        print("{:<28} {:>9} {:>9} {:>9} {:>12}".format("benchmark", "p50(s)", "p95(s)", "p99(s)", "round_trips"))
+        results = run(driver, args.sizes, args.runs, args.operations)
+    finally:
+        driver.quit()
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print("baseline saved to {}".format(args.baseline))
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print("no baseline in {}, run with --save-baseline to create one".format(args.baseline))
+    regressions = compare_to_baseline(results, baseline, args.threshold, args.min_delta)
+    for regression in regressions:
+        print("REGRESSION {}".format(regression))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
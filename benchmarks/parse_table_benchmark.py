@@ -0,0 +1,65 @@
+"""
+Benchmark of DriverUtils.parse_table bulk extraction against the per element path.
+
+Usage:
+    python -m benchmarks.parse_table_benchmark --browser firefox --rows 5 100 1000
+"""
+import argparse
+import tempfile
+
+from benchmarks.common import CommandCounter, create_headless_driver, write_table_page, time_call
+from utils.driver_utils import DriverUtils
+
+TABLE_CLASS = "benchmarkTable"
+TABLE_CSS = "table.{}".format(TABLE_CLASS)
+
+
+def run(driver, row_counts, repeat):
+    """
+    Method to run the benchmark
+    :param driver: webdriver object to use
+    :param row_counts: list of table sizes
+    :param repeat: number of times to repeat each measurement
+    :return: (List) list of result dicts
+    """
+    driver_utils = DriverUtils()
+    counter = CommandCounter(driver)
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in row_counts:
+            driver.get(write_table_page(directory, TABLE_CLASS, rows))
+            for mode, parse in (("bulk", driver_utils.extract_table),
+                                ("per_element", driver_utils.parse_table_elements)):
+                timings = []
+                for i in range(repeat):
+                    counter.reset()
+                    parsed, elapsed = time_call(parse, driver, TABLE_CSS)
+                    timings.append(elapsed)
+                    assert len(parsed) == rows
+                results.append({"rows": rows, "mode": mode, "best": min(timings),
+                                "mean": sum(timings) / len(timings), "round_trips": counter.count})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", default="firefox", choices=["firefox", "chrome"])
+    parser.add_argument("--driver-path", default=None)
+    parser.add_argument("--rows", type=int, nargs="+", default=[5, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    driver = create_headless_driver(args.browser, args.driver_path)
+    try:
+        results = run(driver, args.rows, args.repeat)
+    finally:
+        driver.quit()
+
+    print("{:>6} {:>12} {:>10} {:>10} {:>12}".format("rows", "mode", "best(s)", "mean(s)", "round_trips"))
+    for result in results:
+        print("{rows:>6} {mode:>12} {best:>10.4f} {mean:>10.4f} {round_trips:>12}".format(**result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Upload throughput benchmark against the local stand-in application.
+
+For every size of --sizes, --files synthetic documents (PDF or TIFF, --pages pages) are streamed into a temporary
+directory and uploaded, one at a time through DriverUtils.upload_document or all at once through
+DriverUtils.upload_documents (--batch). Reports MB/s and per file latency percentiles, compared to the
+baselines in --baseline like the operations benchmark.
+
+Usage:
+    python -m benchmarks.upload_benchmark --browser firefox --sizes 1M 10M 100M --files 5
+    python -m benchmarks.upload_benchmark --type tiff --pages 20 --sizes 50M 300M --batch
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+from benchmarks.common import (BASEDIR, CommandCounter, create_headless_driver, latency_summary, time_call,
+                               load_baseline, save_baseline, compare_to_baseline)
+from utils.driver_utils import DriverUtils
+from utils.standin_server import StandinServer
+from utils.synthetic_documents import generate_documents
+
+DEFAULT_BASELINE = BASEDIR.joinpath("benchmarks/baselines.json")
+
+COLLECTION_NAME = "abhishek"
+SIZE_UNITS = {"K": 1024, "M": 1024 * 1024, "G": 1024 * 1024 * 1024}
+
+# Slowest upload rate (bytes/sec) waited for before an upload counts as timed out
+MIN_UPLOAD_RATE = 1024 * 1024
+
+
+def parse_size(value):
+    """
+    Method to parse a size argument
+    :param value: size in bytes, optionally with a K, M or G suffix, e.g. 300M
+    :return: (int) size in bytes
+    """
+    value = value.strip().upper()
+    if value and value[-1] in SIZE_UNITS:
+        return int(float(value[:-1]) * SIZE_UNITS[value[-1]])
+    return int(value)
+
+
+def upload_timeout(size):
+    """
+    Method to get the time to wait for the upload of a document
+    :param size: document size in bytes
+    :return: (float) timeout (secs)
+    """
+    return 30 + size / MIN_UPLOAD_RATE
+
+
+def upload_one_by_one(driver_utils, driver, paths, size, counter):
+    """
+    Method to upload the documents one upload_document call each
+    :return: (tuple) list of latencies (secs), list of round trips, elapsed (secs)
+    """
+    timings = []
+    round_trips = []
+    start = time.perf_counter()
+    for path in paths:
+        counter.reset()
+        _, elapsed = time_call(driver_utils.upload_document, driver, COLLECTION_NAME, str(path),
+                               timeout=upload_timeout(size))
+        timings.append(elapsed)
+        round_trips.append(counter.count)
+    return timings, round_trips, time.perf_counter() - start
+
+
+def upload_batch(driver_utils, driver, paths, size, counter):
+    """
+    Method to upload the documents in one upload_documents call, latencies are taken from the upload rows
+    :return: (tuple) list of latencies (secs), list of round trips, elapsed (secs)
+    """
+    counter.reset()
+    batch_result = driver_utils.upload_documents(driver, COLLECTION_NAME, [str(path) for path in paths],
+                                                 timeout=upload_timeout(size) * len(paths))
+    failed = len(paths) - batch_result.count(driver_utils.document.document_upload_success_msg)
+    if failed:
+        print("{} of {} uploads failed: {}".format(failed, len(paths), batch_result.results), flush=True)
+    return list(batch_result.latencies.values()), [counter.count / len(paths)], batch_result.elapsed
+
+
+def run(driver, sizes, files, suffix, pages, batch=False, directory=None):
+    """
+    Method to run the benchmark, every size gets a fresh stand-in server and its own temporary documents
+    :param driver: webdriver object to use
+    :param sizes: list of document sizes in bytes
+    :param files: number of documents per size
+    :param suffix: document type [.pdf, .tif]
+    :param pages: number of pages per document
+    :param batch: upload through upload_documents instead of one upload_document per file
+    :param directory: parent directory of the temporary documents, None for the system default
+    :return: (Dict) benchmark key (upload[_batch]_type@size) -> summary with mb_per_second
+    """
+    driver_utils = DriverUtils()
+    # large uploads take longer than an operation budget made for UI interactions
+    driver_utils.operation_budget = None
+    counter = CommandCounter(driver)
+    upload = upload_batch if batch else upload_one_by_one
+    results = {}
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory(dir=directory) as document_dir, \
+                StandinServer(seed={COLLECTION_NAME: []}) as server:
+            paths = generate_documents(document_dir, files, size, pages=pages, suffix=suffix)
+            driver_utils.login(driver, server.app_url + "/document-explorer", server.username, server.password)
+            timings, round_trips, elapsed = upload(driver_utils, driver, paths, size, counter)
+            if not timings:
+                print("no upload of {} bytes finished".format(size), flush=True)
+                continue
+
+            key = "upload{}_{}@{}".format("_batch" if batch else "", suffix.lstrip("."), size)
+            results[key] = latency_summary(timings, round_trips)
+            results[key]["mb_per_second"] = size * files / (1024 * 1024) / elapsed if elapsed else 0.0
+            print("{:<28} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.1f} {:>12.1f}".format(
+                key, results[key]["p50"], results[key]["p95"], results[key]["p99"], results[key]["mb_per_second"],
+                results[key]["round_trips"]), flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", default="firefox", choices=["firefox", "chrome"])
+    parser.add_argument("--driver-path", default=None)
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=[parse_size("1M"), parse_size("10M"),
+                                                                          parse_size("100M")])
+    parser.add_argument("--files", type=int, default=5, help="documents uploaded per size")
+    parser.add_argument("--type", default="pdf", choices=["pdf", "tiff"], help="type of the synthetic documents")
+    parser.add_argument("--pages", type=int, default=10, help="pages per document")
+    parser.add_argument("--batch", action="store_true", help="upload all documents of a size in one selection")
+    parser.add_argument("--tmp-dir", default=None, help="directory of the generated documents")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative slow down against the baseline, e.g. 0.2 for 20%%")
+    parser.add_argument("--min-delta", type=float, default=0.05,
+                        help="slow downs below this many secs are treated as noise")
+    args = parser.parse_args()
+
+    driver = create_headless_driver(args.browser, args.driver_path)
+    try:
+        print("{:<28} {:>9} {:>9} {:>9} {:>9} {:>12}".format("benchmark", "p50(s)", "p95(s)", "p99(s)", "MB/s",
+                                                           "round_trips"))
+        results = run(driver, args.sizes, args.files, "." + args.type.replace("tiff", "tif"), args.pages,
+                      batch=args.batch, directory=args.tmp_dir)
+    finally:
+        driver.quit()
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print("baseline saved to {}".format(args.baseline))
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print("no baseline in {}, run with --save-baseline to create one".format(args.baseline))
+    regressions = compare_to_baseline(results, baseline, args.threshold, args.min_delta)
+    for regression in regressions:
+        print("REGRESSION {}".format(regression))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,20 @@
+import os
 import pytest
 from pathlib import Path
-from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from utils.logs_util import DocumentExplorerLogger
 from utils.driver_utils import DriverUtils
 from utils.document_explorer import DocumentExplorer
+from utils.session_cache import SessionCache
+from utils.browser_pool import BrowserPool
+from utils.launch_profiles import BrowserLauncher, get_launch_profile, find_driver_executable, LAUNCH_PROFILES
+from utils.standin_server import StandinServer
+from utils.api_client import DocumentExplorerApiClient
+from utils.browser_pool import get_xdist_worker, get_xdist_worker_count
+from utils.duration_scheduler import DurationHistory, DurationScheduler, parse_shard
+from utils.deadline import deadline_scope
+from utils.artifacts import FailureArtifacts
+from utils.tracing import tracer
 
 logger = DocumentExplorerLogger()
 driver_utils = DriverUtils()
@@ -21,31 +32,469 @@ gecko_driver_path = BASEDIR.joinpath("drivers/macos/geckodriver")
 # Change this path accordingly pointing to driver path locally
 chrome_driver_path = BASEDIR.joinpath("drivers/macos/chromedriver")
 
+# Launchers used in this session, for reporting cold start times
+browser_launchers = []
+
+# Number of spans shown in the trace summaries
+trace_summary_size = 15
+
+# Duration history and scheduling of this session, set up in pytest_configure
+duration_scheduler = None
+
+# Budget consumption of the tests, from the teardown reports
+test_deadlines = []
+
+# Number of tests listed in the deadline summary
+deadline_summary_size = 5
+
+
+def pytest_addoption(parser):
+    parser.addoption("--no-session-cache", action="store_true", default=False,
+                     help="login on every driver instead of restoring the saved session")
+    parser.addoption("--session-cache-file", default=None,
+                     help="file to save the authenticated session to")
+    parser.addoption("--session-max-age", type=int, default=1800,
+                     help="time (secs) a saved session stays valid")
+    parser.addoption("--browser-pool-size", type=int, default=None,
+                     help="number of idle browser sessions kept per browser and xdist worker")
+    parser.addoption("--browser-max-uses", type=int, default=20,
+                     help="number of test classes after which a browser session is recycled")
+    parser.addoption("--launch-profile", default=None, choices=sorted(LAUNCH_PROFILES),
+                     help="browser launch profile, defaults to DE_LAUNCH_PROFILE environment variable or debug")
+    parser.addoption("--standin", action="store_true", default=False,
+                     help="run against a local stand-in Document Explorer instead of the configured app_url")
+    parser.addoption("--standin-latency", type=float, default=0.0,
+                     help="delay (secs) injected by the stand-in server in every API request")
+    parser.addoption("--api-setup", action="store_true", default=False,
+                     help="create test data through the HTTP API, always on with --standin")
+    parser.addoption("--no-browser-tabs", action="store_true", default=False,
+                     help="reuse the browser window between test classes instead of a new tab per class")
+    parser.addoption("--browser-prewarm", default="",
+                     help="comma separated browsers to launch in parallel at session start, e.g. firefox,chrome")
+    parser.addoption("--trace-file", default=None,
+                     help="write a Chrome trace (chrome://tracing, Perfetto) of the traced spans to this file")
+    parser.addoption("--duration-history", default=None,
+                     help="file the per test durations are recorded in, defaults to .test_durations.json")
+    parser.addoption("--schedule-durations", action="store_true", default=False,
+                     help="run the test classes longest first by their recorded durations, "
+                          "use with -n N --dist loadscope")
+    parser.addoption("--shard", default=None, type=parse_shard,
+                     help="run one of N shards balanced by the recorded durations, e.g. 2/4")
+    parser.addoption("--test-budget", type=float, default=600,
+                     help="time (secs) a test may take before its waits abort with DeadlineExceeded, 0 for no limit")
+    parser.addoption("--operation-budget", type=float, default=DriverUtils.operation_budget,
+                     help="time (secs) a DriverUtils operation may take, 0 for no limit")
+    parser.addoption("--artifacts-dir", default=None,
+                     help="directory of the failure artifacts, defaults to DE_ARTIFACTS_DIR or artifacts/")
+    parser.addoption("--no-failure-artifacts", action="store_true", default=False,
+                     help="do not capture screenshot, DOM, console, network log and spans of failed steps")
+
+
+def pytest_configure(config):
+    """
+    Hook to load the duration history, set up the test scheduling, the operation budget and failure artifacts
+    :param config:
+    :return:
+    """
+    global duration_scheduler
+    if get_xdist_worker() == "master":
+        workers = getattr(config.option, "numprocesses", None)
+        workers = workers if isinstance(workers, int) and workers > 0 else 1
+    else:
+        workers = get_xdist_worker_count()
+    duration_scheduler = DurationScheduler(DurationHistory(config.getoption("--duration-history")),
+                                           workers=workers, shard=config.getoption("--shard"))
+    DriverUtils.operation_budget = config.getoption("--operation-budget")
+    DriverUtils.artifacts = FailureArtifacts(config.getoption("--artifacts-dir"),
+                                             enabled=not config.getoption("--no-failure-artifacts"))
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Hook to order the tests longest class first, and to deselect the tests of the other shards
+    :param config:
+    :param items:
+    :return:
+    """
+    if config.getoption("--schedule-durations") or config.getoption("--shard"):
+        deselected = duration_scheduler.order(items)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+
+
+def pytest_runtest_logreport(report):
+    """
+    Hook to record the test durations and budget consumption, on the pytest-xdist controller for the
+    reports of all workers
+    :param report:
+    :return:
+    """
+    if get_xdist_worker() == "master" and not report.skipped:
+        node = getattr(report, "node", None)
+        duration_scheduler.record_report(report, worker=node.gateway.id if node is not None else "master")
+    if get_xdist_worker() == "master" and report.when == "teardown":
+        deadline = dict(report.user_properties).get("deadline")
+        if deadline:
+            test_deadlines.append(deadline)
+
+
+def pytest_unconfigure(config):
+    """
+    Hook to save the durations of this run to the history
+    :param config:
+    :return:
+    """
+    if duration_scheduler is not None and get_xdist_worker() == "master":
+        duration_scheduler.update_history()
+
+
+@pytest.fixture(autouse=True)
+def test_deadline(request):
+    """
+    Fixture opening the deadline of a test, the DriverUtils waits of the test shrink to its remaining budget.
+    The consumed budget is added to the user properties of the test report.
+    :param request:
+    :return: Deadline object, None if disabled
+    """
+    with deadline_scope(request.config.getoption("--test-budget"), request.node.nodeid) as deadline:
+        yield deadline
+    if deadline is not None:
+        request.node.user_properties.append(("deadline", deadline.summary()))
+
+
+@pytest.fixture(scope="session")
+def browser_launcher(request):
+    """
+    Fixture for launching web drivers with the selected launch profile
+    :param request:
+    :return: BrowserLauncher object
+    """
+    launcher = BrowserLauncher(get_launch_profile(request.config.getoption("--launch-profile")),
+                               {"firefox": gecko_driver_path, "chrome": chrome_driver_path})
+    browser_launchers.append(launcher)
+    return launcher
+
+
+@pytest.fixture(scope="session")
+def browser_pool(request, browser_launcher):
+    """
+    Fixture for the pool of browser sessions of this (xdist worker) process
+    :param request:
+    :return: BrowserPool object
+    """
+    pool = BrowserPool(browser_launcher.launch,
+                       size=request.config.getoption("--browser-pool-size"),
+                       max_uses=request.config.getoption("--browser-max-uses"),
+                       tabs=not request.config.getoption("--no-browser-tabs"))
+    for browser in filter(None, request.config.getoption("--browser-prewarm").split(",")):
+        pool.prewarm(browser)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="session")
+def standin_server(request):
+    """
+    Fixture for the local stand-in Document Explorer, points the tests at it when --standin is given
+    :param request:
+    :return: StandinServer object, None if not enabled
+    """
+    if not request.config.getoption("--standin"):
+        yield None
+        return
+
+    server = StandinServer(latency=request.config.getoption("--standin-latency")).start()
+    document_explorer.app_url = server.app_url
+    document_explorer.document_explorer_url = server.app_url + "/document-explorer"
+    document_explorer.test_user_name = server.username
+    document_explorer.test_user_password = server.password
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def session_cache(request):
+    """
+    Fixture for the authenticated session cache shared by all drivers
+    :param request:
+    :return: SessionCache object, None if disabled
+    """
+    if request.config.getoption("--no-session-cache"):
+        return None
+    return SessionCache(cache_file=request.config.getoption("--session-cache-file"),
+                        max_age=request.config.getoption("--session-max-age"))
+
+
 # Fixture for Web Drivers
 @pytest.fixture(params=["firefox"], scope="class")
-def driver_init(request):
+def driver_init(request, standin_server, session_cache, browser_pool):
     """
     Fixture for initiating web driver used by selenium based on params list
     :param request:
     :return:
     """
     logger.log_enter("driver_init")
-    driver = None
 
-    if request.param == "firefox":
-        driver = webdriver.Firefox(executable_path=gecko_driver_path)
-    elif request.param == "chrome":
-        driver = webdriver.Chrome(executable_path=chrome_driver_path)
+    # check out a browser session from the pool
+    driver = tracer.trace_driver(browser_pool.checkout(request.param))
+    failed_before = request.session.testsfailed
 
     # login into the document explorer application
-    driver_utils.login(
-        driver,
-        document_explorer.document_explorer_url,
-        document_explorer.test_user_name,
-        document_explorer.test_user_password)
+    try:
+        if session_cache:
+            driver_utils.login_with_session(
+                driver,
+                document_explorer.document_explorer_url,
+                document_explorer.test_user_name,
+                document_explorer.test_user_password,
+                session_cache)
+        else:
+            driver_utils.login(
+                driver,
+                document_explorer.document_explorer_url,
+                document_explorer.test_user_name,
+                document_explorer.test_user_password)
+    except Exception:
+        # the teardown does not run when the setup fails, recycle the session instead of leaking it
+        driver_utils.locators.invalidate(driver)
+        browser_pool.checkin(driver, failed=True)
+        logger.log_exit("driver_init")
+        raise
 
+    driver_utils.artifacts.install(driver)
     request.cls.driver = driver
     yield
-    # close connection
-    driver.close()
+    # return browser session to the pool, recycle it if a test of the class failed
+    driver_utils.locators.invalidate(driver)
+    browser_pool.checkin(driver, failed=request.session.testsfailed > failed_before)
     logger.log_exit("driver_init")
+
+
+@pytest.fixture(scope="class")
+def standin_browser(request):
+    """
+    Fixture for a headless firefox logged into a stand-in server of its own, seeded with the standin_seed
+    attribute of the test class. Skipped when geckodriver or firefox is not available.
+    :param request:
+    :return:
+    """
+    driver_path = find_driver_executable("firefox", gecko_driver_path)
+    if driver_path is None:
+        pytest.skip("geckodriver not found")
+
+    server = StandinServer(seed=getattr(request.cls, "standin_seed", None)).start()
+    try:
+        driver = BrowserLauncher(get_launch_profile("ci-fast"), {"firefox": driver_path}).launch("firefox")
+    except WebDriverException as e:
+        server.stop()
+        pytest.skip("firefox could not be started: {}".format(e))
+
+    driver_utils.login(driver, server.app_url + "/document-explorer", server.username, server.password)
+    request.cls.server = server
+    request.cls.driver = driver
+    yield
+    driver_utils.locators.invalidate(driver)
+    driver.quit()
+    server.stop()
+
+
+@pytest.fixture(scope="class")
+def api_client(request, driver_init):
+    """
+    Fixture for the HTTP API client, authenticated with the cookies of the class web driver
+    :param request:
+    :return: DocumentExplorerApiClient object, None if API setup is not enabled
+    """
+    if not (request.config.getoption("--api-setup") or request.config.getoption("--standin")):
+        yield None
+        return
+
+    client = DocumentExplorerApiClient.from_driver(request.cls.driver, document_explorer.app_url)
+    yield client
+    client.close()
+
+
+def pytest_terminal_summary(terminalreporter):
+    """
+    Hook to report the time spent in condition based waits, traced spans, application requests,
+    locator cache statistics, application state resets, test scheduling, test budgets, failure artifacts and
+    browser cold start times
+    :param terminalreporter:
+    :return:
+    """
+    summary = DriverUtils.waits.wait_summary()
+    if summary:
+        terminalreporter.section("DriverUtils waits")
+        for name, entry in sorted(summary.items()):
+            terminalreporter.write_line("{}: count={} total={:.3f}s max={:.3f}s timeouts={}".format(
+                name, entry["count"], entry["total"], entry["max"], entry["timeouts"]))
+
+    summary = tracer.summary()
+    if summary:
+        terminalreporter.section("Traced spans (top {} by self time)".format(trace_summary_size))
+        for name, entry in top_spans(summary):
+            terminalreporter.write_line("{}: count={} total={:.3f}s self={:.3f}s max={:.3f}s".format(
+                name, entry["count"], entry["total"], entry["self"], entry["max"]))
+
+    summary = DriverUtils.network.request_summary()
+    if summary:
+        terminalreporter.section("Application requests")
+        for name, entry in sorted(summary.items()):
+            terminalreporter.write_line("{}: count={} mean={:.3f}s max={:.3f}s errors={}".format(
+                name, entry["count"], entry["total"] / entry["count"], entry["max"], entry["errors"]))
+
+    summary = DriverUtils.locators.summary()
+    if summary["lookups"]:
+        terminalreporter.section("Locator cache")
+        terminalreporter.write_line(
+            "lookups={} hits={} hit_rate={:.1%} healed={} saved_webdriver_calls={}".format(
+                summary["lookups"], summary["hits"], summary["hit_rate"], summary["healed"], summary["saved_calls"]))
+
+    stats = DriverUtils.reset_stats
+    if stats["reset"] or stats["refresh"]:
+        terminalreporter.section("Application state reset")
+        terminalreporter.write_line("in-app resets={} refresh fallbacks={} failed checks={}".format(
+            stats["reset"], stats["refresh"], stats["failed_checks"]))
+
+    summary = duration_scheduler.summary()
+    if summary["actual"]:
+        terminalreporter.section("Test scheduling")
+        terminalreporter.write_line(
+            "workers={} predicted makespan={:.3f}s actual makespan={:.3f}s wall={:.3f}s tests without history={}"
+            .format(summary["workers"], summary["predicted"], summary["actual"], summary["wall"],
+                    summary["unknown"]))
+
+    if test_deadlines:
+        terminalreporter.section("Test deadlines")
+        exceeded = [deadline for deadline in test_deadlines if deadline["exceeded"]]
+        terminalreporter.write_line("tests={} exceeded={} max consumed={:.1%}".format(
+            len(test_deadlines), len(exceeded), max(deadline["consumed"] for deadline in test_deadlines)))
+        for deadline in sorted(test_deadlines, key=lambda deadline: -deadline["consumed"])[:deadline_summary_size]:
+            terminalreporter.write_line("{}: consumed={:.1%} elapsed={:.3f}s budget={:.0f}s{}".format(
+                deadline["name"], deadline["consumed"], deadline["elapsed"], deadline["budget"],
+                " EXCEEDED" if deadline["exceeded"] else ""))
+
+    DriverUtils.artifacts.writer.flush()
+    summary = DriverUtils.artifacts.summary()
+    if summary["captures"]:
+        terminalreporter.section("Failure artifacts")
+        terminalreporter.write_line(
+            "captures={} capture cost mean={:.3f}s max={:.3f}s written={} deduplicated={} failed={} "
+            "raw={:.1f}KB stored={:.1f}KB in {}".format(
+                summary["captures"], summary["mean"], summary["max"], summary["written"], summary["deduplicated"],
+                summary["failed"], summary["raw_bytes"] / 1024.0, summary["stored_bytes"] / 1024.0,
+                DriverUtils.artifacts.writer.directory))
+
+    for launcher in browser_launchers:
+        summary = launcher.cold_start_summary()
+        if summary:
+            terminalreporter.section("Browser cold start ({} profile)".format(launcher.profile.name))
+            for browser, entry in sorted(summary.items()):
+                terminalreporter.write_line("{}: count={} min={:.3f}s mean={:.3f}s max={:.3f}s".format(
+                    browser, entry["count"], entry["min"], entry["mean"], entry["max"]))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Hook to capture the failure artifacts of a failed test and attach the artifacts of its failed steps
+    to the pytest-html report
+    :param item:
+    :param call:
+    :return:
+    """
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == "teardown" or not report.failed:
+        return
+    driver = getattr(item.cls, "driver", None) if item.cls is not None else None
+    DriverUtils.artifacts.capture(driver, "test_" + report.when, call.excinfo.value if call.excinfo else None)
+
+    try:
+        import pytest_html
+    except ImportError:
+        return
+    html_path = item.config.getoption("htmlpath", None)
+    report_dir = os.path.dirname(os.path.abspath(html_path)) if html_path else os.getcwd()
+    # pytest-html 4+ reads report.extras, older versions report.extra
+    attribute = "extras" if int(pytest_html.__version__.split(".")[0]) >= 4 else "extra"
+    extras = getattr(report, attribute, [])
+    for artifacts in DriverUtils.artifacts.artifacts_for(item.nodeid):
+        for name, path in sorted(artifacts.items()):
+            link = os.path.relpath(str(path), report_dir)
+            if name == "screenshot":
+                extras.append(pytest_html.extras.image(link))
+            else:
+                extras.append(pytest_html.extras.url(link, name="{} {}".format(path.name.split("_", 1)[0], name)))
+    setattr(report, attribute, extras)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """
+    Hook to attribute the spans traced during setup, call and teardown to the test
+    :param item:
+    :param nextitem:
+    :return:
+    """
+    tracer.begin_test(item.nodeid)
+    yield
+    tracer.end_test()
+
+
+def pytest_sessionfinish(session):
+    """
+    Hook to finish writing the failure artifacts and write the Chrome trace of this (xdist worker) process
+    :param session:
+    :return:
+    """
+    DriverUtils.artifacts.writer.close()
+    trace_file = session.config.getoption("--trace-file")
+    if trace_file and tracer.spans:
+        worker = get_xdist_worker()
+        if worker != "master":
+            trace_file = Path(trace_file)
+            trace_file = trace_file.with_name("{}.{}{}".format(trace_file.stem, worker, trace_file.suffix))
+        tracer.write_chrome_trace(trace_file, process_name="pytest {}".format(worker))
+
+
+def top_spans(summary):
+    return sorted(summary.items(), key=lambda item: item[1]["self"], reverse=True)[:trace_summary_size]
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix):
+    """
+    Hook to add the span summaries to the pytest-html report
+    :return:
+    """
+    rows = [("Span", "Count", "Total (s)", "Self (s)", "Max (s)")]
+    for name, entry in top_spans(tracer.summary()):
+        rows.append((name, entry["count"], "{:.3f}".format(entry["total"]), "{:.3f}".format(entry["self"]),
+                     "{:.3f}".format(entry["max"])))
+    test_rows = [("Test", "Traced (s)", "Slowest spans (self time)")]
+    for test_name, entry in sorted(tracer.test_summary().items(), key=lambda item: -item[1]["traced"]):
+        slowest = ", ".join("{} {:.3f}s".format(name, span["self"]) for name, span in top_spans(entry["spans"])[:3])
+        test_rows.append((test_name, "{:.3f}".format(entry["traced"]), slowest))
+    if len(rows) == 1:
+        return
+
+    try:
+        from py.xml import html
+
+        def table(table_rows):
+            return html.table([html.tr([html.th(cell) for cell in table_rows[0]])] +
+                              [html.tr([html.td(cell) for cell in row]) for row in table_rows[1:]])
+
+        prefix.extend([html.h2("Traced spans"), table(rows), html.h2("Traced time per test"), table(test_rows)])
+    except ImportError:
+        # pytest-html 4+ takes raw HTML strings
+        from html import escape
+
+        def table(table_rows):
+            return "<table><tr>{}</tr>{}</table>".format(
+                "".join("<th>{}</th>".format(escape(str(cell))) for cell in table_rows[0]),
+                "".join("<tr>{}</tr>".format("".join("<td>{}</td>".format(escape(str(cell))) for cell in row))
+                        for row in table_rows[1:]))
+
+        prefix.extend(["<h2>Traced spans</h2>", table(rows), "<h2>Traced time per test</h2>", table(test_rows)])
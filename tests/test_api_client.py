@@ -0,0 +1,95 @@
+import pytest
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.document_explorer import Documents
+from utils.standin_server import StandinServer
+from utils.api_client import DocumentExplorerApiClient
+
+
+@pytest.fixture(scope="class")
+def standin_api_client(request):
+    """
+    Fixture for an API client logged in to a stand-in server
+    :param request:
+    :return:
+    """
+    server = StandinServer(seed={"abhishek": []}).start()
+    client = DocumentExplorerApiClient(server.app_url)
+    assert client.login_form(server.app_url + "/auth/login", server.username, server.password)
+    request.cls.server = server
+    request.cls.api_client = client
+    yield
+    client.close()
+    server.stop()
+
+
+@pytest.mark.usefixtures("standin_api_client")
+class TestApiClient:
+    logger = DocumentExplorerLogger()
+    document = Documents()
+
+    def test_collection_lifecycle(self):
+        """
+        Test to validate collection create, list and delete through the API
+        :return:
+        """
+        self.logger.log_enter("test_collection_lifecycle")
+
+        assert self.api_client.create_collection("api_collection")
+        assert not self.api_client.create_collection("api_collection")
+        assert self.api_client.ensure_collection("api_collection")
+        assert "api_collection" in self.api_client.get_collection_names()
+        assert self.api_client.delete_collection("api_collection")
+        assert "api_collection" not in self.api_client.get_collection_names()
+
+        self.logger.log_exit("test_collection_lifecycle")
+
+    @pytest.mark.parametrize("document_path, expected_status", [
+        (document.pdf_test_file_path, document.document_upload_success_msg),
+        (document.tar_test_file_path, document.document_upload_failure_msg)
+    ])
+    def test_document_upload(self, document_path, expected_status):
+        """
+        Test to validate document upload through the API
+        :param document_path: local path of the document
+        :param expected_status: expected upload status message
+        :return:
+        """
+        self.logger.log_enter("test_document_upload")
+
+        assert self.api_client.upload_document("abhishek", document_path) == expected_status
+        uploaded = document_path.name in self.api_client.get_document_names("abhishek")
+        assert uploaded == (expected_status == self.document.document_upload_success_msg)
+
+        self.logger.log_exit("test_document_upload")
+
+    def test_connection_reuse(self):
+        """
+        Test to validate requests are sent over a single kept alive connection
+        :return:
+        """
+        self.logger.log_enter("test_connection_reuse")
+
+        pool = self.api_client.pool.connection_from_url(self.server.app_url)
+        connections = pool.num_connections
+        for i in range(20):
+            self.api_client.list_collections()
+        assert pool.num_connections == connections
+
+        self.logger.log_exit("test_connection_reuse")
+
+    def test_non_json_response(self):
+        """
+        Test to validate a response which is not JSON, e.g. the login page or redirect of an expired session, is
+        returned with its status and no body instead of failing to decode
+        :return:
+        """
+        self.logger.log_enter("test_non_json_response")
+
+        assert self.api_client.request_json("GET", "/auth/login") == (200, None)
+        client = DocumentExplorerApiClient(self.server.app_url)
+        assert client.request_json("GET", "/document-explorer") == (302, None)
+        assert client.request_json("GET", self.api_client.collections_path) == (401, {"error": "not authenticated"})
+        client.close()
+
+        self.logger.log_exit("test_non_json_response")
@@ -0,0 +1,90 @@
+import base64
+import gzip
+import json
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.artifacts import FailureArtifacts, CAPTURE_SCRIPT, CONSOLE_INSTALL_SCRIPT
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 16
+
+
+class FakeArtifactDriver:
+    """
+    Driver double answering the capture script with a fixed page, optionally failing the screenshot.
+    """
+
+    def __init__(self, screenshot=True):
+        self.screenshot = screenshot
+        self.commands = 0
+
+    def execute_script(self, script, *args):
+        self.commands += 1
+        if script == CONSOLE_INSTALL_SCRIPT:
+            return 0
+        assert script == CAPTURE_SCRIPT
+        return {"url": "http://127.0.0.1/document-explorer", "title": "Document Explorer",
+                "dom": "<html><body><table></table></body></html>",
+                "console": [{"time": 1, "level": "error", "message": "upload failed"}],
+                "network": [{"id": 0, "method": "POST", "url": "/api/collections", "status": 500}]}
+
+    def get_screenshot_as_base64(self):
+        self.commands += 1
+        if not self.screenshot:
+            raise WebDriverException("browser gone")
+        return base64.b64encode(PNG_BYTES).decode("ascii")
+
+
+class TestArtifacts:
+    logger = DocumentExplorerLogger()
+
+    def test_capture_is_written_deduplicated(self, tmp_path):
+        """
+        Test to validate captured artifacts are written compressed, and identical content is stored once
+        :param tmp_path:
+        :return:
+        """
+        self.logger.log_enter("test_capture_is_written_deduplicated")
+
+        artifacts = FailureArtifacts(tmp_path)
+        driver = FakeArtifactDriver()
+        first = artifacts.capture(driver, "create_collection", TimeoutError("no dialog"))
+        second = artifacts.capture(driver, "create_collection", TimeoutError("no dialog"))
+        assert driver.commands == 4
+        artifacts.writer.close()
+
+        assert first["screenshot"].read_bytes() == PNG_BYTES
+        assert first["screenshot"].name.startswith("01_create_collection_")
+        assert gzip.decompress(first["dom"].read_bytes()) == b"<html><body><table></table></body></html>"
+        assert json.loads(gzip.decompress(first["network"].read_bytes()))[0]["status"] == 500
+        assert json.loads(gzip.decompress(second["info"].read_bytes()))["error"] == "TimeoutError('no dialog')"
+        assert second["console"].read_bytes() == first["console"].read_bytes()
+
+        stats = artifacts.summary()
+        assert stats["captures"] == 2
+        # screenshot, dom, console, network, info and the spans of the test if tracing is on
+        assert stats["written"] == stats["deduplicated"] == len(first) >= 5
+        assert len(list(tmp_path.joinpath("objects").iterdir())) == len(first)
+
+        self.logger.log_exit("test_capture_is_written_deduplicated")
+
+    def test_capture_limits(self, tmp_path):
+        """
+        Test to validate a failing screenshot does not stop the capture, and captures per test are capped
+        :param tmp_path:
+        :return:
+        """
+        self.logger.log_enter("test_capture_limits")
+
+        artifacts = FailureArtifacts(tmp_path, max_captures_per_test=2)
+        driver = FakeArtifactDriver(screenshot=False)
+        captured = [artifacts.capture(driver, "sort_collection_{}".format(i)) for i in range(4)]
+        artifacts.writer.close()
+
+        assert "screenshot" not in captured[0] and "dom" in captured[0]
+        assert captured[2] == {} and captured[3] == {}
+        assert len(artifacts.capture_timings) == 2
+        assert FailureArtifacts(tmp_path, enabled=False).capture(driver, "search_collection") == {}
+
+        self.logger.log_exit("test_capture_limits")
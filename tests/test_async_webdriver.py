@@ -0,0 +1,297 @@
+import asyncio
+import json
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+
+from utils import async_webdriver, network_monitor
+from utils.logs_util import DocumentExplorerLogger
+from utils.async_webdriver import AsyncHttpConnectionPool, AsyncWebDriver, AsyncDriverUtils, W3C_ELEMENT_KEY, \
+    run_sessions
+from utils.document_explorer import Collections, Documents
+from utils.driver_utils import TABLE_EXTRACT_SCRIPT, NEXT_PAGE_SCRIPT
+from utils.launch_profiles import find_driver_executable
+from utils.standin_server import StandinServer
+from utils.synthetic_documents import write_pdf
+
+
+class FakeWebDriverServer:
+    """
+    Minimal W3C WebDriver server double: creates sessions, finds #found only and answers keep-alive requests
+    after a short delay, counting the accepted connections.
+    """
+
+    def __init__(self, max_sessions=None):
+        """
+        :param max_sessions: number of sessions created before new sessions fail, None for no limit
+        """
+        self.connections = 0
+        self.sessions = set()
+        self.created = 0
+        self.max_sessions = max_sessions
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return "http://127.0.0.1:{}".format(self.server.sockets[0].getsockname()[1])
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def answer(self, method, path, payload):
+        parts = path.strip("/").split("/")
+        if method == "POST" and parts == ["session"]:
+            if self.max_sessions is not None and self.created >= self.max_sessions:
+                return 500, {"error": "session not created", "message": "no more sessions"}
+            session_id = "session-{}".format(self.created)
+            self.created += 1
+            self.sessions.add(session_id)
+            return 200, {"sessionId": session_id, "capabilities": {"browserName": "fake"}}
+        if parts[1] not in self.sessions:
+            return 404, {"error": "invalid session id", "message": parts[1]}
+        if method == "DELETE" and len(parts) == 2:
+            self.sessions.remove(parts[1])
+            return 200, None
+        if parts[2:] == ["element"]:
+            if payload["value"] != "#found":
+                return 404, {"error": "no such element", "message": payload["value"]}
+            return 200, {W3C_ELEMENT_KEY: "element-1"}
+        if parts[2:] == ["execute", "sync"]:
+            return 200, payload["args"]
+        return 200, None
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ")
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line == b"\r\n":
+                        break
+                    name, _, value = line.decode().partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                body = await reader.readexactly(length)
+                await asyncio.sleep(0.01)
+                status, value = self.answer(method, path, json.loads(body) if body else None)
+                data = json.dumps({"value": value}).encode()
+                writer.write(b"HTTP/1.1 %d X\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                             % (status, len(data)) + data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+class FakeDriverProcess:
+    """
+    Stand-in for the driver service subprocess started by run_sessions.
+    """
+
+    def __init__(self):
+        self.terminated = False
+
+    def terminate(self):
+        self.terminated = True
+
+    async def wait(self):
+        return 0
+
+
+class FakeAsyncPagerDriver:
+    """
+    AsyncWebDriver double rendering a paginated table, one page at a time, with next and previous pager buttons.
+    """
+    next_css = ".pager > .next"
+    previous_css = ".pager > .previous"
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page = 0
+        self.clicks = []
+
+    async def execute_script(self, script, *args):
+        if script == network_monitor.INSTALL_SCRIPT:
+            return 0
+        if script == TABLE_EXTRACT_SCRIPT:
+            return [["\t".join(row), [row[i] for i in args[1]]] for row in self.pages[self.page]]
+        assert script == NEXT_PAGE_SCRIPT
+        step = 1 if args[0] == self.next_css else -1
+        if not 0 <= self.page + step < len(self.pages):
+            return False
+        self.page += step
+        self.clicks.append(step)
+        return True
+
+
+class FakeAsyncWaits:
+    async def wait_for_network_idle(self, driver, since=-1, quiet_ms=100, timeout=None):
+        return True
+
+    async def wait_for_page_ready(self, driver, spinner_css, timeout=None):
+        pass
+
+
+class TestAsyncWebDriver:
+    logger = DocumentExplorerLogger()
+
+    def test_connections_are_reused(self):
+        """
+        Test to validate concurrent sessions share at most maxsize kept alive connections
+        :return:
+        """
+        self.logger.log_enter("test_connections_are_reused")
+
+        async def scenario():
+            server = FakeWebDriverServer()
+            http = AsyncHttpConnectionPool(await server.start(), maxsize=4)
+            drivers = await asyncio.gather(*[AsyncWebDriver.start(http) for _ in range(8)])
+            for _ in range(5):
+                await asyncio.gather(*[driver.execute_script("return 1") for driver in drivers])
+            await asyncio.gather(*[driver.quit() for driver in drivers])
+            await http.close()
+            await server.stop()
+            return server, http
+
+        server, http = asyncio.run(scenario())
+        assert http.stats["requests"] == 8 + 8 * 5 + 8
+        assert server.connections == http.stats["connections"] <= 4
+        assert http.stats["reused"] == http.stats["requests"] - http.stats["connections"]
+        assert not server.sessions
+
+        self.logger.log_exit("test_connections_are_reused")
+
+    def test_elements_and_errors(self):
+        """
+        Test to validate element references are wrapped in script arguments and W3C errors are raised
+        as the Selenium exceptions
+        :return:
+        """
+        self.logger.log_enter("test_elements_and_errors")
+
+        async def scenario():
+            server = FakeWebDriverServer()
+            http = AsyncHttpConnectionPool(await server.start())
+            driver = await AsyncWebDriver.start(http)
+            try:
+                element = await driver.find_element("#found")
+                echoed = await driver.execute_script("return arguments", element, [element], 1)
+                with pytest.raises(NoSuchElementException):
+                    await driver.find_element("#missing")
+            finally:
+                await driver.quit()
+                await http.close()
+                await server.stop()
+            return element, echoed
+
+        element, echoed = asyncio.run(scenario())
+        assert element.id == "element-1"
+        assert echoed[0].id == echoed[1][0].id == "element-1"
+        assert echoed[2] == 1
+
+        self.logger.log_exit("test_elements_and_errors")
+
+    def test_run_sessions_quits_started_sessions(self, monkeypatch):
+        """
+        Test to validate the sessions which started are quit and the driver services stopped when another
+        session fails to start, and the failure is raised
+        :param monkeypatch:
+        :return:
+        """
+        self.logger.log_enter("test_run_sessions_quits_started_sessions")
+
+        processes = []
+
+        async def scenario():
+            server = FakeWebDriverServer(max_sessions=2)
+            url = await server.start()
+
+            async def start_driver_service(executable_path):
+                processes.append(FakeDriverProcess())
+                return url, processes[-1]
+
+            monkeypatch.setattr(async_webdriver, "start_driver_service", start_driver_service)
+            try:
+                with pytest.raises(WebDriverException):
+                    await run_sessions(lambda driver, index: driver.execute_script("return 1"), 3, "fakedriver")
+            finally:
+                await server.stop()
+            return server
+
+        server = asyncio.run(scenario())
+        assert server.created == 2 and not server.sessions
+        assert len(processes) == 1 and processes[0].terminated
+
+        self.logger.log_exit("test_run_sessions_quits_started_sessions")
+
+
+class TestAsyncDriverUtils:
+    logger = DocumentExplorerLogger()
+    collections = Collections()
+    document = Documents()
+    driver_utils = AsyncDriverUtils()
+
+    def test_table_names_rewind_pager(self):
+        """
+        Test to validate the names of all pages are collected and the pager is turned back to the first page, like
+        DriverUtils.get_table_names
+        :return:
+        """
+        self.logger.log_enter("test_table_names_rewind_pager")
+
+        driver_utils = AsyncDriverUtils()
+        driver_utils.waits = FakeAsyncWaits()
+        pages = [[["claim.pdf"], ["scan.tif"]], [["invoice.pdf"]], [["receipt.pdf"]]]
+        driver = FakeAsyncPagerDriver(pages)
+        names = asyncio.run(driver_utils.get_table_names(driver, ".table", driver.next_css,
+                                                         previous_page_css=driver.previous_css))
+        assert names == ["claim.pdf", "scan.tif", "invoice.pdf", "receipt.pdf"]
+        assert driver.clicks == [1, 1, -1, -1] and driver.page == 0
+
+        driver = FakeAsyncPagerDriver(pages)
+        asyncio.run(driver_utils.get_table_names(driver, ".table", driver.next_css))
+        assert driver.page == 2
+
+        self.logger.log_exit("test_table_names_rewind_pager")
+
+    def test_standin_operations(self, tmp_path):
+        """
+        Test to validate login, collection search and create and document upload of AsyncDriverUtils against the
+        stand-in. Skipped when neither geckodriver nor chromedriver is available.
+        :param tmp_path:
+        :return:
+        """
+        self.logger.log_enter("test_standin_operations")
+
+        browser = next((browser for browser in ("firefox", "chrome") if find_driver_executable(browser)), None)
+        if browser is None:
+            pytest.skip("geckodriver and chromedriver not found")
+        document_path = tmp_path.joinpath("claim.pdf")
+        write_pdf(document_path, size=4096)
+
+        with StandinServer(seed={"abhishek": []}) as server:
+            async def scenario(driver, index):
+                await self.driver_utils.login(driver, server.app_url + "/document-explorer", server.username,
+                                              server.password)
+                assert "abhishek" in await self.driver_utils.search_collection(driver, "abhishek")
+                assert await self.driver_utils.create_collection(driver, "async_collection")
+                assert not await self.driver_utils.create_collection(
+                    driver, "async_collection", expected_error=self.collections.create_error_message)
+                assert "async_collection" in await self.driver_utils.search_collection(driver, "async_collection")
+                return await self.driver_utils.upload_document(driver, "abhishek", document_path, timeout=30)
+
+            try:
+                results = asyncio.run(run_sessions(scenario, 1, find_driver_executable(browser), browser))
+            except WebDriverException as e:
+                pytest.skip("{} could not be started: {}".format(browser, e))
+
+        if isinstance(results[0], BaseException):
+            raise results[0]
+        assert results[0] == self.document.document_upload_success_msg
+
+        self.logger.log_exit("test_standin_operations")
@@ -0,0 +1,55 @@
+from benchmarks.common import percentile, latency_summary, compare_to_baseline
+from benchmarks.upload_benchmark import parse_size
+from utils.logs_util import DocumentExplorerLogger
+
+
+class TestBenchmarks:
+    logger = DocumentExplorerLogger()
+
+    def test_percentile(self):
+        """
+        Test to validate percentiles interpolate between the closest ranks
+        :return:
+        """
+        self.logger.log_enter("test_percentile")
+
+        values = [float(value) for value in range(1, 101)]
+        assert percentile(values, 50) == 50.5
+        assert percentile(values, 0) == 1.0
+        assert percentile(values, 100) == 100.0
+        assert percentile([3.0], 99) == 3.0
+        assert percentile([], 50) is None
+
+        self.logger.log_exit("test_percentile")
+
+    def test_compare_to_baseline(self):
+        """
+        Test to validate regressions are reported above the threshold only
+        :return:
+        """
+        self.logger.log_enter("test_compare_to_baseline")
+
+        baseline = {"search_collection@100": latency_summary([1.0, 1.0, 1.0], [10, 10, 10])}
+        assert not compare_to_baseline({"search_collection@100": latency_summary([1.1, 1.1, 1.1], [11, 11, 11])},
+                                       baseline, threshold=0.2)
+        regressions = compare_to_baseline(
+            {"search_collection@100": latency_summary([1.5, 1.5, 1.5], [20, 20, 20]),
+             "search_document@100": latency_summary([9.0], [90])}, baseline, threshold=0.2)
+        assert len(regressions) == 3
+        assert all(regression.startswith("search_collection@100") for regression in regressions)
+
+        self.logger.log_exit("test_compare_to_baseline")
+
+    def test_parse_size(self):
+        """
+        Test to validate upload sizes are parsed with and without unit suffix
+        :return:
+        """
+        self.logger.log_enter("test_parse_size")
+
+        assert parse_size("4096") == 4096
+        assert parse_size("64k") == 64 * 1024
+        assert parse_size("300M") == 300 * 1024 * 1024
+        assert parse_size("1.5G") == 3 * 512 * 1024 * 1024
+
+        self.logger.log_exit("test_parse_size")
@@ -0,0 +1,185 @@
+import os
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.browser_pool import BrowserPool, NEW_TAB_SCRIPT, default_pool_size
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        assert handle in self.driver.window_handles
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """
+    Driver double keeping window handles, optionally with a popup blocker ignoring window.open and a cookie
+    deletion failing as on a crashed browser.
+    """
+
+    def __init__(self, popups=True, reset_error=None):
+        self.popups = popups
+        self.reset_error = reset_error
+        self.handles = ["window-0"]
+        self.current_window_handle = "window-0"
+        self.switch_to = FakeSwitchTo(self)
+        self.urls = []
+        self.opened = 0
+        self.quit_count = 0
+
+    def execute_script(self, script, *args):
+        if script == NEW_TAB_SCRIPT and self.popups:
+            self.opened += 1
+            self.handles.append("window-{}".format(self.opened))
+
+    @property
+    def window_handles(self):
+        return list(self.handles)
+
+    def close(self):
+        self.handles.remove(self.current_window_handle)
+
+    def delete_all_cookies(self):
+        if self.reset_error:
+            raise self.reset_error
+
+    def get(self, url):
+        self.urls.append(url)
+
+    def quit(self):
+        self.quit_count += 1
+
+
+class TestBrowserPool:
+    logger = DocumentExplorerLogger()
+
+    def test_tab_per_checkout(self):
+        """
+        Test to validate every checkout gets its own tab, which is closed on checkin
+        :return:
+        """
+        self.logger.log_enter("test_tab_per_checkout")
+
+        drivers = []
+        pool = BrowserPool(lambda browser: drivers.append(FakeDriver()) or drivers[-1], size=1)
+        driver = pool.checkout("firefox")
+        assert driver.current_window_handle == "window-1"
+        # a window opened by the test is closed with the tab
+        driver.handles.append("popup")
+        pool.checkin(driver)
+        assert driver.window_handles == ["window-0"] and driver.current_window_handle == "window-0"
+
+        assert pool.checkout("firefox") is driver
+        assert driver.current_window_handle == "window-2"
+        pool.checkin(driver)
+        assert driver.window_handles == ["window-0"] and not driver.urls
+        assert pool.stats["tabs"] == 2 and pool.stats["launched"] == 1
+        pool.close()
+        assert driver.quit_count == 1
+
+        self.logger.log_exit("test_tab_per_checkout")
+
+    def test_blocked_tab_falls_back_to_window_reset(self):
+        """
+        Test to validate the session window is reset to a blank page when no tab can be opened
+        :return:
+        """
+        self.logger.log_enter("test_blocked_tab_falls_back_to_window_reset")
+
+        pool = BrowserPool(lambda browser: FakeDriver(popups=False), size=1)
+        driver = pool.checkout("firefox")
+        assert driver.current_window_handle == "window-0"
+        pool.checkin(driver)
+        assert driver.urls == ["about:blank"] and pool.stats["tabs"] == 0
+
+        self.logger.log_exit("test_blocked_tab_falls_back_to_window_reset")
+
+    def test_checkout_reuses_idle_session(self):
+        """
+        Test to validate a checked in session is reset and handed out again, a second concurrent checkout launches
+        a session of its own, and the sessions beyond the pool size are quit on checkin
+        :return:
+        """
+        self.logger.log_enter("test_checkout_reuses_idle_session")
+
+        drivers = []
+        pool = BrowserPool(lambda browser: drivers.append(FakeDriver()) or drivers[-1], size=1, tabs=False)
+        driver = pool.checkout("firefox")
+        pool.checkin(driver)
+        assert driver.urls == ["about:blank"] and driver.quit_count == 0
+        assert pool.checkout("firefox") is driver
+        assert pool.stats["launched"] == 1 and pool.stats["reused"] == 1
+
+        other = pool.checkout("firefox")
+        assert other is not driver and pool.stats["launched"] == 2
+        pool.checkin(driver)
+        pool.checkin(other)
+        assert driver.quit_count == 0 and other.quit_count == 1
+        assert pool.stats["recycled"] == 1
+        assert pool.checkout("chrome") is not driver and pool.stats["launched"] == 3
+
+        self.logger.log_exit("test_checkout_reuses_idle_session")
+
+    def test_recycling(self):
+        """
+        Test to validate a session is quit instead of kept idle after max_uses checkouts, after a failed test, and
+        when its reset fails
+        :return:
+        """
+        self.logger.log_enter("test_recycling")
+
+        drivers = []
+        pool = BrowserPool(lambda browser: drivers.append(FakeDriver()) or drivers[-1], size=2, max_uses=2)
+        driver = pool.checkout("firefox")
+        pool.checkin(driver)
+        assert pool.checkout("firefox") is driver
+        pool.checkin(driver)
+        assert driver.quit_count == 1 and pool.stats["recycled"] == 1
+
+        driver = pool.checkout("firefox")
+        assert driver is drivers[1]
+        pool.checkin(driver, failed=True)
+        assert driver.quit_count == 1 and pool.stats["recycled"] == 2
+
+        pool = BrowserPool(lambda browser: FakeDriver(reset_error=WebDriverException("browser gone")), size=2)
+        driver = pool.checkout("firefox")
+        pool.checkin(driver)
+        assert driver.quit_count == 1 and pool.stats["recycled"] == 1
+        assert pool.checkout("firefox") is not driver and pool.stats["reused"] == 0
+
+        self.logger.log_exit("test_recycling")
+
+    def test_xdist_pool_size(self, monkeypatch):
+        """
+        Test to validate the default pool size splits the cores between the xdist workers, keeping one to two
+        sessions per worker, and the pool records its worker
+        :param monkeypatch:
+        :return:
+        """
+        self.logger.log_enter("test_xdist_pool_size")
+
+        monkeypatch.delenv("PYTEST_XDIST_WORKER", raising=False)
+        monkeypatch.delenv("PYTEST_XDIST_WORKER_COUNT", raising=False)
+        monkeypatch.setattr(os, "cpu_count", lambda: 8)
+        assert default_pool_size() == 2
+        monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "4")
+        assert default_pool_size() == 2
+        monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "8")
+        assert default_pool_size() == 1
+        monkeypatch.setattr(os, "cpu_count", lambda: None)
+        assert default_pool_size() == 1
+        monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "2")
+        monkeypatch.setattr(os, "cpu_count", lambda: 6)
+        assert default_pool_size() == 2
+
+        assert BrowserPool(FakeDriver).worker == "master"
+        monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw1")
+        pool = BrowserPool(FakeDriver)
+        assert pool.worker == "gw1" and pool.size == 2
+        assert BrowserPool(FakeDriver, size=3).size == 3
+
+        self.logger.log_exit("test_xdist_pool_size")
@@ -2,10 +2,22 @@ import pytest
 
 from utils.logs_util import DocumentExplorerLogger
 from utils.document_explorer import Collections
-from utils.driver_utils import DriverUtils
+from utils.driver_utils import DriverUtils, CHECK_APP_STATE_SCRIPT
 
 
-@pytest.mark.usefixtures("driver_init")
+@pytest.fixture(scope="class")
+def collection_setup(api_client):
+    """
+    Fixture to set up the collections the tests expect through the API, when enabled
+    :param api_client:
+    :return:
+    """
+    if api_client:
+        api_client.ensure_collection("abhishek")
+        api_client.delete_collection("test_collection")
+
+
+@pytest.mark.usefixtures("driver_init", "collection_setup")
 class TestCollections:
     logger = DocumentExplorerLogger()
     collections = Collections()
@@ -29,17 +41,20 @@ class TestCollections:
         self.logger.log_enter("test_collection_create")
 
         # create a collection
-        self.driver_utils.create_collection(
+        table_diff = self.driver_utils.create_collection(
             self.driver,
             collection_name,
             expected_error=expected_error
         )
 
-        # search a collection by its name
-        results = self.driver_utils.search_collection(
-            self.driver,
-            collection_name
-        )
+        # verify with the rows changed by the create, search only if the collection is not among them
+        # (e.g. an existing collection, or sorted onto another page)
+        results = table_diff.inserted_names() if table_diff else []
+        if not self.collections.check_if_name_exist(collection_name, results):
+            results = self.driver_utils.search_collection(
+                self.driver,
+                collection_name
+            )
 
         # compare output returned by search operation with expected result
         assert self.collections.check_if_name_exist(collection_name, results) == expected_result
@@ -108,3 +123,73 @@ class TestCollections:
         """
         self.logger.log_enter("test_collection_filter")
         self.logger.log_exit("test_collection_filter")
+
+
+@pytest.mark.usefixtures("standin_browser")
+class TestAppStateReset:
+    logger = DocumentExplorerLogger()
+    collections = Collections()
+    driver_utils = DriverUtils()
+    standin_seed = {"collection_{:02d}".format(index): [] for index in range(30)}
+
+    def test_reset_app_state_without_refresh(self):
+        """
+        Test to validate a dirtied search, sort and page size of the stand-in are reset in-app, and pass the state
+        check without a page refresh
+        :return:
+        """
+        self.logger.log_enter("test_reset_app_state_without_refresh")
+
+        # dirty the collection search, sort and page size
+        self.driver_utils.get_collection_search_element(self.driver).send_keys("collection")
+        self.driver_utils.waits.wait_for_page_ready(self.driver, self.collections.loading_spinner_css)
+        self.driver_utils.click_button(self.driver, self.collections.collection_table_sort_css)
+        self.driver_utils.waits.wait_for_page_ready(self.driver, self.collections.loading_spinner_css)
+        self.driver_utils.change_collection_page_size(self.driver, "25")
+        assert sorted(self.driver.execute_script(CHECK_APP_STATE_SCRIPT, self.driver_utils.app_state_selectors)) == \
+            ["collection_search", "page_size", "sort"]
+
+        # a page refresh drops the marker
+        self.driver.execute_script("window.__deResetMarker = true;")
+        refreshes = self.driver_utils.reset_stats["refresh"]
+        assert self.driver_utils.reset_app_state(self.driver)
+        assert self.driver_utils.reset_stats["refresh"] == refreshes
+        assert self.driver.execute_script(CHECK_APP_STATE_SCRIPT, self.driver_utils.app_state_selectors) == []
+        assert self.driver.execute_script("return window.__deResetMarker === true;")
+
+        self.logger.log_exit("test_reset_app_state_without_refresh")
+
+
+@pytest.mark.usefixtures("standin_browser")
+class TestCollectionCreateStandin:
+    logger = DocumentExplorerLogger()
+    collections = Collections()
+    driver_utils = DriverUtils()
+    standin_seed = {"abhishek": []}
+
+    @pytest.mark.parametrize("collection_name, expected_error, inserted", [
+        ("standin_collection", None, True),
+        ("abhishek", collections.create_error_message, False)
+    ])
+    def test_collection_create_steps(self, collection_name, expected_error, inserted):
+        """
+        Test to validate a create without an error message succeeds without a failed step, and a create with the
+        expected error message is not diffed
+        :param collection_name: Name of the collection to create
+        :param expected_error: Expected error message on create operation
+        :param inserted: True if the collection is expected among the inserted rows
+        :return:
+        """
+        self.logger.log_enter("test_collection_create_steps")
+
+        failed_steps = []
+        self.driver_utils.step_failed = lambda driver, step, error: failed_steps.append((step, error))
+        try:
+            table_diff = self.driver_utils.create_collection(self.driver, collection_name,
+                                                             expected_error=expected_error)
+        finally:
+            del self.driver_utils.step_failed
+        assert failed_steps == []
+        assert (table_diff is not None and collection_name in table_diff.inserted_names()) == inserted
+
+        self.logger.log_exit("test_collection_create_steps")
@@ -0,0 +1,74 @@
+import pytest
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.standin_server import StandinServer
+from utils.api_client import DocumentExplorerApiClient
+from utils.data_seeder import DataSeeder, build_plan
+
+
+@pytest.fixture(scope="class")
+def seeder_server(request):
+    """
+    Fixture for an empty stand-in server and a logged in API client
+    :param request:
+    :return:
+    """
+    server = StandinServer(seed={}).start()
+    client = DocumentExplorerApiClient(server.app_url, maxsize=4)
+    assert client.login_form(server.app_url + "/auth/login", server.username, server.password)
+    request.cls.server = server
+    request.cls.api_client = client
+    yield
+    client.close()
+    server.stop()
+
+
+@pytest.mark.usefixtures("seeder_server")
+class TestDataSeeder:
+    logger = DocumentExplorerLogger()
+
+    def test_build_plan(self):
+        """
+        Test to validate the plan is reproducible and mixes Unicode, case colliding and long names
+        :return:
+        """
+        self.logger.log_enter("test_build_plan")
+
+        plan = build_plan(200, 3, seed=7)
+        assert plan == build_plan(200, 3, seed=7)
+        names = list(plan)
+        assert len(set(names)) == 200
+        assert any(not name.isascii() for name in names)
+        assert any(name.lower() in names and name != name.lower() for name in names)
+        assert max(len(name) for name in names) >= 150
+        assert all(document.endswith(".pdf") for documents in plan.values() for document in documents)
+
+        self.logger.log_exit("test_build_plan")
+
+    def test_seed_is_resumable_and_idempotent(self, tmp_path):
+        """
+        Test to validate seeding creates the plan, and a rerun skips the finished and existing items
+        :param tmp_path:
+        :return:
+        """
+        self.logger.log_enter("test_seed_is_resumable_and_idempotent")
+
+        plan = build_plan(20, 3, seed=1)
+        state_file = tmp_path.joinpath("seed_state.json")
+        stats = DataSeeder(self.api_client, state_file=state_file, workers=4, document_size=4096).seed(plan)
+        assert (stats["created"], stats["uploaded"], stats["failed"]) == (20, 60, 0)
+        assert sorted(self.api_client.get_collection_names()) == sorted(plan)
+        name = next(iter(plan))
+        assert sorted(self.api_client.get_document_names(name)) == sorted(plan[name])
+
+        # resumed from the state file, nothing left to do
+        requests = self.api_client.request_count
+        stats = DataSeeder(self.api_client, state_file=state_file, workers=4).seed(plan)
+        assert stats["created"] == stats["uploaded"] == stats["skipped"] == 0
+        assert self.api_client.request_count == requests
+
+        # without the state file the existing items are skipped
+        stats = DataSeeder(self.api_client, workers=4).seed(plan)
+        assert (stats["created"], stats["uploaded"], stats["skipped"], stats["failed"]) == (0, 0, 80, 0)
+
+        self.logger.log_exit("test_seed_is_resumable_and_idempotent")
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.deadline import Deadline, DeadlineExceeded, deadline_scope, current_deadline, operation_deadline
+from utils.wait_utils import WaitUtils
+
+
+class FakeOperations:
+    """
+    Operations double whose waits never succeed.
+    """
+    operation_budget = 0.2
+
+    def __init__(self):
+        self.waits = WaitUtils(timeout=10, poll_interval=0.02)
+        self.attempts = 0
+
+    @operation_deadline
+    def broken_operation(self):
+        # like the DriverUtils operations: log the timeout and carry on with the next wait
+        for _ in range(5):
+            self.attempts += 1
+            try:
+                self.waits.until(None, "never", lambda driver: False)
+            except TimeoutException:
+                pass
+
+
+class TestDeadline:
+    logger = DocumentExplorerLogger()
+
+    def test_nested_deadline_budget(self):
+        """
+        Test to validate a nested deadline never outlives its parent and timeouts shrink to the remaining budget
+        :return:
+        """
+        self.logger.log_enter("test_nested_deadline_budget")
+
+        parent = Deadline(0.5, "test")
+        child = Deadline(60, "operation", parent=parent)
+        assert child.expires == parent.expires
+        assert child.timeout(10) <= 0.5
+        assert child.timeout(0.1) == 0.1
+
+        spent = Deadline(0, "operation", parent=parent)
+        with pytest.raises(DeadlineExceeded, match="operation"):
+            spent.timeout(10, "wait_for_element")
+        assert spent.exceeded and not parent.exceeded
+
+        self.logger.log_exit("test_nested_deadline_budget")
+
+    def test_detached_scope(self):
+        """
+        Test to validate a detached deadline does not inherit the expiry of a spent deadline, and the spent one is
+        current again after it
+        :return:
+        """
+        self.logger.log_enter("test_detached_scope")
+
+        with deadline_scope(0.01, "operation") as operation:
+            time.sleep(0.02)
+            with deadline_scope(5, "cleanup", detached=True) as cleanup:
+                assert current_deadline() is cleanup and cleanup.parent is None
+                assert 4 < cleanup.timeout(10) <= 5
+            assert current_deadline() is operation
+            with pytest.raises(DeadlineExceeded):
+                operation.timeout(10)
+
+        self.logger.log_exit("test_detached_scope")
+
+    def test_operation_aborts_when_budget_spent(self):
+        """
+        Test to validate an operation swallowing wait timeouts aborts with DeadlineExceeded once its budget is spent,
+        instead of running every wait to its full timeout
+        :return:
+        """
+        self.logger.log_enter("test_operation_aborts_when_budget_spent")
+
+        operations = FakeOperations()
+        outer = current_deadline()
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            operations.broken_operation()
+        assert time.monotonic() - start < 2
+        assert operations.attempts == 1
+        assert current_deadline() is outer
+
+        self.logger.log_exit("test_operation_aborts_when_budget_spent")
+
+    def test_test_budget_bounds_operation(self):
+        """
+        Test to validate the test deadline bounds the operations run in it, and reports its consumption
+        :return:
+        """
+        self.logger.log_enter("test_test_budget_bounds_operation")
+
+        operations = FakeOperations()
+        operations.operation_budget = 60
+        with deadline_scope(0.1, "test") as deadline:
+            with pytest.raises(DeadlineExceeded, match="test: budget of 0.1s"):
+                operations.broken_operation()
+        summary = deadline.summary()
+        assert summary["exceeded"]
+        assert summary["consumed"] >= 1.0
+
+        self.logger.log_exit("test_test_budget_bounds_operation")
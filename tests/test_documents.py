@@ -2,10 +2,26 @@ import pytest
 
 from utils.logs_util import DocumentExplorerLogger
 from utils.document_explorer import Documents
-from utils.driver_utils import DriverUtils
+from utils.driver_utils import DriverUtils, upload_chunks
+from utils.synthetic_documents import write_pdf
 
 
-@pytest.mark.usefixtures("driver_init")
+@pytest.fixture(scope="class")
+def document_setup(api_client):
+    """
+    Fixture to set up the collection and documents the tests expect through the API, when enabled
+    :param api_client:
+    :return:
+    """
+    if api_client:
+        api_client.ensure_collection("abhishek")
+        if Documents.pdf_test_file_2_name not in api_client.get_document_names(
+                "abhishek", search=Documents.pdf_test_file_2_name):
+            api_client.upload_document("abhishek", Documents.pdf_test_file_path,
+                                       document_name=Documents.pdf_test_file_2_name)
+
+
+@pytest.mark.usefixtures("driver_init", "document_setup")
 class TestDocuments:
     logger = DocumentExplorerLogger()
     document = Documents()
@@ -88,3 +104,52 @@ class TestDocuments:
         """
         self.logger.log_enter("test_document_filter")
         self.logger.log_exit("test_document_filter")
+
+
+class TestUploadChunks:
+    logger = DocumentExplorerLogger()
+
+    def test_same_file_names_are_sent_in_separate_chunks(self):
+        """
+        Test to validate upload chunks are capped and never hold two files with the same name
+        :return:
+        """
+        self.logger.log_enter("test_same_file_names_are_sent_in_separate_chunks")
+
+        paths = ["/a/claim.pdf", "/b/claim.pdf", "/a/scan.tif", "/a/invoice.pdf", "/b/scan.tif"]
+        assert upload_chunks(paths, 2) == [["/a/claim.pdf"], ["/b/claim.pdf", "/a/scan.tif"],
+                                           ["/a/invoice.pdf", "/b/scan.tif"]]
+        assert upload_chunks(paths, 50) == [["/a/claim.pdf"], ["/b/claim.pdf", "/a/scan.tif", "/a/invoice.pdf"],
+                                            ["/b/scan.tif"]]
+
+        self.logger.log_exit("test_same_file_names_are_sent_in_separate_chunks")
+
+
+@pytest.mark.usefixtures("standin_browser")
+class TestDocumentBatchUpload:
+    logger = DocumentExplorerLogger()
+    document = Documents()
+    driver_utils = DriverUtils()
+    standin_seed = {"abhishek": []}
+
+    def test_batch_upload_same_file_names(self, tmp_path):
+        """
+        Test to validate a batch upload against the stand-in reports every path, also of files with the same name
+        :param tmp_path:
+        :return:
+        """
+        self.logger.log_enter("test_batch_upload_same_file_names")
+
+        paths = [tmp_path.joinpath("first", "claim.pdf"), tmp_path.joinpath("second", "claim.pdf"),
+                 tmp_path.joinpath("first", "invoice.pdf")]
+        for path in paths:
+            path.parent.mkdir(exist_ok=True)
+            write_pdf(path, size=4096)
+        paths = [str(path) for path in paths]
+
+        batch_result = self.driver_utils.upload_documents(self.driver, "abhishek", paths, timeout=30)
+        assert sorted(batch_result.results) == sorted(paths)
+        assert batch_result.count(self.document.document_upload_success_msg) == 3
+        assert sorted(batch_result.latencies) == sorted(paths)
+
+        self.logger.log_exit("test_batch_upload_same_file_names")
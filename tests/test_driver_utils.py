@@ -0,0 +1,442 @@
+import time
+
+from selenium.common.exceptions import NoSuchElementException, JavascriptException, WebDriverException, \
+    StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.deadline import clamp_timeout, deadline_scope
+from utils.document_explorer import Documents
+from utils.driver_utils import DriverUtils, RESET_APP_STATE_SCRIPT, CHECK_APP_STATE_SCRIPT, TABLE_EXTRACT_SCRIPT, \
+    NEXT_PAGE_SCRIPT
+from utils.wait_utils import WaitUtils, TABLE_FINGERPRINT_SCRIPT, DOM_QUIESCENCE_SCRIPT
+
+TABLE_CSS = ".table"
+NEXT_CSS = ".pager > .next"
+PREVIOUS_CSS = ".pager > .previous"
+
+
+class FakeResetDriver:
+    """
+    Driver double answering the application state scripts with fixed reset actions and failed checks, counting
+    the page refreshes.
+    """
+    session_id = "fake-reset"
+
+    def __init__(self, refresh_error=None, actions=None, failures=None):
+        self.refresh_error = refresh_error
+        self.actions = actions or []
+        self.failures = ["page_size"] if failures is None else failures
+        self.refreshes = 0
+
+    def execute_script(self, script, *args):
+        if script == RESET_APP_STATE_SCRIPT:
+            return self.actions
+        if script == CHECK_APP_STATE_SCRIPT:
+            return self.failures
+        return None
+
+    def refresh(self):
+        self.refreshes += 1
+        if self.refresh_error:
+            raise self.refresh_error
+
+
+class FakePageWaits:
+    """
+    WaitUtils double whose page ready wait only takes its timeout from the current deadline.
+    """
+
+    def __init__(self):
+        self.timeouts = []
+
+    def wait_for_page_ready(self, driver, spinner_css, timeout=None):
+        self.timeouts.append(clamp_timeout(10, "wait_for_page_ready"))
+
+
+class FakePagerDriver:
+    """
+    Driver double rendering a paginated table, one page at a time, with next and previous pager buttons.
+    """
+    session_id = "fake-pager"
+
+    def __init__(self, pages, buttons=(NEXT_CSS, PREVIOUS_CSS)):
+        """
+        :param pages: list of pages, each a list of rows of cell values
+        :param buttons: CSS selectors of the pager buttons present in the page
+        """
+        self.pages = pages
+        self.buttons = buttons
+        self.page = 0
+        self.clicks = []
+
+    def find_element(self, by, css):
+        if css != TABLE_CSS:
+            raise NoSuchElementException(css)
+        return object()
+
+    def execute_script(self, script, *args):
+        if script == TABLE_EXTRACT_SCRIPT:
+            columns = args[1]
+            return [["\t".join(row), [row[i] for i in columns] if columns else list(row)]
+                    for row in self.pages[self.page]]
+        if script == TABLE_FINGERPRINT_SCRIPT:
+            return "page-{}".format(self.page)
+        if script == DOM_QUIESCENCE_SCRIPT:
+            return 10000
+        assert script == NEXT_PAGE_SCRIPT
+        step = 1 if args[0] == NEXT_CSS else -1
+        if args[0] not in self.buttons or not 0 <= self.page + step < len(self.pages):
+            return False
+        self.page += step
+        self.clicks.append(step)
+        return True
+
+
+class FakeCell:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeRow:
+    def __init__(self, tag, cells):
+        self.tag = tag
+        self.cells = [FakeCell(text) for text in cells]
+        self.text = " ".join(cells)
+
+    def find_elements(self, by, tag):
+        assert by == By.TAG_NAME
+        return self.cells if tag == self.tag else []
+
+
+class FakeTable:
+    def __init__(self, headers, rows):
+        self.rows = [FakeRow("th", headers)] + [FakeRow("td", row) for row in rows]
+
+    def find_elements(self, by, tag):
+        assert by == By.TAG_NAME and tag == "tr"
+        return self.rows
+
+
+class FakeBulkDriver:
+    """
+    Driver double answering the bulk table extraction script for a fixed table, or failing it, with the elements
+    of the table for the per element fallback.
+    """
+    session_id = "fake-bulk"
+    headers = ["Name", "Size"]
+    rows = [["claim.pdf", "10 KB"], ["scan.tif", "2 KB"]]
+    links = {"claim.pdf": "/documents/1", "scan.tif": "/documents/2"}
+
+    def __init__(self, present=True, script_error=None):
+        self.present = present
+        self.script_error = script_error
+        self.extract_calls = []
+
+    def find_element(self, by, css):
+        if not self.present or css != TABLE_CSS:
+            raise NoSuchElementException(css)
+        return FakeTable(self.headers, self.rows)
+
+    def find_element_by_css_selector(self, css):
+        return self.find_element(By.CSS_SELECTOR, css)
+
+    def execute_script(self, script, *args):
+        if script == TABLE_FINGERPRINT_SCRIPT:
+            return "2:1" if self.present else None
+        if script == DOM_QUIESCENCE_SCRIPT:
+            return 10000
+        assert script == TABLE_EXTRACT_SCRIPT
+        self.extract_calls.append(args[1:])
+        if self.script_error:
+            raise self.script_error
+        if not self.present:
+            return None
+        table_css, columns, attributes = args[:3]
+        indexes = columns if columns is not None else range(len(self.headers))
+        rows = []
+        for row in self.rows:
+            cells = [row[i] for i in indexes]
+            if attributes:
+                cells = [{"text": cell, "href": self.links.get(cell)} for cell in cells]
+            rows.append(cells)
+        if len(args) > 3 and args[3]:
+            return {"headers": [self.headers[i] for i in indexes], "rows": rows}
+        return [["\t".join(row), cells] for row, cells in zip(self.rows, rows)]
+
+
+class FakeElement:
+    def __init__(self, text=""):
+        self.id = "element"
+        self.text = text
+        self.clicks = 0
+
+    def click(self):
+        self.clicks += 1
+
+
+class FakeUploadDriver:
+    """
+    Driver double of the upload panel: a hover over the upload status which fails on a stale status, and the
+    floating upload message, missing if no text is given.
+    """
+    session_id = "fake-upload"
+    w3c = False
+
+    def __init__(self, floating_text=None, stale=False):
+        self.floating_text = floating_text
+        self.stale = stale
+
+    def execute(self, command, params=None):
+        if self.stale:
+            raise StaleElementReferenceException("upload status re-rendered")
+        return {"value": None}
+
+    def find_element(self, by, css):
+        if css != Documents.document_upload_floating_css or self.floating_text is None:
+            raise NoSuchElementException(css)
+        return FakeElement(self.floating_text)
+
+
+class FakeLocators:
+    """
+    LocatorCache double returning one element per selector and counting the invalidations.
+    """
+
+    def __init__(self):
+        self.elements = {}
+        self.invalidations = 0
+
+    def find(self, driver, css):
+        return self.elements.setdefault(css, FakeElement())
+
+    def invalidate(self, driver=None):
+        self.invalidations += 1
+
+
+class FakeUploadWatcher:
+    def wait_for_status(self, driver, status, since=-1, timeout=30):
+        return {"status": status}
+
+
+class FakeArtifacts:
+    def __init__(self):
+        self.steps = []
+
+    def capture(self, driver, step, error=None):
+        self.steps.append(step)
+        return {}
+
+
+def pager_driver_utils():
+    """
+    Method to get a DriverUtils object with short waits for the fake drivers
+    :return: DriverUtils object
+    """
+    driver_utils = DriverUtils()
+    driver_utils.waits = WaitUtils(timeout=1, poll_interval=0.01, change_timeout=0.5)
+    return driver_utils
+
+
+class TestResetAppState:
+    logger = DocumentExplorerLogger()
+
+    def test_failed_refresh_is_not_raised(self):
+        """
+        Test to validate a refresh fallback which fails is logged and reported as not reset, instead of replacing
+        the outcome of the operation the reset runs after
+        :return:
+        """
+        self.logger.log_enter("test_failed_refresh_is_not_raised")
+
+        driver_utils = DriverUtils()
+        driver = FakeResetDriver(WebDriverException("browser gone"))
+        refreshes = driver_utils.reset_stats["refresh"]
+        assert driver_utils.reset_app_state(driver) is False
+        assert driver.refreshes == 1
+        assert driver_utils.reset_stats["refresh"] == refreshes + 1
+
+        self.logger.log_exit("test_failed_refresh_is_not_raised")
+
+    def test_reset_runs_after_operation_budget_is_spent(self):
+        """
+        Test to validate the reset waits run under a budget of their own once the operation budget is spent, so the
+        page is still reset for the next test
+        :return:
+        """
+        self.logger.log_enter("test_reset_runs_after_operation_budget_is_spent")
+
+        driver_utils = DriverUtils()
+        driver_utils.waits = FakePageWaits()
+        with deadline_scope(0.01, "DriverUtils: search_document"):
+            time.sleep(0.02)
+            assert driver_utils.reset_app_state(FakeResetDriver(actions=["sort"], failures=[]))
+            driver = FakeResetDriver()
+            assert driver_utils.reset_app_state(driver) is False
+        assert driver.refreshes == 1
+        assert len(driver_utils.waits.timeouts) == 2
+        assert all(0 < timeout <= driver_utils.cleanup_budget for timeout in driver_utils.waits.timeouts)
+
+        self.logger.log_exit("test_reset_runs_after_operation_budget_is_spent")
+
+
+class TestTablePager:
+    logger = DocumentExplorerLogger()
+    pages = [[["claim.pdf", "10 KB"], ["scan.tif", "2 KB"]], [["invoice.pdf", "4 KB"], ["card.png", "1 KB"]],
+             [["receipt.pdf", "3 KB"]]]
+
+    def test_multi_page_walk(self):
+        """
+        Test to validate the names of all pages are collected and the pager is turned back to the first page
+        :return:
+        """
+        self.logger.log_enter("test_multi_page_walk")
+
+        driver = FakePagerDriver(self.pages)
+        names = pager_driver_utils().get_table_names(driver, TABLE_CSS, NEXT_CSS, previous_page_css=PREVIOUS_CSS)
+        assert names == ["claim.pdf", "scan.tif", "invoice.pdf", "card.png", "receipt.pdf"]
+        assert driver.clicks == [1, 1, -1, -1] and driver.page == 0
+
+        driver = FakePagerDriver(self.pages)
+        assert pager_driver_utils().get_table_names(driver, TABLE_CSS, NEXT_CSS, col_num=1)[-1] == "3 KB"
+        assert driver.page == 2
+
+        self.logger.log_exit("test_multi_page_walk")
+
+    def test_pages_are_turned_lazily_and_rewound_on_close(self):
+        """
+        Test to validate a page is only turned when its rows are consumed, and closing the generator early
+        turns the pager back to the first page
+        :return:
+        """
+        self.logger.log_enter("test_pages_are_turned_lazily_and_rewound_on_close")
+
+        driver = FakePagerDriver(self.pages)
+        rows = pager_driver_utils().iter_table_rows(driver, TABLE_CSS, NEXT_CSS, previous_page_css=PREVIOUS_CSS)
+        assert [next(rows) for _ in range(2)] == self.pages[0]
+        assert driver.page == 0
+        assert next(rows) == ["invoice.pdf", "4 KB"]
+        assert driver.page == 1
+        rows.close()
+        assert driver.clicks == [1, -1] and driver.page == 0
+
+        self.logger.log_exit("test_pages_are_turned_lazily_and_rewound_on_close")
+
+    def test_single_page_and_missing_next_button(self):
+        """
+        Test to validate a single page table and a table without a next button are read without turning the pager
+        :return:
+        """
+        self.logger.log_enter("test_single_page_and_missing_next_button")
+
+        driver = FakePagerDriver(self.pages[:1])
+        assert list(pager_driver_utils().iter_table_rows(driver, TABLE_CSS, NEXT_CSS,
+                                                         previous_page_css=PREVIOUS_CSS)) == self.pages[0]
+        assert driver.clicks == []
+
+        driver = FakePagerDriver(self.pages, buttons=())
+        names = pager_driver_utils().get_table_names(driver, TABLE_CSS, NEXT_CSS, previous_page_css=PREVIOUS_CSS)
+        assert names == ["claim.pdf", "scan.tif"]
+        assert driver.clicks == [] and driver.page == 0
+
+        self.logger.log_exit("test_single_page_and_missing_next_button")
+
+
+class TestTableExtraction:
+    logger = DocumentExplorerLogger()
+
+    def test_bulk_extraction(self):
+        """
+        Test to validate the table is parsed with one extraction script, with the selected columns and the
+        captured attributes
+        :return:
+        """
+        self.logger.log_enter("test_bulk_extraction")
+
+        driver_utils = pager_driver_utils()
+        driver = FakeBulkDriver()
+        snapshot = driver_utils.parse_table(driver, TABLE_CSS)
+        assert snapshot.headers == ["Name", "Size"] and list(snapshot) == FakeBulkDriver.rows
+        assert driver.extract_calls == [(None, None, True)]
+
+        snapshot = driver_utils.parse_table(driver, TABLE_CSS, columns=[1])
+        assert snapshot.headers == ["Size"] and snapshot.names == ["10 KB", "2 KB"]
+
+        rows = driver_utils.extract_table(driver, TABLE_CSS, columns=[0], attributes=["href"])
+        assert rows == [["claim.pdf\t10 KB", [{"text": "claim.pdf", "href": "/documents/1"}]],
+                        ["scan.tif\t2 KB", [{"text": "scan.tif", "href": "/documents/2"}]]]
+
+        self.logger.log_exit("test_bulk_extraction")
+
+    def test_missing_table_and_fallback(self):
+        """
+        Test to validate a missing table extracts as None and parses as an empty snapshot, and a failing extraction
+        script falls back to the per element parsing
+        :return:
+        """
+        self.logger.log_enter("test_missing_table_and_fallback")
+
+        driver_utils = pager_driver_utils()
+        assert driver_utils.extract_table(FakeBulkDriver(present=False), TABLE_CSS) is None
+        assert len(driver_utils.parse_table(FakeBulkDriver(present=False), TABLE_CSS)) == 0
+
+        driver = FakeBulkDriver(script_error=JavascriptException("table.rows is undefined"))
+        snapshot = driver_utils.parse_table(driver, TABLE_CSS, name_column="size")
+        assert len(driver.extract_calls) == 1
+        assert snapshot.headers == ["Name", "Size"] and list(snapshot) == FakeBulkDriver.rows
+        assert "2 KB" in snapshot
+
+        self.logger.log_exit("test_missing_table_and_fallback")
+
+
+class TestDocumentUpload:
+    logger = DocumentExplorerLogger()
+
+    @staticmethod
+    def upload_driver_utils():
+        """
+        Method to get a DriverUtils object with doubles of the upload panel helpers
+        :return: DriverUtils object
+        """
+        driver_utils = pager_driver_utils()
+        driver_utils.waits = WaitUtils(timeout=0.1, poll_interval=0.01)
+        driver_utils.locators = FakeLocators()
+        driver_utils.upload_watcher = FakeUploadWatcher()
+        driver_utils.artifacts = FakeArtifacts()
+        return driver_utils
+
+    def test_upload_message(self):
+        """
+        Test to validate the last line of the floating upload message is returned and the finished uploads are
+        cleared
+        :return:
+        """
+        self.logger.log_enter("test_upload_message")
+
+        driver_utils = self.upload_driver_utils()
+        driver = FakeUploadDriver("claim.pdf\nfinished uploading")
+        assert driver_utils.wait_for_document_upload(driver, timeout=1) == "finished uploading"
+        assert driver_utils.locators.elements[Documents.document_clear_finished_css].clicks == 1
+        assert driver_utils.artifacts.steps == []
+
+        self.logger.log_exit("test_upload_message")
+
+    def test_unread_message_is_none(self):
+        """
+        Test to validate a floating message which never shows up and a stale upload status fail the step and
+        return None instead of raising
+        :return:
+        """
+        self.logger.log_enter("test_unread_message_is_none")
+
+        driver_utils = self.upload_driver_utils()
+        assert driver_utils.wait_for_document_upload(FakeUploadDriver(), timeout=1) is None
+        assert driver_utils.artifacts.steps == ["wait_for_document_upload"]
+        assert driver_utils.locators.invalidations == 0
+
+        driver = FakeUploadDriver("claim.pdf\nfinished uploading", stale=True)
+        assert driver_utils.wait_for_document_upload(driver, timeout=1) is None
+        assert driver_utils.artifacts.steps == ["wait_for_document_upload"] * 2
+        assert driver_utils.locators.invalidations == 1
+
+        self.logger.log_exit("test_unread_message_is_none")
@@ -0,0 +1,49 @@
+import pytest
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.duration_scheduler import DurationHistory, lpt_schedule, nodeid_group_key, parse_shard
+
+
+class TestDurationScheduler:
+    logger = DocumentExplorerLogger()
+
+    def test_lpt_schedule(self):
+        """
+        Test to validate groups are assigned longest first to the least loaded worker
+        :return:
+        """
+        self.logger.log_enter("test_lpt_schedule")
+
+        durations = {"TestDocuments": 7.0, "TestCollections": 5.0, "TestApi": 4.0, "TestTable": 3.0, "TestLogs": 3.0}
+        bins = lpt_schedule(durations, 2)
+        assert bins == [[10.0, ["TestDocuments", "TestLogs"]], [12.0, ["TestCollections", "TestApi", "TestTable"]]]
+        assert lpt_schedule({}, 3) == [[0.0, []], [0.0, []], [0.0, []]]
+        assert parse_shard("2/4") == (1, 4)
+        with pytest.raises(ValueError):
+            parse_shard("5/4")
+        assert nodeid_group_key("tests/test_a.py::TestA::test_b[firefox]") == "tests/test_a.py::TestA"
+
+        self.logger.log_exit("test_lpt_schedule")
+
+    def test_duration_history(self, tmp_path):
+        """
+        Test to validate durations are averaged, saved and predicted with the median for unknown tests
+        :param tmp_path:
+        :return:
+        """
+        self.logger.log_enter("test_duration_history")
+
+        history_file = tmp_path.joinpath("durations.json")
+        history = DurationHistory(history_file)
+        assert history.predict("tests/test_a.py::test_new") == 1.0
+        history.record("tests/test_a.py::test_a", 2.0)
+        history.record("tests/test_a.py::test_a", 4.0)
+        history.record("tests/test_a.py::test_b", 1.0)
+        history.record("tests/test_a.py::test_c", 8.0)
+        history.save()
+
+        history = DurationHistory(history_file)
+        assert history.predict("tests/test_a.py::test_a") == 3.0
+        assert history.predict("tests/test_a.py::test_new") == 3.0
+
+        self.logger.log_exit("test_duration_history")
@@ -0,0 +1,111 @@
+import pytest
+from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.launch_profiles import BrowserLauncher, LAUNCH_PROFILES, FIREFOX_QUIET_PREFS, CHROME_QUIET_ARGUMENTS, \
+    get_launch_profile
+
+
+class TestLaunchProfiles:
+    logger = DocumentExplorerLogger()
+
+    def test_get_launch_profile(self, monkeypatch):
+        """
+        Test to validate the profile named on the command line wins over the environment variable, which wins over
+        the default, and an unknown name is rejected
+        :param monkeypatch:
+        :return:
+        """
+        self.logger.log_enter("test_get_launch_profile")
+
+        monkeypatch.delenv("DE_LAUNCH_PROFILE", raising=False)
+        assert get_launch_profile() is LAUNCH_PROFILES["debug"]
+        monkeypatch.setenv("DE_LAUNCH_PROFILE", "fidelity")
+        assert get_launch_profile() is LAUNCH_PROFILES["fidelity"]
+        assert get_launch_profile("ci-fast") is LAUNCH_PROFILES["ci-fast"]
+        with pytest.raises(ValueError, match="Unknown launch profile turbo"):
+            get_launch_profile("turbo")
+        monkeypatch.setenv("DE_LAUNCH_PROFILE", "turbo")
+        with pytest.raises(ValueError):
+            get_launch_profile()
+
+        self.logger.log_exit("test_get_launch_profile")
+
+    def test_firefox_options(self):
+        """
+        Test to validate the Firefox options of the profiles: headless, blocked images and media, quiet preferences
+        :return:
+        """
+        self.logger.log_enter("test_firefox_options")
+
+        options = LAUNCH_PROFILES["ci-fast"].firefox_options()
+        assert options.headless and "-headless" in options.arguments
+        assert options.preferences["permissions.default.image"] == 2
+        assert options.preferences["media.autoplay.default"] == 5
+        assert options.preferences["gfx.downloadable_fonts.enabled"] is False
+        assert all(options.preferences[name] == value for name, value in FIREFOX_QUIET_PREFS.items())
+
+        options = LAUNCH_PROFILES["debug"].firefox_options()
+        assert not options.headless and options.preferences == {}
+
+        options = LAUNCH_PROFILES["fidelity"].firefox_options()
+        assert options.headless and "permissions.default.image" not in options.preferences
+        assert "network.prefetch-next" in options.preferences
+
+        self.logger.log_exit("test_firefox_options")
+
+    def test_chrome_options(self):
+        """
+        Test to validate the Chrome options of the profiles: headless, window size, blocked images and media,
+        quiet switches
+        :return:
+        """
+        self.logger.log_enter("test_chrome_options")
+
+        options = LAUNCH_PROFILES["ci-fast"].chrome_options()
+        assert options.headless and "--window-size=1280,800" in options.arguments
+        assert "--blink-settings=imagesEnabled=false" in options.arguments
+        assert options.experimental_options["prefs"] == {"profile.managed_default_content_settings.images": 2}
+        assert "--disable-remote-fonts" in options.arguments
+        assert set(CHROME_QUIET_ARGUMENTS) <= set(options.arguments)
+
+        options = LAUNCH_PROFILES["debug"].chrome_options()
+        assert not options.headless and options.arguments == ["--window-size=1280,800"]
+        assert "prefs" not in options.experimental_options
+
+        options = LAUNCH_PROFILES["fidelity"].chrome_options()
+        assert "--window-size=1920,1080" in options.arguments
+        assert "--blink-settings=imagesEnabled=false" not in options.arguments
+
+        self.logger.log_exit("test_chrome_options")
+
+    def test_capabilities(self):
+        """
+        Test to validate the capabilities carry the page load strategy of the profile without changing the
+        Selenium defaults
+        :return:
+        """
+        self.logger.log_enter("test_capabilities")
+
+        capabilities = LAUNCH_PROFILES["ci-fast"].capabilities("firefox")
+        assert capabilities["browserName"] == "firefox" and capabilities["pageLoadStrategy"] == "eager"
+        capabilities = LAUNCH_PROFILES["debug"].capabilities("chrome")
+        assert capabilities["browserName"] == "chrome" and capabilities["pageLoadStrategy"] == "normal"
+        assert "pageLoadStrategy" not in DesiredCapabilities.CHROME
+
+        self.logger.log_exit("test_capabilities")
+
+    def test_cold_start_summary(self):
+        """
+        Test to validate the cold start times are summarised per browser
+        :return:
+        """
+        self.logger.log_enter("test_cold_start_summary")
+
+        launcher = BrowserLauncher(LAUNCH_PROFILES["ci-fast"], {})
+        assert launcher.cold_start_summary() == {}
+        launcher.cold_start_times = {"firefox": [2.0, 1.0, 3.0], "chrome": [0.5]}
+        assert launcher.cold_start_summary() == {"firefox": {"count": 3, "min": 1.0, "mean": 2.0, "max": 3.0},
+                                                 "chrome": {"count": 1, "min": 0.5, "mean": 0.5, "max": 0.5}}
+
+        self.logger.log_exit("test_cold_start_summary")
@@ -0,0 +1,119 @@
+import pytest
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import StaleElementReferenceException
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.locator_cache import LocatorCache, CLICKABLE_SCRIPT
+
+
+class FakeDriver:
+    """
+    Driver double serving elements whose ids go stale when the page re-renders.
+    """
+    session_id = "session"
+
+    def __init__(self):
+        self.render = 0
+        self.disabled = False
+        self.commands = []
+
+    def execute(self, command, params=None):
+        self.commands.append((command, params["id"]))
+        if not params["id"].endswith("-{}".format(self.render)):
+            raise StaleElementReferenceException("stale element")
+        return {"value": None}
+
+    def execute_script(self, script, element):
+        assert script == CLICKABLE_SCRIPT
+        self.commands.append(("clickable", element.id))
+        if not element.id.endswith("-{}".format(self.render)):
+            raise StaleElementReferenceException("stale element")
+        return not self.disabled
+
+
+class FakeWaits:
+    def __init__(self):
+        self.lookups = 0
+
+    def wait_for_element(self, driver, css, clickable=False, timeout=None):
+        self.lookups += 1
+        return WebElement(driver, "{}-{}".format(css, driver.render), w3c=True)
+
+
+class TestLocatorCache:
+    logger = DocumentExplorerLogger()
+
+    def test_cache_hit(self):
+        """
+        Test to validate cached elements are not resolved again
+        :return:
+        """
+        self.logger.log_enter("test_cache_hit")
+
+        driver, waits = FakeDriver(), FakeWaits()
+        cache = LocatorCache(waits)
+        first = cache.find(driver, ".search", clickable=True)
+        assert cache.find(driver, ".search", clickable=True) is first
+        first.click()
+        assert waits.lookups == 1
+        assert cache.summary()["hit_rate"] == 0.5
+        # the find, is_displayed and is_enabled calls of the lookup are replaced by one clickable check
+        assert cache.stats["saved_calls"] == 2
+
+        cache.invalidate(driver)
+        cache.find(driver, ".search", clickable=True)
+        assert waits.lookups == 2
+
+        self.logger.log_exit("test_cache_hit")
+
+    def test_disabled_cached_element_is_resolved_again(self):
+        """
+        Test to validate a cached clickable element which is disabled (or stale) is waited for again, and a presence
+        lookup is served from the cache without a call
+        :return:
+        """
+        self.logger.log_enter("test_disabled_cached_element_is_resolved_again")
+
+        driver, waits = FakeDriver(), FakeWaits()
+        cache = LocatorCache(waits)
+        cache.find(driver, ".submit", clickable=True)
+        driver.disabled = True
+        cache.find(driver, ".submit", clickable=True)
+        assert waits.lookups == 2
+        assert cache.stats["hits"] == 0 and cache.stats["saved_calls"] == 0
+
+        driver.disabled = False
+        driver.render += 1
+        cache.find(driver, ".submit", clickable=True)
+        assert waits.lookups == 3
+
+        commands = len(driver.commands)
+        cache.find(driver, ".search")
+        cache.find(driver, ".search")
+        assert len(driver.commands) == commands
+        assert cache.stats["saved_calls"] == 1
+
+        self.logger.log_exit("test_disabled_cached_element_is_resolved_again")
+
+    def test_stale_element_heals(self):
+        """
+        Test to validate a stale element is re-resolved and the command retried, unless healing is off
+        :return:
+        """
+        self.logger.log_enter("test_stale_element_heals")
+
+        driver, waits = FakeDriver(), FakeWaits()
+        cache = LocatorCache(waits)
+        element = cache.find(driver, ".search")
+        driver.render += 1
+        element.clear()
+        assert element.id == ".search-1"
+        assert cache.stats["healed"] == 1
+        assert driver.commands[-2:] == [("clearElement", ".search-0"), ("clearElement", ".search-1")]
+
+        button = cache.find(driver, ".upload", clickable=True, heal=False)
+        driver.render += 1
+        with pytest.raises(StaleElementReferenceException):
+            button.click()
+
+        self.logger.log_exit("test_stale_element_heals")
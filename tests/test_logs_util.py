@@ -0,0 +1,73 @@
+import json
+import logging
+
+from utils.logs_util import DocumentExplorerLogger, JsonFormatter, LogSampler, LazyValue
+
+
+class TestLogsUtil:
+    logger = DocumentExplorerLogger()
+
+    def test_sampler_every(self):
+        """
+        Test to validate the sampler keeps one record out of every N
+        :return:
+        """
+        self.logger.log_enter("test_sampler_every")
+
+        sampler = LogSampler(every=10)
+        kept = [sampler.allow() for _ in range(100)]
+        assert kept.count(True) == 10
+        assert kept[0]
+        assert sampler.dropped == 90
+
+        self.logger.log_exit("test_sampler_every")
+
+    def test_sampler_rate_limit(self):
+        """
+        Test to validate the sampler keeps at most per_second records in a burst
+        :return:
+        """
+        self.logger.log_enter("test_sampler_rate_limit")
+
+        sampler = LogSampler(per_second=5)
+        kept = [sampler.allow() for _ in range(50)]
+        assert kept.count(True) == 5
+
+        self.logger.log_exit("test_sampler_rate_limit")
+
+    def test_lazy_value_only_computed_when_kept(self):
+        """
+        Test to validate lazy arguments of sampled statements are only computed for the kept records
+        :return:
+        """
+        self.logger.log_enter("test_lazy_value_only_computed_when_kept")
+
+        reads = []
+        level = self.logger.log.level
+        self.logger.log.setLevel(logging.DEBUG)
+        DocumentExplorerLogger.configure_sampling("test_lazy_value", every=10)
+        try:
+            for row in range(100):
+                self.logger.log_sampled("test_lazy_value", "test_lazy_value row: %s",
+                                        LazyValue(lambda: reads.append(row) or row))
+        finally:
+            self.logger.log.setLevel(level)
+            del DocumentExplorerLogger.samplers["test_lazy_value"]
+        assert reads == list(range(0, 100, 10))
+
+        self.logger.log_exit("test_lazy_value_only_computed_when_kept")
+
+    def test_json_formatter(self):
+        """
+        Test to validate lazily formatted arguments end up in the JSON message
+        :return:
+        """
+        self.logger.log_enter("test_json_formatter")
+
+        record = logging.LogRecord("DocumentExplorerTest", logging.INFO, __file__, 1,
+                                   "DriverUtils: parse_table rows: %s", (3,), None)
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["message"] == "DriverUtils: parse_table rows: 3"
+        assert entry["level"] == "INFO"
+
+        self.logger.log_exit("test_json_formatter")
@@ -0,0 +1,115 @@
+from utils.logs_util import DocumentExplorerLogger
+from utils.driver_utils import DriverUtils
+from utils.network_monitor import NetworkMonitor, INSTALL_SCRIPT, WAIT_FOR_IDLE_SCRIPT, RECORDS_SCRIPT
+from utils.wait_utils import WaitUtils, DEFAULT_SCRIPT_TIMEOUT
+
+RECORDS = [
+    {"id": 0, "method": "GET", "url": "/api/collections?search=a", "status": 200, "duration": 120.0},
+    {"id": 1, "method": "GET", "url": "/api/collections?search=ab", "status": 200, "duration": 80.0},
+    {"id": 2, "method": "POST", "url": "/api/collections", "status": 409, "duration": 40.0},
+    {"id": 3, "method": "GET", "url": "/api/documents", "status": 0, "duration": 10.0},
+]
+
+
+class FakeNetworkDriver:
+    """
+    Driver double answering the network monitor scripts with a fixed idle result and record list.
+    """
+
+    def __init__(self, result, started=2):
+        self.result = result
+        self.started = started
+        self.async_scripts = []
+        self.script_timeouts = []
+
+    def set_script_timeout(self, timeout):
+        self.script_timeouts.append(timeout)
+
+    def execute_script(self, script, *args):
+        if script == INSTALL_SCRIPT:
+            return self.started
+        assert script == RECORDS_SCRIPT
+        return [record for record in RECORDS if record["id"] >= args[0]]
+
+    def execute_async_script(self, script, *args):
+        assert script == WAIT_FOR_IDLE_SCRIPT
+        self.async_scripts.append(args)
+        return self.result
+
+
+class TestNetworkMonitor:
+    logger = DocumentExplorerLogger()
+
+    def test_network_idle(self):
+        """
+        Test to validate an idle network is reported and recorded as a succeeded wait, and a short wait does not
+        touch the script timeout
+        :return:
+        """
+        self.logger.log_enter("test_network_idle")
+
+        waits = WaitUtils()
+        driver = FakeNetworkDriver({"idle": True, "fired": True, "started": 3, "inflight": 0})
+        assert NetworkMonitor(waits).wait_for_network_idle(driver, since=2, timeout=5)
+        assert driver.async_scripts == [(100, 2, 5000, -1)]
+        assert driver.script_timeouts == []
+        assert [(timing["name"], timing["succeeded"]) for timing in waits.wait_timings] == \
+            [("wait_for_network_idle", True)]
+
+        self.logger.log_exit("test_network_idle")
+
+    def test_network_timeout(self):
+        """
+        Test to validate a network still busy after the timeout is reported and recorded as a timed out wait, with
+        the script timeout raised for the wait and restored after it
+        :return:
+        """
+        self.logger.log_enter("test_network_timeout")
+
+        waits = WaitUtils()
+        driver = FakeNetworkDriver({"idle": False, "fired": True, "started": 3, "inflight": 1})
+        assert not NetworkMonitor(waits).wait_for_network_idle(driver, since=2, timeout=60)
+        assert driver.async_scripts == [(100, 2, 60000, -1)]
+        assert driver.script_timeouts == [65, DEFAULT_SCRIPT_TIMEOUT]
+        assert waits.wait_timings[0]["succeeded"] is False
+
+        self.logger.log_exit("test_network_timeout")
+
+    def test_no_request_fired(self):
+        """
+        Test to validate wait_for_requests gives the wait a start window, configurable per call, and an action with
+        no request seen in it is not reported as finished, so the caller keeps waiting for the table change
+        :return:
+        """
+        self.logger.log_enter("test_no_request_fired")
+
+        driver_utils = DriverUtils()
+        driver = FakeNetworkDriver({"idle": True, "fired": False, "started": 4, "inflight": 0}, started=4)
+        assert not driver_utils.wait_for_requests(driver, 4)
+        assert not driver_utils.wait_for_requests(driver, 4, start_ms=2500)
+        assert driver.async_scripts == [(100, 4, driver_utils.waits.change_timeout * 1000, start_ms)
+                                        for start_ms in (driver_utils.network.start_ms, 2500)]
+
+        driver = FakeNetworkDriver({"idle": True, "fired": True, "started": 4, "inflight": 0})
+        assert driver_utils.wait_for_requests(driver, 2)
+        driver = FakeNetworkDriver({"idle": False, "fired": True, "started": 4, "inflight": 1})
+        assert not driver_utils.wait_for_requests(driver, 2)
+
+        self.logger.log_exit("test_no_request_fired")
+
+    def test_request_summary(self):
+        """
+        Test to validate the request timings are aggregated by method and path, counting failed statuses as errors
+        :return:
+        """
+        self.logger.log_enter("test_request_summary")
+
+        network = NetworkMonitor(WaitUtils())
+        assert len(network.requests(FakeNetworkDriver(None), since=0)) == 4
+        summary = network.request_summary()
+        assert sorted(summary) == ["GET /api/collections", "GET /api/documents", "POST /api/collections"]
+        assert summary["GET /api/collections"] == {"count": 2, "total": 0.2, "max": 0.12, "errors": 0}
+        assert summary["POST /api/collections"]["errors"] == 1
+        assert summary["GET /api/documents"]["errors"] == 1
+
+        self.logger.log_exit("test_request_summary")
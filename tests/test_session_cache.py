@@ -0,0 +1,151 @@
+import time
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.driver_utils import DriverUtils
+from utils.session_cache import SessionCache, STORAGE_DUMP_SCRIPT, STORAGE_RESTORE_SCRIPT
+
+APP_URL = "http://app.example:8080/document-explorer"
+LOGIN_URL = "http://idp.example:8443/auth/realms/test/protocol/openid-connect/auth?client_id=de"
+
+
+class FakeElement:
+    def __init__(self, driver, element_id):
+        self.driver = driver
+        self.element_id = element_id
+
+    def send_keys(self, value):
+        pass
+
+    def click(self):
+        if self.element_id == "kc-login":
+            self.driver.log_in()
+
+
+class FakeSessionDriver:
+    """
+    Driver double with a cookie jar scoped by host and path, redirecting to the login page until logged in.
+    """
+    session_id = "fake-session"
+
+    def __init__(self, failing_host=None):
+        self.current_url = "about:blank"
+        self.cookies = []
+        self.storage = {"local_storage": {}, "session_storage": {}}
+        self.failing_host = failing_host
+        self.visited = []
+
+    def _matches(self, cookie):
+        parts = urlsplit(self.current_url)
+        return cookie["domain"] == parts.hostname and parts.path.startswith(cookie["path"])
+
+    def logged_in(self):
+        return any(cookie["name"] == "DE_SESSION" for cookie in self.cookies)
+
+    def log_in(self):
+        self.cookies.append({"name": "DE_SESSION", "value": "app", "domain": "app.example", "path": "/"})
+        self.cookies.append({"name": "KEYCLOAK_IDENTITY", "value": "idp", "domain": "idp.example",
+                             "path": "/auth/realms/test/"})
+        self.storage["local_storage"]["token"] = "app-token"
+        self.current_url = APP_URL
+
+    def get(self, url):
+        self.visited.append(url)
+        self.current_url = url
+        if url == APP_URL and not self.logged_in():
+            self.current_url = LOGIN_URL
+
+    def get_cookies(self):
+        if urlsplit(self.current_url).hostname == self.failing_host:
+            raise WebDriverException("cookies of {} not readable".format(self.failing_host))
+        return [dict(cookie) for cookie in self.cookies if self._matches(cookie)]
+
+    def add_cookie(self, cookie):
+        assert cookie["domain"] == urlsplit(self.current_url).hostname
+        self.cookies.append(dict(cookie))
+
+    def delete_all_cookies(self):
+        self.cookies = []
+
+    def execute_script(self, script, *args):
+        if script == STORAGE_DUMP_SCRIPT:
+            return {name: dict(items) for name, items in self.storage.items()}
+        assert script == STORAGE_RESTORE_SCRIPT
+        self.storage = {"local_storage": dict(args[0]), "session_storage": dict(args[1])}
+
+    def find_element_by_id(self, element_id):
+        return FakeElement(self, element_id)
+
+
+class TestSessionCache:
+    logger = DocumentExplorerLogger()
+
+    def test_save_and_restore_path_scoped_cookies(self, tmp_path):
+        """
+        Test to validate the identity provider cookies scoped to the realm path are saved and restored with the
+        application session
+        :param tmp_path:
+        :return:
+        """
+        self.logger.log_enter("test_save_and_restore_path_scoped_cookies")
+
+        cache = SessionCache(cache_file=tmp_path.joinpath("session.json"))
+        driver = FakeSessionDriver()
+        driver.log_in()
+        cache.save(driver, APP_URL, "test_user", extra_urls=[LOGIN_URL])
+        assert driver.current_url == APP_URL
+        assert "http://idp.example:8443/auth/realms/test/protocol/openid-connect/" in driver.visited
+
+        restored = FakeSessionDriver()
+        assert cache.restore(restored, APP_URL, "test_user")
+        assert restored.logged_in() and restored.current_url == APP_URL
+        assert [cookie["path"] for cookie in restored.cookies if cookie["domain"] == "idp.example"] == \
+            ["/auth/realms/test/"]
+        assert restored.storage["local_storage"] == {"token": "app-token"}
+
+        self.logger.log_exit("test_save_and_restore_path_scoped_cookies")
+
+    def test_load_rejects_other_user_and_expired_session(self, tmp_path):
+        """
+        Test to validate a session saved for another user, or expired, is not loaded
+        :param tmp_path:
+        :return:
+        """
+        self.logger.log_enter("test_load_rejects_other_user_and_expired_session")
+
+        cache = SessionCache(cache_file=tmp_path.joinpath("session.json"), max_age=0.2)
+        driver = FakeSessionDriver()
+        driver.log_in()
+        cache.save(driver, APP_URL, "test_user")
+        assert cache.load(APP_URL, "test_user")["cookies"]
+        assert cache.load(APP_URL, "other_user") is None
+        time.sleep(0.3)
+        assert cache.load(APP_URL, "test_user") is None
+        assert not cache.restore(FakeSessionDriver(), APP_URL, "test_user")
+
+        self.logger.log_exit("test_load_rejects_other_user_and_expired_session")
+
+    def test_failed_save_falls_back_to_login(self, tmp_path):
+        """
+        Test to validate a session which can not be saved does not break the login, and nothing is cached
+        :param tmp_path:
+        :return:
+        """
+        self.logger.log_enter("test_failed_save_falls_back_to_login")
+
+        cache = SessionCache(cache_file=tmp_path.joinpath("session.json"))
+        driver = FakeSessionDriver(failing_host="idp.example")
+        driver_utils = DriverUtils()
+        logins = []
+        login = driver_utils.login
+        driver_utils.login = lambda *args: logins.append(args) or login(*args)
+        driver_utils.is_logged_in = lambda driver, url: False
+
+        assert not driver_utils.login_with_session(driver, APP_URL, "test_user", "test_password", cache)
+        assert len(logins) == 2
+        assert driver.current_url == APP_URL
+        assert not cache.cache_file.exists()
+
+        self.logger.log_exit("test_failed_save_falls_back_to_login")
@@ -0,0 +1,116 @@
+import json
+import pytest
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import build_opener, HTTPCookieProcessor, Request
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.document_explorer import Collections, Documents
+from utils.standin_server import StandinServer
+
+
+@pytest.fixture(scope="class")
+def standin(request):
+    """
+    Fixture for a stand-in server and a logged in HTTP opener
+    :param request:
+    :return:
+    """
+    server = StandinServer(seed={"abhishek": ["ReferenceCardForMac.pdf"], "Beta": [], "alpha": []}).start()
+    opener = build_opener(HTTPCookieProcessor(CookieJar()))
+    opener.open(server.app_url + "/auth/login?redirect=/document-explorer", urlencode({
+        "username": server.username, "password": server.password}).encode())
+    request.cls.server = server
+    request.cls.opener = opener
+    yield
+    server.stop()
+
+
+@pytest.mark.usefixtures("standin")
+class TestStandinServer:
+    logger = DocumentExplorerLogger()
+
+    def call(self, method, path, body=None, headers=None):
+        request = Request(self.server.app_url + path, data=body, method=method, headers=headers or {})
+        try:
+            response = self.opener.open(request)
+        except HTTPError as e:
+            response = e
+        text = response.read()
+        return response.getcode(), json.loads(text) if text else None
+
+    def test_login_required(self):
+        """
+        Test to validate unauthenticated requests are redirected to the login form or rejected
+        :return:
+        """
+        self.logger.log_enter("test_login_required")
+
+        page = build_opener().open(self.server.app_url + "/document-explorer")
+        assert "/auth/login" in page.geturl()
+        assert b'id="kc-login"' in page.read()
+        with pytest.raises(HTTPError) as error:
+            build_opener().open(self.server.app_url + "/api/collections")
+        assert error.value.code == 401
+
+        self.logger.log_exit("test_login_required")
+
+    def test_collection_create(self):
+        """
+        Test to validate collection create and duplicate create error
+        :return:
+        """
+        self.logger.log_enter("test_collection_create")
+
+        body = json.dumps({"name": "test_collection"}).encode()
+        status, data = self.call("POST", "/api/collections", body)
+        assert status == 201 and data["name"] == "test_collection"
+        status, data = self.call("POST", "/api/collections", body)
+        assert status == 409 and data["error"] == Collections.create_error_message
+        assert self.call("DELETE", "/api/collections/test_collection")[0] == 204
+
+        self.logger.log_exit("test_collection_create")
+
+    @pytest.mark.parametrize("query, expected_names, expected_total", [
+        ("search=ABHI", ["abhishek"], 1),
+        ("sort=asc", ["abhishek", "alpha", "Beta"], 3),
+        ("sort=desc&page_size=2&page=2", ["abhishek"], 3),
+    ])
+    def test_collection_list(self, query, expected_names, expected_total):
+        """
+        Test to validate collection search, sort and paging
+        :param query: query string of the list request
+        :param expected_names: expected collection names of the page
+        :param expected_total: expected total number of collections
+        :return:
+        """
+        self.logger.log_enter("test_collection_list")
+
+        status, data = self.call("GET", "/api/collections?" + query)
+        assert status == 200
+        assert [item["name"] for item in data["items"]] == expected_names
+        assert data["total"] == expected_total
+
+        self.logger.log_exit("test_collection_list")
+
+    @pytest.mark.parametrize("document_name, expected_status, expected_message", [
+        (Documents.pdf_test_file_name, 201, Documents.document_upload_success_msg),
+        (Documents.tar_test_file_name, 415, Documents.document_upload_failure_msg),
+    ])
+    def test_document_upload(self, document_name, expected_status, expected_message):
+        """
+        Test to validate document upload of supported and unsupported file types
+        :param document_name: name of the uploaded document
+        :param expected_status: expected HTTP status
+        :param expected_message: expected upload status message
+        :return:
+        """
+        self.logger.log_enter("test_document_upload")
+
+        status, data = self.call("POST", "/api/collections/abhishek/documents?" + urlencode({"name": document_name}),
+                                 b"%PDF-1.4\n", {"Content-Type": "application/octet-stream"})
+        assert status == expected_status
+        assert data["status"] == expected_message
+
+        self.logger.log_exit("test_document_upload")
@@ -0,0 +1,63 @@
+import re
+import struct
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.synthetic_documents import write_pdf, generate_documents
+
+
+class TestSyntheticDocuments:
+    logger = DocumentExplorerLogger()
+
+    def test_pdf_size_and_xref(self, tmp_path):
+        """
+        Test to validate the synthetic PDF has the requested size and its xref points at every object
+        :param tmp_path:
+        :return:
+        """
+        self.logger.log_enter("test_pdf_size_and_xref")
+
+        path = tmp_path.joinpath("synthetic.pdf")
+        assert write_pdf(path, 200000, pages=3, title="Übersicht (scan)") == 200000
+        data = path.read_bytes()
+        assert len(data) == 200000 and data.startswith(b"%PDF-1.4") and data.endswith(b"%%EOF\n")
+
+        startxref = int(re.search(rb"startxref\n(\d+)\n", data[-64:]).group(1))
+        assert data[startxref:].startswith(b"xref\n0 11\n")
+        offsets = re.findall(rb"(\d{10}) 00000 n ", data[startxref:])
+        for object_id, offset in enumerate(offsets, 1):
+            assert data[int(offset):].startswith(b"%d 0 obj" % object_id)
+        assert b"/Count 3" in data
+
+        self.logger.log_exit("test_pdf_size_and_xref")
+
+    def test_tiff_pages_and_strips(self, tmp_path):
+        """
+        Test to validate the synthetic TIFFs have the requested size and page count, and every strip is in the file
+        :param tmp_path:
+        :return:
+        """
+        self.logger.log_enter("test_tiff_pages_and_strips")
+
+        paths = generate_documents(tmp_path, 2, 3000001, pages=4, suffix=".tif")
+        assert [path.name for path in paths] == ["synthetic_3000001_0000.tif", "synthetic_3000001_0001.tif"]
+        assert paths[0].read_bytes()[:1000] != paths[1].read_bytes()[:1000]
+
+        data = paths[0].read_bytes()
+        assert len(data) == 3000001 and data.startswith(b"II*\x00")
+        pages = []
+        offset = struct.unpack_from("<I", data, 4)[0]
+        while offset:
+            assert offset % 2 == 0
+            count = struct.unpack_from("<H", data, offset)[0]
+            tags = {}
+            for index in range(count):
+                tag, field_type, _, value = struct.unpack_from("<HHII", data, offset + 2 + 12 * index)
+                tags[tag] = value & 0xFFFF if field_type == 3 else value
+            assert tags[273] + tags[279] <= len(data)
+            assert tags[256] * tags[257] == tags[279]
+            pages.append(tags)
+            offset = struct.unpack_from("<I", data, offset + 2 + 12 * count)[0]
+        assert len(pages) == 4
+        assert [tags[297] for tags in pages] == [0, 1, 2, 3]
+
+        self.logger.log_exit("test_tiff_pages_and_strips")
@@ -0,0 +1,65 @@
+from utils.logs_util import DocumentExplorerLogger
+from utils.table_diff import TableDiffer, diff_row_hashes, ROW_HASHES_SCRIPT, ROWS_BY_INDEX_SCRIPT
+
+
+class FakeTableDriver:
+    """
+    Driver double answering the table diff scripts from a list of rows, recording the fetched rows.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.fetched = []
+
+    def execute_script(self, script, table_css, argument):
+        if script == ROW_HASHES_SCRIPT:
+            return {"rows": [[hash(row[argument]), hash("\t".join(row))] for row in self.rows],
+                    "fingerprint": str(len(self.rows))}
+        if script == ROWS_BY_INDEX_SCRIPT:
+            self.fetched.extend(argument)
+            return [list(self.rows[index]) for index in argument]
+        raise AssertionError("unexpected script")
+
+
+class TestTableDiff:
+    logger = DocumentExplorerLogger()
+
+    def test_diff_row_hashes(self):
+        """
+        Test to validate duplicates and moved rows are unchanged, and changed keys are paired as modified
+        :return:
+        """
+        self.logger.log_enter("test_diff_row_hashes")
+
+        before = [["a", 1], ["a", 1], ["b", 2], ["c", 3], ["d", 4]]
+        after = [["b", 2], ["a", 1], ["c", 30], ["e", 5], ["a", 1], ["a", 1]]
+        inserted, removed, modified, unchanged = diff_row_hashes(before, after)
+        assert unchanged == 3
+        assert modified == [(3, 2)]
+        assert inserted == [3, 5]
+        assert removed == [4]
+
+        self.logger.log_exit("test_diff_row_hashes")
+
+    def test_diff_fetches_changed_rows_only(self):
+        """
+        Test to validate only the inserted and modified rows are fetched after the operation
+        :return:
+        """
+        self.logger.log_enter("test_diff_fetches_changed_rows_only")
+
+        rows = [["collection_{:04d}".format(i), "Done"] for i in range(1000)]
+        driver = FakeTableDriver(rows)
+        differ = TableDiffer(waits=None)
+        before = differ.fingerprint(driver, ".table")
+        driver.rows = rows[:500] + [["test_collection", "Processing"]] + rows[501:]
+        driver.rows[10] = ["collection_0010", "Processing"]
+
+        table_diff = differ.diff(driver, before)
+        assert table_diff.inserted_names() == ["test_collection"]
+        assert table_diff.modified_names() == ["collection_0010"]
+        assert table_diff.removed == [500]
+        assert table_diff.unchanged == 998
+        assert sorted(driver.fetched) == [10, 500]
+
+        self.logger.log_exit("test_diff_fetches_changed_rows_only")
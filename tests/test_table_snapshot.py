@@ -0,0 +1,112 @@
+import tracemalloc
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.document_explorer import DocumentExplorer, Documents
+from utils.driver_utils import DriverUtils, TABLE_EXTRACT_SCRIPT
+from utils.table_snapshot import TableSnapshot
+
+
+def build_rows(count):
+    return [["document_{:05d}.pdf".format(i), "2019-0{}-01".format(i % 9 + 1), "{} KB".format(i)]
+            for i in range(count)]
+
+
+class FakeTableDriver:
+    """
+    Driver double answering the table extraction script with a document table: State, Name, Size, Uploaded.
+    """
+    headers = ["State", "Name", "Size", "Uploaded"]
+    rows = [["Processed", "claim.pdf", "10 KB", "2019-01-01"], ["Queued", "scan.tif", "2 KB", "2019-01-02"]]
+
+    def execute_script(self, script, table_css, columns, attributes, with_headers=False):
+        assert script == TABLE_EXTRACT_SCRIPT and with_headers
+        if columns is None:
+            return {"headers": list(self.headers), "rows": [list(row) for row in self.rows]}
+        return {"headers": [self.headers[i] for i in columns], "rows": [[row[i] for i in columns] for row in self.rows]}
+
+
+class TestTableSnapshot:
+    logger = DocumentExplorerLogger()
+
+    def test_duplicate_rows_and_headers(self):
+        """
+        Test to validate identical rows are kept and columns are looked up by header name
+        :return:
+        """
+        self.logger.log_enter("test_duplicate_rows_and_headers")
+
+        snapshot = TableSnapshot.from_rows([["claim.pdf", "10 KB"], ["claim.pdf", "10 KB"], ["card.pdf", "2 KB", "x"]],
+                                           headers=["Name ", "Size"])
+        assert len(snapshot) == 3
+        assert snapshot.headers == ["Name ", "Size", "2"]
+        assert snapshot.column("name") == ["claim.pdf", "claim.pdf", "card.pdf"]
+        assert snapshot[1]["Size"] == "10 KB" and snapshot[1] == ["claim.pdf", "10 KB", None]
+        assert "claim.pdf" in snapshot and "missing.pdf" not in snapshot
+        assert snapshot.count("claim.pdf") == 2
+        assert [row.index for row in snapshot.rows_named("claim.pdf")] == [0, 1]
+        assert snapshot[-1].as_dict() == {"Name ": "card.pdf", "Size": "2 KB", "2": "x"}
+
+        snapshot.append(["new.pdf", "1 KB"])
+        assert "new.pdf" in snapshot
+
+        self.logger.log_exit("test_duplicate_rows_and_headers")
+
+    def test_document_explorer_adapters(self):
+        """
+        Test to validate get_name_list/check_if_name_exist accept snapshots and the legacy dicts
+        :return:
+        """
+        self.logger.log_enter("test_document_explorer_adapters")
+
+        explorer = DocumentExplorer()
+        snapshot = TableSnapshot.from_rows(build_rows(3), headers=["Name", "Modified", "Size"])
+        assert explorer.get_name_list(snapshot) == snapshot.column(0)
+        assert explorer.get_name_list(snapshot, "size") == ["0 KB", "1 KB", "2 KB"]
+        assert explorer.get_name_list(TableSnapshot.from_rows([])) == []
+        assert explorer.check_if_name_exist("document_00001.pdf", snapshot)
+        assert explorer.get_name_list({"row a": ["a", "1"], "row b": ["b", "2"]}, 1) == ["1", "2"]
+
+        self.logger.log_exit("test_document_explorer_adapters")
+
+    def test_memory_per_row(self):
+        """
+        Test to validate the snapshot memory grows with the cell references only, not per row objects
+        :return:
+        """
+        self.logger.log_enter("test_memory_per_row")
+
+        rows = build_rows(20000)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            snapshot = TableSnapshot.from_rows(rows, headers=["Name", "Modified", "Size"])
+            assert "document_19999.pdf" in snapshot
+            per_row = (tracemalloc.get_traced_memory()[0] - before) / len(snapshot)
+        finally:
+            tracemalloc.stop()
+        # three list slots plus the names index entry, a dict keyed by row text alone costs more
+        assert per_row < 100
+
+        self.logger.log_exit("test_memory_per_row")
+
+    def test_document_table_name_column(self):
+        """
+        Test to validate the name index of a document table snapshot is built on its Name column, not on State
+        :return:
+        """
+        self.logger.log_enter("test_document_table_name_column")
+
+        document = Documents()
+        driver_utils = DriverUtils()
+        snapshot = driver_utils.extract_snapshot(FakeTableDriver(), document.document_table_css,
+                                                 name_column=document.document_table_name_column)
+        assert snapshot.names == ["claim.pdf", "scan.tif"]
+        assert document.check_if_name_exist("claim.pdf", snapshot)
+        assert not document.check_if_name_exist("Processed", snapshot)
+
+        # by header name, also when only some columns are extracted
+        snapshot = driver_utils.extract_snapshot(FakeTableDriver(), document.document_table_css, columns=[2, 1],
+                                                 name_column="name")
+        assert snapshot.names == ["claim.pdf", "scan.tif"] and snapshot.count("scan.tif") == 1
+
+        self.logger.log_exit("test_document_table_name_column")
@@ -0,0 +1,77 @@
+from utils.logs_util import DocumentExplorerLogger
+from utils.tracing import SpanTracer
+
+
+class TestTracing:
+    logger = DocumentExplorerLogger()
+
+    def test_nested_spans(self):
+        """
+        Test to validate nested spans, attributes and self time
+        :return:
+        """
+        self.logger.log_enter("test_nested_spans")
+
+        tracer = SpanTracer()
+        tracer.begin_test("test_a")
+        tracer.start_span("DriverUtils: parse_table", {"selector": ".table"})
+        with tracer.span("WaitUtils: wait_for_element"):
+            pass
+        outer = tracer.end_span("DriverUtils: parse_table", {"rows": 3})
+        tracer.end_test()
+
+        assert [span.name for span in tracer.spans] == ["WaitUtils: wait_for_element", "DriverUtils: parse_table"]
+        assert outer.attributes == {"selector": ".table", "rows": 3}
+        assert outer.test_name == "test_a"
+        assert tracer.spans[0].depth == 1
+        assert 0 <= outer.self_time <= outer.duration
+        assert set(tracer.test_summary()["test_a"]["spans"]) == {"WaitUtils: wait_for_element",
+                                                                 "DriverUtils: parse_table"}
+
+        self.logger.log_exit("test_nested_spans")
+
+    def test_unclosed_spans(self):
+        """
+        Test to validate spans skipped by an exception are closed with their parent or at the end of the test
+        :return:
+        """
+        self.logger.log_enter("test_unclosed_spans")
+
+        tracer = SpanTracer()
+        tracer.begin_test("test_b")
+        tracer.start_span("outer")
+        tracer.start_span("inner")
+        assert tracer.end_span("missing") is None
+        tracer.end_span("outer")
+        tracer.start_span("left_open")
+        tracer.end_test()
+
+        spans = {span.name: span for span in tracer.spans}
+        assert spans["inner"].attributes == {"unclosed": True}
+        assert "unclosed" not in spans["outer"].attributes
+        assert spans["left_open"].attributes == {"unclosed": True}
+
+        self.logger.log_exit("test_unclosed_spans")
+
+    def test_chrome_trace(self):
+        """
+        Test to validate the Chrome trace export
+        :return:
+        """
+        self.logger.log_enter("test_chrome_trace")
+
+        tracer = SpanTracer()
+        with tracer.span("DriverUtils: login", url="http://localhost"):
+            pass
+        trace = tracer.chrome_trace(process_name="pytest master")
+        metadata, event = trace["traceEvents"]
+        assert metadata["ph"] == "M"
+        assert event["ph"] == "X" and event["cat"] == "DriverUtils"
+        assert event["dur"] >= 0 and event["args"] == {"url": "http://localhost"}
+
+        disabled = SpanTracer(enabled=False)
+        with disabled.span("DriverUtils: login"):
+            pass
+        assert not disabled.spans
+
+        self.logger.log_exit("test_chrome_trace")
@@ -0,0 +1,85 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.upload_watcher import UploadWatcher, INSTALL_SCRIPT, EVENTS_SCRIPT, WAIT_FOR_ROWS_SCRIPT
+from utils.wait_utils import DEFAULT_SCRIPT_TIMEOUT
+
+EVENTS = [
+    {"time": 1000, "kind": "status", "name": None, "status": "uploading"},
+    {"time": 1000, "kind": "row", "name": "claim.pdf", "status": "Queued"},
+    {"time": 1250, "kind": "row", "name": "claim.pdf", "status": "Uploading"},
+    {"time": 1400, "kind": "row", "name": "scan.tif", "status": "Queued"},
+    {"time": 3000, "kind": "row", "name": "claim.pdf", "status": "Succeeded"},
+    {"time": 3100, "kind": "status", "name": None, "status": "1 of 2 finished uploading"},
+]
+
+
+class FakeWatcherDriver:
+    """
+    Driver double answering the upload watcher scripts from a fixed event list, recording the script timeouts.
+    """
+
+    def __init__(self, script_error=None):
+        self.script_error = script_error
+        self.script_timeouts = []
+        self.async_scripts = []
+
+    def set_script_timeout(self, timeout):
+        self.script_timeouts.append(timeout)
+
+    def execute_script(self, script, *args):
+        if script == INSTALL_SCRIPT:
+            return len(EVENTS)
+        assert script == EVENTS_SCRIPT
+        return EVENTS[args[0]:]
+
+    def execute_async_script(self, script, *args):
+        self.async_scripts.append((script, args))
+        if self.script_error:
+            raise self.script_error
+        return {"timed_out": False, "rows": {"claim.pdf": "Succeeded"}}
+
+
+class TestUploadWatcher:
+    logger = DocumentExplorerLogger()
+    watcher = UploadWatcher(".status", ".row", ".name", ".rowStatus")
+
+    def test_script_timeout_restored(self):
+        """
+        Test to validate a long wait raises the script timeout and restores the default, also when the wait fails,
+        and a short wait does not touch it
+        :return:
+        """
+        self.logger.log_enter("test_script_timeout_restored")
+
+        driver = FakeWatcherDriver()
+        result = self.watcher.wait_for_rows(driver, ["claim.pdf"], ["Queued", "Uploading"], 0, timeout=300)
+        assert result["rows"] == {"claim.pdf": "Succeeded"}
+        assert driver.async_scripts[0] == (WAIT_FOR_ROWS_SCRIPT, (["claim.pdf"], ["Queued", "Uploading"], 0, 300000))
+        assert driver.script_timeouts == [305, DEFAULT_SCRIPT_TIMEOUT]
+
+        driver = FakeWatcherDriver(script_error=TimeoutException("script timeout"))
+        with pytest.raises(TimeoutException):
+            self.watcher.wait_for_status(driver, "finished uploading", timeout=60)
+        assert driver.script_timeouts == [65, DEFAULT_SCRIPT_TIMEOUT]
+
+        driver = FakeWatcherDriver()
+        self.watcher.wait_for_status(driver, "finished uploading", timeout=10)
+        assert driver.script_timeouts == []
+
+        self.logger.log_exit("test_script_timeout_restored")
+
+    def test_row_latencies(self):
+        """
+        Test to validate per file latencies are taken from the first to the last row transition
+        :return:
+        """
+        self.logger.log_enter("test_row_latencies")
+
+        latencies = self.watcher.row_latencies(FakeWatcherDriver(), since=1)
+        assert latencies["claim.pdf"]["latency"] == 2.0
+        assert [status for status, _ in latencies["claim.pdf"]["transitions"]] == ["Queued", "Uploading", "Succeeded"]
+        assert latencies["scan.tif"]["latency"] == 0.0
+
+        self.logger.log_exit("test_row_latencies")
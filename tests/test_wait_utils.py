@@ -0,0 +1,102 @@
+import pytest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.wait_utils import WaitUtils, TABLE_FINGERPRINT_SCRIPT, DOM_QUIESCENCE_SCRIPT
+
+TABLE_CSS = ".table"
+SPINNER_CSS = ".spinner"
+
+
+class FakeSpinner:
+    def __init__(self, displayed):
+        self.displayed = displayed
+
+    def is_displayed(self):
+        return self.displayed
+
+
+class FakeWaitDriver:
+    """
+    Driver double answering the table fingerprints in turn (repeating the last one), with an optional spinner and
+    a DOM quiet for quiet_ms.
+    """
+
+    def __init__(self, fingerprints=("1:0",), spinner=None, quiet_ms=10000):
+        self.fingerprints = list(fingerprints)
+        self.spinner = spinner
+        self.quiet_ms = quiet_ms
+
+    def find_element(self, by, css):
+        if css == TABLE_CSS:
+            return object()
+        if css == SPINNER_CSS and self.spinner is not None:
+            return self.spinner
+        raise NoSuchElementException(css)
+
+    def execute_script(self, script, *args):
+        if script == TABLE_FINGERPRINT_SCRIPT:
+            return self.fingerprints.pop(0) if len(self.fingerprints) > 1 else self.fingerprints[0]
+        assert script == DOM_QUIESCENCE_SCRIPT
+        return self.quiet_ms
+
+
+class TestWaitUtils:
+    logger = DocumentExplorerLogger()
+
+    def test_table_change_and_timeout(self):
+        """
+        Test to validate a table change is returned as the new fingerprint, an unchanged table times out, and
+        wait_for_table_update treats an unchanged table as settled
+        :return:
+        """
+        self.logger.log_enter("test_table_change_and_timeout")
+
+        waits = WaitUtils(timeout=0.3, poll_interval=0.01, change_timeout=0.1)
+        assert waits.wait_for_table_change(FakeWaitDriver(["3:1", "3:1", "4:2"]), TABLE_CSS, "3:1") == "4:2"
+        with pytest.raises(TimeoutException):
+            waits.wait_for_table_change(FakeWaitDriver(["3:1"]), TABLE_CSS, "3:1")
+        waits.wait_for_table_update(FakeWaitDriver(["3:1"]), TABLE_CSS, SPINNER_CSS, fingerprint="3:1")
+
+        self.logger.log_exit("test_table_change_and_timeout")
+
+    def test_spinner_and_dom_quiescence(self):
+        """
+        Test to validate a missing or hidden spinner counts as gone and a visible one times out, and the DOM has to
+        be quiet for quiet_period
+        :return:
+        """
+        self.logger.log_enter("test_spinner_and_dom_quiescence")
+
+        waits = WaitUtils(timeout=0.2, poll_interval=0.01, quiet_period=0.3)
+        assert waits.wait_for_spinner_gone(FakeWaitDriver(), SPINNER_CSS)
+        assert waits.wait_for_spinner_gone(FakeWaitDriver(spinner=FakeSpinner(False)), SPINNER_CSS)
+        with pytest.raises(TimeoutException):
+            waits.wait_for_spinner_gone(FakeWaitDriver(spinner=FakeSpinner(True)), SPINNER_CSS)
+
+        assert waits.wait_for_dom_quiescence(FakeWaitDriver(quiet_ms=300))
+        with pytest.raises(TimeoutException):
+            waits.wait_for_dom_quiescence(FakeWaitDriver(quiet_ms=299))
+
+        self.logger.log_exit("test_spinner_and_dom_quiescence")
+
+    def test_record_wait(self):
+        """
+        Test to validate every wait is recorded with its outcome and aggregated by name
+        :return:
+        """
+        self.logger.log_enter("test_record_wait")
+
+        waits = WaitUtils(timeout=0.1, poll_interval=0.01, change_timeout=0.05)
+        waits.wait_for_table_update(FakeWaitDriver(["1:0"]), TABLE_CSS, SPINNER_CSS, fingerprint="1:0")
+        assert [(timing["name"], timing["succeeded"]) for timing in waits.wait_timings] == [
+            ("wait_for_element", True), ("wait_for_table_change", False), ("wait_for_spinner_gone", True),
+            ("wait_for_dom_quiescence", True)]
+        assert waits.wait_timings[1]["elapsed"] >= 0.05
+
+        summary = waits.wait_summary()
+        assert summary["wait_for_table_change"]["count"] == 1 and summary["wait_for_table_change"]["timeouts"] == 1
+        assert summary["wait_for_element"]["timeouts"] == 0
+        assert summary["wait_for_table_change"]["max"] == summary["wait_for_table_change"]["total"]
+
+        self.logger.log_exit("test_record_wait")
@@ -0,0 +1,251 @@
+import json
+import os
+from http.cookies import SimpleCookie
+from urllib.parse import quote, urlencode
+import urllib3
+
+from utils.logs_util import DocumentExplorerLogger
+
+
+class DocumentExplorerApiClient:
+    """
+    HTTP client for the Document Explorer API, used for test setup and teardown instead of the UI.
+    Connections are pooled and kept alive, authentication reuses the browser session cookies.
+    """
+    logger = DocumentExplorerLogger()
+
+    # API paths
+    collections_path = "/api/collections"
+    collection_path = "/api/collections/{collection}"
+    documents_path = "/api/collections/{collection}/documents"
+    document_path = "/api/collections/{collection}/documents/{document}"
+
+    def __init__(self, app_url, cookies=None, maxsize=10, timeout=30):
+        """
+        :param app_url: url of the application (scheme://host:port)
+        :param cookies: dict of cookie name -> value to authenticate with
+        :param maxsize: number of kept alive connections
+        :param timeout: request timeout (secs)
+        """
+        self.logger.log_enter("DocumentExplorerApiClient: __init__")
+
+        self.app_url = app_url.rstrip("/")
+        self.cookies = dict(cookies or {})
+        self.pool = urllib3.PoolManager(maxsize=maxsize, block=True, timeout=timeout, retries=False)
+        self.request_count = 0
+
+        self.logger.log_exit("DocumentExplorerApiClient: __init__")
+
+    @classmethod
+    def from_driver(cls, driver, app_url, **kwargs):
+        """
+        Method to create a client authenticated with the cookies of a logged in web driver
+        :param driver: webdriver object on the application page
+        :param app_url: url of the application
+        :return: DocumentExplorerApiClient object
+        """
+        return cls(app_url, {cookie["name"]: cookie["value"] for cookie in driver.get_cookies()}, **kwargs)
+
+    def close(self):
+        self.pool.clear()
+
+    def _update_cookies(self, response):
+        for header in response.headers.getlist("Set-Cookie"):
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+
+    def request(self, method, path, query=None, body=None, headers=None):
+        """
+        Method to send a request to the API
+        :param method: HTTP method
+        :param path: path of the API endpoint
+        :param query: dict of query parameters
+        :param body: request body (bytes or file object)
+        :param headers: dict of extra headers
+        :return: urllib3 HTTPResponse object
+        """
+        url = self.app_url + path
+        if query:
+            url += "?" + urlencode(query)
+        headers = dict(headers or {})
+        if self.cookies:
+            headers["Cookie"] = "; ".join("{}={}".format(name, value) for name, value in self.cookies.items())
+
+        self.request_count += 1
+        response = self.pool.urlopen(method, url, body=body, headers=headers, redirect=False)
+        self._update_cookies(response)
+        self.logger.log_debug("DocumentExplorerApiClient: %s %s status: %s", method, path, response.status)
+        return response
+
+    def request_json(self, method, path, query=None, data=None):
+        """
+        Method to send a JSON request to the API
+        :return: (tuple) HTTP status, decoded JSON body or None if the response is empty or not JSON
+                 (e.g. the HTML login page of an expired session)
+        """
+        body = None
+        headers = {}
+        if data is not None:
+            body = json.dumps(data).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        response = self.request(method, path, query, body, headers)
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if not response.data or not (content_type == "application/json" or content_type.endswith("+json")):
+            if response.data:
+                self.logger.log_error("DocumentExplorerApiClient: %s %s status: %s not JSON: %s", method, path,
+                                      response.status, content_type)
+            return response.status, None
+        return response.status, json.loads(response.data)
+
+    def login_form(self, login_url, username, password):
+        """
+        Method to log in by posting a username/password form and keeping the session cookie
+        :param login_url: url the login form posts to
+        :param username: username for login
+        :param password: password for login
+        :return: (boolean) True: if a session cookie was set
+                         False: if login failed
+        """
+        self.logger.log_enter("DocumentExplorerApiClient: login_form")
+
+        cookie_count = len(self.cookies)
+        response = self.pool.urlopen("POST", login_url, body=urlencode({"username": username, "password": password}),
+                                     headers={"Content-Type": "application/x-www-form-urlencoded"}, redirect=False)
+        self._update_cookies(response)
+        logged_in = len(self.cookies) > cookie_count and "error=" not in response.headers.get("Location", "")
+
+        self.logger.log_exit("DocumentExplorerApiClient: login_form")
+        return logged_in
+
+    # Collections
+
+    def list_collections(self, search="", sort="none", page=1, page_size=100):
+        """
+        Method to list a page of collections
+        :param search: search text
+        :param sort: sort order [asc, desc, none]
+        :param page: page number, starting at 1
+        :param page_size: number of collections per page
+        :return: (Dict) total and items of the page, None on error
+        """
+        status, data = self.request_json("GET", self.collections_path, {
+            "search": search, "sort": sort, "page": page, "page_size": page_size})
+        if status != 200:
+            self.logger.log_error("DocumentExplorerApiClient: list_collections status: %s", status)
+            return None
+        return data
+
+    def get_collection_names(self, search=""):
+        """
+        Method to list the names of all collections over all pages
+        :param search: search text
+        :return: (List) list of collection names
+        """
+        names = []
+        page = 1
+        while True:
+            data = self.list_collections(search=search, page=page)
+            if not data:
+                break
+            names.extend(item["name"] for item in data["items"])
+            if page * data["page_size"] >= data["total"]:
+                break
+            page += 1
+        return names
+
+    def create_collection(self, name):
+        """
+        Method to create a collection
+        :param name: name of the collection
+        :return: (boolean) True: if created
+                         False: if not created (e.g. it exists already)
+        """
+        status, data = self.request_json("POST", self.collections_path, data={"name": name})
+        if status != 201:
+            self.logger.log_info("DocumentExplorerApiClient: create_collection %s status: %s %s", name, status, data)
+        return status == 201
+
+    def ensure_collection(self, name):
+        """
+        Method to make sure a collection exists
+        :param name: name of the collection
+        :return: (boolean) True: if the collection exists
+        """
+        return self.create_collection(name) or name in self.get_collection_names(search=name)
+
+    def delete_collection(self, name):
+        """
+        Method to delete a collection
+        :param name: name of the collection
+        :return: (boolean) True: if deleted
+        """
+        response = self.request("DELETE", self.collection_path.format(collection=quote(name, safe="")))
+        return response.status in (200, 204)
+
+    # Documents
+
+    def list_documents(self, collection_name, search="", page=1, page_size=100):
+        """
+        Method to list a page of documents of a collection
+        :param collection_name: name of the collection
+        :param search: search text
+        :param page: page number, starting at 1
+        :param page_size: number of documents per page
+        :return: (Dict) total and items of the page, None on error
+        """
+        status, data = self.request_json("GET", self.documents_path.format(collection=quote(collection_name, safe="")),
+                                         {"search": search, "page": page, "page_size": page_size})
+        if status != 200:
+            self.logger.log_error("DocumentExplorerApiClient: list_documents status: %s", status)
+            return None
+        return data
+
+    def get_document_names(self, collection_name, search=""):
+        """
+        Method to list the names of all documents of a collection over all pages
+        :param collection_name: name of the collection
+        :param search: search text
+        :return: (List) list of document names
+        """
+        names = []
+        page = 1
+        while True:
+            data = self.list_documents(collection_name, search=search, page=page)
+            if not data:
+                break
+            names.extend(item["name"] for item in data["items"])
+            if page * data["page_size"] >= data["total"]:
+                break
+            page += 1
+        return names
+
+    def upload_document(self, collection_name, document_path, document_name=None):
+        """
+        Method to upload a document, the file is streamed from disk
+        :param collection_name: name of the collection
+        :param document_path: local path of the document file
+        :param document_name: name of the document, defaults to the file name
+        :return: (string) upload status message, None on error
+        """
+        document_name = document_name or os.path.basename(str(document_path))
+        with open(str(document_path), "rb") as document_file:
+            response = self.request("POST", self.documents_path.format(collection=quote(collection_name, safe="")),
+                                    {"name": document_name}, document_file, {
+                                        "Content-Type": "application/octet-stream",
+                                        "Content-Length": str(os.fstat(document_file.fileno()).st_size)})
+        data = json.loads(response.data) if response.data else {}
+        if response.status not in (201, 415):
+            self.logger.log_error("DocumentExplorerApiClient: upload_document %s status: %s %s", document_name,
+                                  response.status, data)
+        return data.get("status")
+
+    def delete_document(self, collection_name, document_name):
+        """
+        Method to delete a document
+        :param collection_name: name of the collection
+        :param document_name: name of the document
+        :return: (boolean) True: if deleted
+        """
+        response = self.request("DELETE", self.document_path.format(collection=quote(collection_name, safe=""),
+                                                                    document=quote(document_name, safe="")))
+        return response.status in (200, 204)
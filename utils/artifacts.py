@@ -0,0 +1,293 @@
+"""
+Failure artifacts: screenshot, DOM snapshot, browser console, network log and span timeline at the point a
+DriverUtils step failed.
+
+The test thread only grabs the raw data, in one script round trip and one screenshot command. Decoding,
+serialising, hashing, compression and writing are left to a background worker. Artifacts are stored once per
+content hash under objects/ and linked into a directory per test, which the pytest-html report links to.
+"""
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.tracing import tracer
+
+BASEDIR = Path(__file__).resolve().parent.parent
+
+# Wraps the console methods and records uncaught errors in the page, keeping the last max entries
+# arguments: max number of kept console entries
+CONSOLE_INSTALL_SCRIPT = """
+if (!window.__deConsole) {
+    var buffer = {entries: [], dropped: 0, max: arguments[0]};
+    var record = function (level, values) {
+        var message = Array.prototype.map.call(values, function (value) {
+            try {
+                return typeof value === 'string' ? value : JSON.stringify(value);
+            } catch (e) {
+                return String(value);
+            }
+        }).join(' ');
+        buffer.entries.push({time: Date.now(), level: level, message: message});
+        if (buffer.entries.length > buffer.max) {
+            buffer.entries.shift();
+            buffer.dropped++;
+        }
+    };
+    ['error', 'warn', 'info', 'log'].forEach(function (level) {
+        var original = console[level];
+        console[level] = function () {
+            record(level, arguments);
+            return original.apply(console, arguments);
+        };
+    });
+    window.addEventListener('error', function (event) {
+        record('uncaught', [event.message + ' (' + event.filename + ':' + event.lineno + ')']);
+    });
+    window.addEventListener('unhandledrejection', function (event) {
+        record('unhandledrejection', [String(event.reason)]);
+    });
+    window.__deConsole = buffer;
+}
+return window.__deConsole.entries.length;
+"""
+
+# Grabs the page state in one round trip: url, title, DOM, console entries and network records
+CAPTURE_SCRIPT = """
+var consoleBuffer = window.__deConsole, network = window.__deNetwork;
+return {
+    url: location.href,
+    title: document.title,
+    dom: document.documentElement ? document.documentElement.outerHTML : '',
+    console: consoleBuffer ? consoleBuffer.entries.slice() : null,
+    network: network ? network.records.slice() : null
+};
+"""
+
+
+def _slug(text, max_length=120):
+    return re.sub(r"[^\w.-]+", "_", text).strip("_")[:max_length] or "artifact"
+
+
+def _encode_json(value):
+    return json.dumps(value, indent=1, default=str).encode("utf-8")
+
+
+def _encode_spans(spans):
+    return _encode_json([{"name": span.name, "start": span.start - tracer.epoch, "duration": span.duration,
+                          "self": span.self_time, "depth": span.depth, "attributes": span.attributes}
+                         for span in spans])
+
+
+class ArtifactWriter:
+    """
+    Background worker encoding, deduplicating, compressing and writing artifacts.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, directory):
+        """
+        :param directory: directory the artifacts are written to
+        """
+        self.logger.log_enter("ArtifactWriter: __init__")
+
+        self.directory = Path(directory)
+        self.queue = queue.Queue()
+        self.hashes = set()
+        self.stats = {"written": 0, "deduplicated": 0, "failed": 0, "raw_bytes": 0, "stored_bytes": 0}
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.logger.log_exit("ArtifactWriter: __init__")
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def submit(self, relative_path, encoder, payload, compress=True):
+        """
+        Method to queue an artifact, only the path is computed in the calling thread
+        :param relative_path: path below the directory, without the .gz suffix
+        :param encoder: callable turning payload into bytes, run in the worker
+        :param payload: raw data grabbed at the failure
+        :param compress: gzip the artifact, False for already compressed formats like PNG
+        :return: (Path) path the artifact will be written to
+        """
+        self._start()
+        path = self.directory.joinpath(relative_path + (".gz" if compress else ""))
+        self.queue.put((path, encoder, payload, compress))
+        return path
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                self.stats["failed"] += 1
+                self.logger.log_error("ArtifactWriter: write Exception: %s", e)
+            finally:
+                self.queue.task_done()
+
+    def _write(self, path, encoder, payload, compress):
+        data = encoder(payload)
+        digest = hashlib.sha256(data).hexdigest()[:24]
+        self.stats["raw_bytes"] += len(data)
+        stored = self.directory.joinpath("objects", digest + "".join(path.suffixes))
+        if digest in self.hashes or stored.exists():
+            self.stats["deduplicated"] += 1
+        else:
+            stored.parent.mkdir(parents=True, exist_ok=True)
+            temporary = stored.with_name(stored.name + ".{}.tmp".format(os.getpid()))
+            with open(str(temporary), "wb") as output:
+                output.write(gzip.compress(data, compresslevel=6) if compress else data)
+            os.replace(str(temporary), str(stored))
+            self.stats["written"] += 1
+            self.stats["stored_bytes"] += stored.stat().st_size
+        self.hashes.add(digest)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            path.unlink()
+        try:
+            os.link(str(stored), str(path))
+        except OSError:
+            shutil.copyfile(str(stored), str(path))
+
+    def flush(self):
+        """
+        Method to block until the queued artifacts are written
+        :return:
+        """
+        if self._thread is not None:
+            self.queue.join()
+
+    def close(self):
+        """
+        Method to write the queued artifacts and stop the worker
+        :return:
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self.queue.put(None)
+            thread.join()
+
+
+class FailureArtifacts:
+    """
+    Captures the failure artifacts of the current test, see the module docstring.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, directory=None, enabled=True, max_captures_per_test=3, max_console_entries=500):
+        """
+        :param directory: artifact directory, defaults to DE_ARTIFACTS_DIR environment variable or artifacts/
+                          in the project directory
+        :param enabled: capture artifacts
+        :param max_captures_per_test: captures per test, later failures of a cascade are only logged
+        :param max_console_entries: max number of console entries kept in the page
+        """
+        self.logger.log_enter("FailureArtifacts: __init__")
+
+        self.enabled = enabled
+        self.max_captures_per_test = max_captures_per_test
+        self.max_console_entries = max_console_entries
+        self.writer = ArtifactWriter(directory or os.environ.get("DE_ARTIFACTS_DIR", BASEDIR.joinpath("artifacts")))
+        self.captured = {}
+        self.capture_timings = []
+
+        self.logger.log_exit("FailureArtifacts: __init__")
+
+    def install(self, driver):
+        """
+        Method to install the console recorder in the current page, after every page load
+        :param driver: webdriver object to use
+        :return:
+        """
+        if not self.enabled:
+            return
+        try:
+            driver.execute_script(CONSOLE_INSTALL_SCRIPT, self.max_console_entries)
+        except WebDriverException as e:
+            self.logger.log_debug("FailureArtifacts: install Exception: %s", e)
+
+    def capture(self, driver, step, error=None):
+        """
+        Method to grab the artifacts of a failed step and queue them for writing
+        :param driver: webdriver object to use
+        :param step: name of the failed step, e.g. create_collection
+        :param error: exception of the failure, written with the page info
+        :return: (Dict) artifact name -> path, empty if not captured
+        """
+        test_name = tracer.current_test or "session"
+        captures = self.captured.setdefault(test_name, [])
+        if not self.enabled or driver is None or len(captures) >= self.max_captures_per_test:
+            return {}
+
+        start = time.perf_counter()
+        page = screenshot = None
+        try:
+            page = driver.execute_script(CAPTURE_SCRIPT)
+        except WebDriverException as e:
+            self.logger.log_debug("FailureArtifacts: capture page Exception: %s", e)
+        try:
+            screenshot = driver.get_screenshot_as_base64()
+        except WebDriverException as e:
+            self.logger.log_debug("FailureArtifacts: capture screenshot Exception: %s", e)
+        spans = tracer.spans[tracer.test_span_start:] if tracer.current_test else []
+
+        prefix = "{}/{:02d}_{}_".format(_slug(test_name), len(captures) + 1, _slug(step))
+        artifacts = {}
+        if screenshot:
+            artifacts["screenshot"] = self.writer.submit(prefix + "screenshot.png", base64.b64decode, screenshot,
+                                                         compress=False)
+        if page:
+            artifacts["dom"] = self.writer.submit(prefix + "dom.html", lambda dom: dom.encode("utf-8"), page["dom"])
+            artifacts["console"] = self.writer.submit(prefix + "console.json", _encode_json, page["console"])
+            artifacts["network"] = self.writer.submit(prefix + "network.json", _encode_json, page["network"])
+        info = {"step": step, "error": None if error is None else repr(error), "test": test_name,
+                "url": page["url"] if page else None, "title": page["title"] if page else None}
+        artifacts["info"] = self.writer.submit(prefix + "info.json", _encode_json, info)
+        if spans:
+            artifacts["spans"] = self.writer.submit(prefix + "spans.json", _encode_spans, spans)
+
+        elapsed = time.perf_counter() - start
+        self.capture_timings.append(elapsed)
+        captures.append(artifacts)
+        self.logger.log_info("FailureArtifacts: captured %s artifacts of %s in %.3fs", len(artifacts), step, elapsed,
+                             test_name=test_name)
+        return artifacts
+
+    def artifacts_for(self, test_name):
+        """
+        Method to get the artifacts captured in a test
+        :param test_name: name (node id) of the test
+        :return: (List) list of artifact dicts (artifact name -> path), one per capture
+        """
+        return self.captured.get(test_name, [])
+
+    def summary(self):
+        """
+        Method to summarise the capture cost in the test thread and the work of the writer
+        :return: (Dict) captures, mean and max capture time (secs), and the writer stats
+        """
+        timings = self.capture_timings
+        return dict(self.writer.stats, captures=len(timings), mean=sum(timings) / len(timings) if timings else 0.0,
+                    max=max(timings) if timings else 0.0)
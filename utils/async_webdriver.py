@@ -0,0 +1,727 @@
+"""
+asyncio client for the W3C WebDriver protocol, to drive many browser sessions from one process.
+
+Commands are sent over kept alive HTTP/1.1 connections pooled per WebDriver server, using asyncio
+streams only. AsyncDriverUtils has async counterparts of the core DriverUtils operations, built on the
+same page scripts.
+
+Usage:
+    python -m utils.async_webdriver --driver-path /usr/local/bin/chromedriver --browser chrome --sessions 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException, NoSuchElementException, TimeoutException, \
+    StaleElementReferenceException, ElementClickInterceptedException, ElementNotInteractableException, \
+    JavascriptException
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.document_explorer import Collections, Documents
+from utils.session_cache import get_origin
+from utils.table_snapshot import TableSnapshot
+from utils.locator_cache import CLICKABLE_SCRIPT
+from utils.wait_utils import DOM_QUIESCENCE_SCRIPT, DEFAULT_SCRIPT_TIMEOUT, SCRIPT_TIMEOUT_MARGIN
+from utils.driver_utils import TABLE_EXTRACT_SCRIPT, NEXT_PAGE_SCRIPT
+from utils import network_monitor, upload_watcher
+
+logger = DocumentExplorerLogger()
+
+# Key of a web element reference in W3C WebDriver JSON
+W3C_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# W3C error codes mapped to the Selenium exceptions DriverUtils handles
+ERRORS = {
+    "no such element": NoSuchElementException,
+    "stale element reference": StaleElementReferenceException,
+    "timeout": TimeoutException,
+    "script timeout": TimeoutException,
+    "element click intercepted": ElementClickInterceptedException,
+    "element not interactable": ElementNotInteractableException,
+    "javascript error": JavascriptException,
+}
+
+# Returns true if the element matching the CSS selector is rendered
+VISIBLE_SCRIPT = """
+var element = document.querySelector(arguments[0]);
+return !!element && !!(element.offsetWidth || element.offsetHeight || element.getClientRects().length);
+"""
+
+CAPABILITIES = {
+    "firefox": {"browserName": "firefox", "moz:firefoxOptions": {"args": ["-headless"]}},
+    "chrome": {"browserName": "chrome", "goog:chromeOptions": {"args": ["--headless", "--disable-gpu",
+                                                                         "--no-sandbox"]}},
+}
+
+
+class AsyncHttpConnectionPool:
+    """
+    Pool of kept alive HTTP/1.1 connections to one WebDriver server.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, url, maxsize=10, timeout=120):
+        """
+        :param url: url of the WebDriver server, e.g. http://127.0.0.1:4444
+        :param maxsize: max number of concurrent connections
+        :param timeout: timeout (secs) of a request
+        """
+        self.logger.log_enter("AsyncHttpConnectionPool: __init__")
+
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.base_path = parts.path.rstrip("/")
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.stats = {"requests": 0, "connections": 0, "reused": 0}
+        self._idle = []
+        self._semaphore = None
+
+        self.logger.log_exit("AsyncHttpConnectionPool: __init__")
+
+    async def _roundtrip(self, reader, writer, method, path, body):
+        head = ["{} {}{} HTTP/1.1".format(method, self.base_path, path), "Host: {}:{}".format(self.host, self.port),
+                "Connection: keep-alive", "Accept: application/json", "Content-Length: {}".format(len(body))]
+        if body:
+            head.append("Content-Type: application/json;charset=UTF-8")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        status = int((await reader.readuntil(b"\r\n")).split(b" ", 2)[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            data = b"".join(chunks)
+        elif "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        else:
+            data = await reader.read()
+            headers["connection"] = "close"
+        return status, headers, data
+
+    async def request(self, method, path, body=b""):
+        """
+        Method to send a request over a pooled connection. A kept alive connection closed by the server
+        is replaced by a new one once.
+        :param method: HTTP method
+        :param path: path below the server url
+        :param body: request body
+        :return: (tuple) HTTP status, response body
+        :raises TimeoutException: if the server does not answer within timeout
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.maxsize)
+        async with self._semaphore:
+            self.stats["requests"] += 1
+            for attempt in range(2):
+                reused = bool(self._idle)
+                if reused:
+                    reader, writer = self._idle.pop()
+                    self.stats["reused"] += 1
+                else:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                    self.stats["connections"] += 1
+                try:
+                    status, headers, data = await asyncio.wait_for(
+                        self._roundtrip(reader, writer, method, path, body), self.timeout)
+                except asyncio.TimeoutError:
+                    writer.close()
+                    raise TimeoutException("no response to {} {} after {}s".format(method, path, self.timeout))
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    writer.close()
+                    if reused and attempt == 0:
+                        self.logger.log_debug("AsyncHttpConnectionPool: kept alive connection closed: %s", e)
+                        continue
+                    raise WebDriverException("{} {} failed: {}".format(method, path, e))
+                if headers.get("connection", "").lower() == "close":
+                    writer.close()
+                else:
+                    self._idle.append((reader, writer))
+                return status, data
+
+    async def close(self):
+        """
+        Method to close the idle connections
+        :return:
+        """
+        idle, self._idle = self._idle, []
+        for reader, writer in idle:
+            writer.close()
+        for reader, writer in idle:
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+class AsyncElement:
+    """
+    Reference to a web element of an AsyncWebDriver session.
+    """
+    __slots__ = ("driver", "id")
+
+    def __init__(self, driver, element_id):
+        self.driver = driver
+        self.id = element_id
+
+    def __repr__(self):
+        return "AsyncElement({})".format(self.id)
+
+    def _path(self, command=""):
+        return "/element/{}{}".format(self.id, command)
+
+    async def click(self):
+        await self.driver.execute("POST", self._path("/click"), {})
+
+    async def clear(self):
+        await self.driver.execute("POST", self._path("/clear"), {})
+
+    async def send_keys(self, text):
+        await self.driver.execute("POST", self._path("/value"), {"text": str(text)})
+
+    async def text(self):
+        return await self.driver.execute("GET", self._path("/text"))
+
+    async def find_elements(self, css):
+        return await self.driver.execute("POST", self._path("/elements"), {"using": "css selector", "value": css})
+
+
+class AsyncWebDriver:
+    """
+    W3C WebDriver session driven with asyncio.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, http, session_id, capabilities=None):
+        """
+        :param http: AsyncHttpConnectionPool of the WebDriver server
+        :param session_id: id of the session
+        :param capabilities: capabilities returned by the server
+        """
+        self.http = http
+        self.session_id = session_id
+        self.capabilities = capabilities or {}
+        self.command_count = 0
+
+    @classmethod
+    async def start(cls, http, capabilities=None):
+        """
+        Method to create a new session
+        :param http: AsyncHttpConnectionPool of the WebDriver server
+        :param capabilities: capabilities to always match, e.g. CAPABILITIES["firefox"]
+        :return: AsyncWebDriver object
+        """
+        driver = cls(http, None)
+        value = await driver.execute("POST", "/session", {"capabilities": {"alwaysMatch": capabilities or {}}})
+        driver.session_id = value["sessionId"]
+        driver.capabilities = value.get("capabilities", {})
+        cls.logger.log_debug("AsyncWebDriver: start session: %s", driver.session_id)
+        return driver
+
+    def _wrap(self, value):
+        if isinstance(value, AsyncElement):
+            return {W3C_ELEMENT_KEY: value.id}
+        if isinstance(value, (list, tuple)):
+            return [self._wrap(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._wrap(item) for key, item in value.items()}
+        return value
+
+    def _unwrap(self, value):
+        if isinstance(value, list):
+            return [self._unwrap(item) for item in value]
+        if isinstance(value, dict):
+            if W3C_ELEMENT_KEY in value:
+                return AsyncElement(self, value[W3C_ELEMENT_KEY])
+            return {key: self._unwrap(item) for key, item in value.items()}
+        return value
+
+    async def execute(self, method, path, payload=None):
+        """
+        Method to send a command of the session
+        :param method: HTTP method
+        :param path: command path below /session/{session id}, or /session to create the session
+        :param payload: JSON payload, element references may be AsyncElement objects
+        :return: value of the response, element references as AsyncElement objects
+        :raises WebDriverException: (or the Selenium exception of the error code) if the command failed
+        """
+        if self.session_id is not None:
+            path = "/session/{}{}".format(self.session_id, path)
+        body = json.dumps(self._wrap(payload)).encode("utf-8") if payload is not None else b""
+        self.command_count += 1
+        status, data = await self.http.request(method, path, body)
+        value = json.loads(data.decode("utf-8"))["value"] if data else None
+        if status >= 400 or (isinstance(value, dict) and "error" in value and status != 200):
+            error = value.get("error", "unknown error") if isinstance(value, dict) else "unknown error"
+            message = value.get("message", "") if isinstance(value, dict) else data
+            raise ERRORS.get(error, WebDriverException)("{}: {}".format(error, message))
+        return self._unwrap(value)
+
+    async def get(self, url):
+        await self.execute("POST", "/url", {"url": url})
+
+    async def current_url(self):
+        return await self.execute("GET", "/url")
+
+    async def refresh(self):
+        await self.execute("POST", "/refresh", {})
+
+    async def find_element(self, css):
+        return await self.execute("POST", "/element", {"using": "css selector", "value": css})
+
+    async def find_elements(self, css):
+        return await self.execute("POST", "/elements", {"using": "css selector", "value": css})
+
+    async def execute_script(self, script, *args):
+        return await self.execute("POST", "/execute/sync", {"script": script, "args": list(args)})
+
+    async def execute_async_script(self, script, *args):
+        return await self.execute("POST", "/execute/async", {"script": script, "args": list(args)})
+
+    async def set_script_timeout(self, timeout):
+        await self.execute("POST", "/timeouts", {"script": int(timeout * 1000)})
+
+    @asynccontextmanager
+    async def script_timeout(self, timeout):
+        """
+        Context manager raising the script timeout for an async script blocking up to timeout secs, and
+        restoring the default afterwards, see utils.wait_utils.script_timeout
+        :param timeout: time (secs) the script may block
+        :return:
+        """
+        timeout = timeout + SCRIPT_TIMEOUT_MARGIN
+        if timeout <= DEFAULT_SCRIPT_TIMEOUT:
+            yield
+            return
+        await self.set_script_timeout(timeout)
+        try:
+            yield
+        finally:
+            try:
+                await self.set_script_timeout(DEFAULT_SCRIPT_TIMEOUT)
+            except WebDriverException as e:
+                self.logger.log_debug("AsyncWebDriver: script_timeout restore Exception: %s", e)
+
+    async def get_cookies(self):
+        return await self.execute("GET", "/cookie")
+
+    async def delete_all_cookies(self):
+        await self.execute("DELETE", "/cookie")
+
+    async def quit(self):
+        try:
+            await self.execute("DELETE", "")
+        except WebDriverException as e:
+            self.logger.log_error("AsyncWebDriver: quit Exception: %s", e)
+
+
+class AsyncWaits:
+    """
+    Polling waits for AsyncWebDriver sessions, sleeping with asyncio between checks so other sessions run.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, timeout=10, poll_interval=0.1, quiet_period=0.3):
+        """
+        :param timeout: default timeout (secs) for a wait
+        :param poll_interval: poll interval (secs) between condition checks
+        :param quiet_period: time (secs) without DOM mutations for the page to count as settled
+        """
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.quiet_period = quiet_period
+
+    async def until(self, name, condition, timeout=None):
+        """
+        Method to wait until an async condition returns a truthy value
+        :param name: name of the wait, for the error message
+        :param condition: coroutine function without arguments
+        :param timeout: timeout (secs)
+        :return: the truthy value
+        :raises TimeoutException: on timeout
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                value = await condition()
+                if value:
+                    return value
+            except (NoSuchElementException, StaleElementReferenceException):
+                pass
+            if time.monotonic() >= deadline:
+                raise TimeoutException("{} not satisfied after {}s".format(name, timeout))
+            await asyncio.sleep(self.poll_interval)
+
+    async def wait_for_element(self, driver, css, clickable=False, timeout=None):
+        async def element_ready():
+            element = await driver.find_element(css)
+            if clickable and not await driver.execute_script(CLICKABLE_SCRIPT, element):
+                return None
+            return element
+
+        return await self.until("wait_for_element " + css, element_ready, timeout)
+
+    async def wait_for_page_ready(self, driver, spinner_css, timeout=None):
+        async def page_ready():
+            if await driver.execute_script(VISIBLE_SCRIPT, spinner_css):
+                return False
+            return await driver.execute_script(DOM_QUIESCENCE_SCRIPT) >= self.quiet_period * 1000
+
+        await self.until("wait_for_page_ready", page_ready, timeout)
+
+    async def wait_for_network_idle(self, driver, since=-1, quiet_ms=100, timeout=None):
+        """
+        Method to wait for the backend requests of an action, see NetworkMonitor.wait_for_network_idle
+        :return: (boolean) True: if the network went idle
+        """
+        timeout = self.timeout if timeout is None else timeout
+        await driver.execute_script(network_monitor.INSTALL_SCRIPT, 1000)
+        async with driver.script_timeout(timeout):
+            result = await driver.execute_async_script(network_monitor.WAIT_FOR_IDLE_SCRIPT, quiet_ms, since,
+                                                       int(timeout * 1000), -1)
+        return bool(result and result["idle"])
+
+
+class AsyncDriverUtils:
+    """
+    Async counterparts of the core DriverUtils operations for AsyncWebDriver sessions.
+    """
+    logger = DocumentExplorerLogger()
+    collection = Collections()
+    document = Documents()
+    waits = AsyncWaits()
+
+    async def login(self, driver, url, username, password):
+        """
+        Method to login into Document Explorer Application
+        :param driver: AsyncWebDriver object to use
+        :param url: url of document explorer application
+        :param username: username for login
+        :param password: password for login
+        :return:
+        """
+        self.logger.log_enter("AsyncDriverUtils: login")
+
+        await driver.get(url)
+        await (await driver.find_element("#username")).send_keys(username)
+        await (await driver.find_element("#password")).send_keys(password)
+        await (await driver.find_element("#kc-login")).click()
+
+        async def logged_in():
+            return get_origin(await driver.current_url()) == get_origin(url) and \
+                not await driver.find_elements("#username")
+
+        await self.waits.until("wait_for_login", logged_in)
+        await self.waits.wait_for_page_ready(driver, self.collection.loading_spinner_css)
+
+        self.logger.log_exit("AsyncDriverUtils: login")
+
+    async def parse_table(self, driver, table_css, columns=None, name_column=0):
+        """
+        Method to parse the table in the UI in a single round trip
+        :param driver: AsyncWebDriver object to use
+        :param table_css: CSS selector for table element
+        :param columns: list of column indexes to extract, None for all columns
+        :param name_column: index (among the extracted columns) or header name of the names column
+        :return: TableSnapshot of the table rows, empty if the table is not present
+        """
+        table = await driver.execute_script(TABLE_EXTRACT_SCRIPT, table_css, columns, None, True)
+        if table is None:
+            return TableSnapshot.from_rows([])
+        return TableSnapshot.from_rows(table["rows"], headers=table["headers"], name_column=name_column)
+
+    async def get_table_names(self, driver, table_css, next_page_css, col_num=0, previous_page_css=None):
+        """
+        Method to collect the names column over all pages of a table
+        :param driver: AsyncWebDriver object to use
+        :param table_css: CSS selector for table element
+        :param next_page_css: CSS selector for the pager next button
+        :param col_num: the column number for names attribute
+        :param previous_page_css: CSS selector for the pager previous button, to return the pager to the first
+                                  page afterwards. None leaves it on the last page.
+        :return: (List) list of names
+        """
+        names = []
+        page = 0
+        try:
+            while True:
+                rows = await driver.execute_script(TABLE_EXTRACT_SCRIPT, table_css, [col_num], None) or []
+                names.extend(values[0] for _, values in rows if values[0] is not None)
+                if not await self.turn_page(driver, next_page_css):
+                    break
+                page += 1
+        finally:
+            if previous_page_css and page:
+                await self.rewind_pager(driver, previous_page_css, page)
+        return names
+
+    async def turn_page(self, driver, page_css):
+        """
+        Method to click a pager button and wait for the page it loads
+        :param driver: AsyncWebDriver object to use
+        :param page_css: CSS selector of the pager button
+        :return: (boolean) True: if the page was turned
+                         False: if the button is missing or disabled
+        """
+        since = await driver.execute_script(network_monitor.INSTALL_SCRIPT, 1000)
+        if not await driver.execute_script(NEXT_PAGE_SCRIPT, page_css):
+            return False
+        await self.waits.wait_for_network_idle(driver, since=since)
+        await self.waits.wait_for_page_ready(driver, self.collection.loading_spinner_css)
+        return True
+
+    async def rewind_pager(self, driver, previous_page_css, pages):
+        """
+        Method to turn the pager of a table back by pages, to the first page after a walk over all pages
+        :param driver: AsyncWebDriver object to use
+        :param previous_page_css: CSS selector for the pager previous button
+        :param pages: number of pages to turn back
+        :return:
+        """
+        try:
+            for _ in range(pages):
+                if not await self.turn_page(driver, previous_page_css):
+                    break
+        except TimeoutException as e:
+            self.logger.log_error("AsyncDriverUtils: rewind_pager Exception: %s", e)
+        except WebDriverException as e:
+            self.logger.log_error("AsyncDriverUtils: rewind_pager Exception: %s", e)
+
+    async def search(self, driver, search_css, text):
+        """
+        Method to replace the text of a search input and wait for its query
+        :param driver: AsyncWebDriver object to use
+        :param search_css: CSS selector of the search input
+        :param text: text to search
+        :return:
+        """
+        search_element = await self.waits.wait_for_element(driver, search_css)
+        since = await driver.execute_script(network_monitor.INSTALL_SCRIPT, 1000)
+        await search_element.clear()
+        await search_element.send_keys(text)
+        await self.waits.wait_for_network_idle(driver, since=since)
+        await self.waits.wait_for_page_ready(driver, self.collection.loading_spinner_css)
+
+    async def search_collection(self, driver, collection_name):
+        """
+        Method to search a collection
+        :param driver: AsyncWebDriver object to use
+        :param collection_name: name of the collection to search
+        :return: (List) list of collection names
+        """
+        self.logger.log_enter("AsyncDriverUtils: search_collection")
+
+        await self.search(driver, self.collection.collection_search_input_css, collection_name)
+        results = await self.get_table_names(driver, self.collection.collection_table_css,
+                                             self.collection.collection_table_next_page_css,
+                                             previous_page_css=self.collection.collection_table_previous_page_css)
+
+        self.logger.log_exit("AsyncDriverUtils: search_collection")
+        return results
+
+    async def create_collection(self, driver, collection_name, expected_error=None):
+        """
+        Method to create a collection
+        :param driver: AsyncWebDriver object to use
+        :param collection_name: name of the collection to create
+        :param expected_error: expected error message
+        :return: (boolean) True: if created
+                         False: if the dialog showed an error
+        """
+        self.logger.log_enter("AsyncDriverUtils: create_collection")
+
+        await (await self.waits.wait_for_element(driver, self.collection.collection_create_button_css,
+                                                 clickable=True)).click()
+        await (await self.waits.wait_for_element(driver, self.collection.collection_name_text_box_css)) \
+            .send_keys(collection_name)
+        since = await driver.execute_script(network_monitor.INSTALL_SCRIPT, 1000)
+        await (await self.waits.wait_for_element(driver, self.collection.collection_create_submit_button_css,
+                                                 clickable=True)).click()
+        await self.waits.wait_for_network_idle(driver, since=since)
+
+        created = True
+        if await driver.execute_script(VISIBLE_SCRIPT, self.collection.collection_create_error_para_css):
+            created = False
+            error_message = await (await driver.find_element(self.collection.collection_create_error_para_css)).text()
+            if expected_error:
+                assert expected_error == error_message
+            await (await driver.find_element(self.collection.collection_cancel_button_css)).click()
+
+        self.logger.log_exit("AsyncDriverUtils: create_collection")
+        return created
+
+    async def upload_document(self, driver, collection_name, document_path, expected_error=None, timeout=300):
+        """
+        Method to upload document in a collection
+        :param driver: AsyncWebDriver object to use
+        :param collection_name: name of the collection to use
+        :param document_path: the local path of the document file to upload
+        :param expected_error: expected error message
+        :param timeout: time (secs) to wait for the upload to finish
+        :return: (string) upload status of the document
+        """
+        self.logger.log_enter("AsyncDriverUtils: upload_document")
+
+        # select the collection
+        await self.search(driver, self.collection.collection_search_input_css, collection_name)
+        cells = await driver.find_elements(self.collection.collection_table_css + " td")
+        if not cells:
+            raise NoSuchElementException("collection {} not found".format(collection_name))
+        await cells[0].click()
+
+        upload_button = await self.waits.wait_for_element(driver, self.document.document_upload_button_css,
+                                                          clickable=True)
+        file_input = await driver.find_element(self.document.document_file_input_css)
+        watcher_selectors = (self.document.document_upload_status_css, self.document.document_upload_row_css,
+                             self.document.document_upload_row_name_css, self.document.document_upload_row_status_css)
+        since = await driver.execute_script(upload_watcher.INSTALL_SCRIPT, *watcher_selectors)
+        await file_input.send_keys(str(document_path))
+        try:
+            await upload_button.click()
+        except StaleElementReferenceException:
+            # the uploader re-renders its button once the file is picked
+            pass
+
+        name = os.path.basename(str(document_path))
+        async with driver.script_timeout(timeout):
+            result = await driver.execute_async_script(upload_watcher.WAIT_FOR_ROWS_SCRIPT, [name],
+                                                       list(self.document.document_upload_pending_msgs), since,
+                                                       int(timeout * 1000))
+        status = result["rows"].get(name) if result else None
+        if expected_error:
+            assert expected_error == status
+        else:
+            assert self.document.document_upload_success_msg == status
+
+        clear_finished = await driver.find_elements(self.document.document_clear_finished_css)
+        if clear_finished:
+            await clear_finished[0].click()
+
+        self.logger.log_exit("AsyncDriverUtils: upload_document")
+        return status
+
+
+async def start_driver_service(executable_path, port=0, timeout=30):
+    """
+    Method to start a local geckodriver/chromedriver and wait until it accepts connections
+    :param executable_path: path of the driver executable
+    :param port: port to listen on, 0 for a free port
+    :param timeout: timeout (secs) for the driver to start
+    :return: (tuple) url of the driver, asyncio subprocess
+    """
+    if not port:
+        with socket.socket() as free:
+            free.bind(("127.0.0.1", 0))
+            port = free.getsockname()[1]
+    process = await asyncio.create_subprocess_exec(str(executable_path), "--port={}".format(port),
+                                                   stdout=asyncio.subprocess.DEVNULL,
+                                                   stderr=asyncio.subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return "http://127.0.0.1:{}".format(port), process
+        except OSError:
+            if time.monotonic() >= deadline or process.returncode is not None:
+                process.kill()
+                raise WebDriverException("{} did not start on port {}".format(executable_path, port))
+            await asyncio.sleep(0.05)
+
+
+async def run_sessions(scenario, count, driver_path, browser="chrome", sessions_per_service=None):
+    """
+    Method to run a scenario concurrently in count new browser sessions.
+    geckodriver serves a single session, so a driver service is started per session for firefox,
+    chromedriver serves all sessions by default.
+    :param scenario: coroutine function taking (AsyncWebDriver, session index)
+    :param count: number of sessions
+    :param driver_path: path of the driver executable
+    :param browser: browser name [firefox, chrome]
+    :param sessions_per_service: number of sessions per driver service, defaults by browser
+    :return: (List) results of the scenario per session, the exception for a failed session
+    """
+    sessions_per_service = sessions_per_service or (1 if browser == "firefox" else count)
+    services = []
+    pools = []
+    drivers = []
+    try:
+        for _ in range(0, count, sessions_per_service):
+            url, process = await start_driver_service(driver_path)
+            services.append(process)
+            pools.append(AsyncHttpConnectionPool(url, maxsize=sessions_per_service))
+        # the sessions which started are kept for the cleanup when another one fails to start
+        started = await asyncio.gather(*[AsyncWebDriver.start(pools[index // sessions_per_service],
+                                                              CAPABILITIES[browser])
+                                         for index in range(count)], return_exceptions=True)
+        drivers = [driver for driver in started if isinstance(driver, AsyncWebDriver)]
+        for error in started:
+            if isinstance(error, BaseException):
+                raise error
+        return await asyncio.gather(*[scenario(driver, index) for index, driver in enumerate(drivers)],
+                                    return_exceptions=True)
+    finally:
+        for error in await asyncio.gather(*[driver.quit() for driver in drivers], return_exceptions=True):
+            if isinstance(error, BaseException):
+                logger.log_error("run_sessions: quit Exception: %s", error)
+        for pool in pools:
+            await pool.close()
+        for process in services:
+            process.terminate()
+            await process.wait()
+
+
+def main():
+    from utils.standin_server import StandinServer
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", default="chrome", choices=sorted(CAPABILITIES))
+    parser.add_argument("--driver-path", required=True)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--searches", type=int, default=10, help="collection searches per session")
+    args = parser.parse_args()
+
+    driver_utils = AsyncDriverUtils()
+
+    with StandinServer() as server:
+        async def scenario(driver, index):
+            start = time.monotonic()
+            await driver_utils.login(driver, server.app_url + "/document-explorer", server.username, server.password)
+            for _ in range(args.searches):
+                assert "abhishek" in await driver_utils.search_collection(driver, "abhishek")
+            return time.monotonic() - start
+
+        start = time.monotonic()
+        results = asyncio.run(run_sessions(scenario, args.sessions, args.driver_path, args.browser))
+        elapsed = time.monotonic() - start
+
+    failed = [result for result in results if isinstance(result, BaseException)]
+    for result in failed:
+        print("FAILED {!r}".format(result))
+    print("{} sessions, {} searches each, {:.1f}s total".format(args.sessions, args.searches, elapsed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from selenium.common.exceptions import WebDriverException
+
+from utils.logs_util import DocumentExplorerLogger
+
+# Clears local and session storage of the current page
+CLEAR_STORAGE_SCRIPT = """
+try {
+    window.localStorage.clear();
+    window.sessionStorage.clear();
+} catch (e) {
+}
+"""
+
+# Opens a blank tab, WebDriver switches to it by its new window handle
+NEW_TAB_SCRIPT = "window.open('about:blank', '_blank');"
+
+
+def get_xdist_worker():
+    """
+    Method to get the pytest-xdist worker id of this process
+    :return: (string) worker id (gw0, gw1, ...), "master" when not running under xdist
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def get_xdist_worker_count():
+    """
+    Method to get the number of pytest-xdist workers
+    :return: (int) number of workers, 1 when not running under xdist
+    """
+    return int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", 1))
+
+
+def default_pool_size():
+    """
+    Method to get the default number of browser sessions per worker.
+    Cores are split between the xdist workers, each worker keeps at least one session.
+    :return: (int) pool size
+    """
+    return max(1, min(2, (os.cpu_count() or 1) // get_xdist_worker_count()))
+
+
+class PooledDriver:
+    """
+    Book keeping of a browser session owned by the pool.
+    """
+    __slots__ = ("browser", "driver", "uses", "base_handle")
+
+    def __init__(self, browser, driver):
+        self.browser = browser
+        self.driver = driver
+        self.uses = 0
+        # blank window kept open while the checkouts use their own tabs, so the browser never closes its last window
+        self.base_handle = None
+
+
+class BrowserPool:
+    """
+    Pool of pre-launched browser sessions for one pytest(-xdist) worker.
+    Sessions are reset between uses and recycled after max_uses or on error.
+    With tabs every checkout gets a new tab of the session, which is closed on checkin instead of
+    navigating the session window back to a blank page.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, factory, size=None, max_uses=20, tabs=True):
+        """
+        :param factory: callable taking the browser name [firefox, chrome] and returning a new webdriver
+        :param size: max number of idle sessions kept per browser
+        :param max_uses: number of checkouts after which a session is recycled
+        :param tabs: open a tab per checkout and close it on checkin
+        """
+        self.logger.log_enter("BrowserPool: __init__")
+
+        self.factory = factory
+        self.size = size or default_pool_size()
+        self.max_uses = max_uses
+        self.tabs = tabs
+        self.worker = get_xdist_worker()
+        self.stats = {"launched": 0, "reused": 0, "recycled": 0, "tabs": 0}
+        self._idle = {}
+        self._checked_out = {}
+        self._lock = threading.Lock()
+
+        self.logger.log_info("BrowserPool: __init__ worker: %s size: %s max_uses: %s", self.worker, self.size,
+                             self.max_uses)
+        self.logger.log_exit("BrowserPool: __init__")
+
+    def _launch(self, browser):
+        pooled = PooledDriver(browser, self.factory(browser))
+        with self._lock:
+            self.stats["launched"] += 1
+        return pooled
+
+    def prewarm(self, browser, count=None):
+        """
+        Method to launch browser sessions in parallel ahead of the first checkout
+        :param browser: browser name [firefox, chrome]
+        :param count: number of sessions to launch, defaults to the pool size
+        :return:
+        """
+        self.logger.log_enter("BrowserPool: prewarm")
+
+        with self._lock:
+            missing = (count or self.size) - len(self._idle.get(browser, []))
+        if missing > 0:
+            with ThreadPoolExecutor(max_workers=missing) as executor:
+                launched = list(executor.map(lambda i: self._launch(browser), range(missing)))
+            with self._lock:
+                self._idle.setdefault(browser, []).extend(launched)
+
+        self.logger.log_exit("BrowserPool: prewarm")
+
+    def checkout(self, browser):
+        """
+        Method to take a browser session out of the pool, launching one if none is idle
+        :param browser: browser name [firefox, chrome]
+        :return: webdriver object
+        """
+        self.logger.log_enter("BrowserPool: checkout")
+
+        pooled = None
+        with self._lock:
+            idle = self._idle.get(browser)
+            if idle:
+                pooled = idle.pop()
+                self.stats["reused"] += 1
+        if pooled is None:
+            pooled = self._launch(browser)
+
+        pooled.uses += 1
+        if self.tabs:
+            self.open_tab(pooled)
+        with self._lock:
+            self._checked_out[id(pooled.driver)] = pooled
+
+        self.logger.log_debug("BrowserPool: checkout worker: %s browser: %s uses: %s", self.worker, browser,
+                              pooled.uses)
+        self.logger.log_exit("BrowserPool: checkout")
+        return pooled.driver
+
+    def checkin(self, driver, failed=False):
+        """
+        Method to return a browser session to the pool
+        :param driver: webdriver object returned by checkout
+        :param failed: True if the session was used by a failed test, the session is recycled
+        :return:
+        """
+        self.logger.log_enter("BrowserPool: checkin")
+
+        with self._lock:
+            pooled = self._checked_out.pop(id(driver))
+
+        recycle = failed or pooled.uses >= self.max_uses
+        if not recycle:
+            try:
+                self.reset(driver, base_handle=pooled.base_handle)
+            except WebDriverException as e:
+                self.logger.log_error("BrowserPool: checkin reset Exception: %s", e)
+                recycle = True
+
+        with self._lock:
+            idle = self._idle.setdefault(pooled.browser, [])
+            if not recycle and len(idle) >= self.size:
+                recycle = True
+            if recycle:
+                self.stats["recycled"] += 1
+            else:
+                idle.append(pooled)
+
+        if recycle:
+            self.logger.log_debug("BrowserPool: checkin recycle browser: %s uses: %s failed: %s", pooled.browser,
+                                  pooled.uses, failed)
+            self._quit(driver)
+
+        self.logger.log_exit("BrowserPool: checkin")
+
+    def open_tab(self, pooled):
+        """
+        Method to switch a session to a new blank tab, keeping the current window as the base window.
+        The session stays in its current window if the browser does not open the tab.
+        :param pooled: PooledDriver object
+        :return:
+        """
+        self.logger.log_enter("BrowserPool: open_tab")
+
+        driver = pooled.driver
+        base_handle = pooled.base_handle or driver.current_window_handle
+        handles = set(driver.window_handles)
+        driver.execute_script(NEW_TAB_SCRIPT)
+        new_handles = [handle for handle in driver.window_handles if handle not in handles]
+        if new_handles:
+            pooled.base_handle = base_handle
+            driver.switch_to.window(new_handles[0])
+            with self._lock:
+                self.stats["tabs"] += 1
+        else:
+            self.logger.log_info("BrowserPool: open_tab no tab opened, using the session window")
+
+        self.logger.log_exit("BrowserPool: open_tab")
+
+    def reset(self, driver, base_handle=None):
+        """
+        Method to reset a browser session to a clean state: a single blank window without the
+        cookies and storage of the application page
+        :param driver: webdriver object to use
+        :param base_handle: handle of the blank base window to keep, the other windows (the checkout tab
+                            and the windows it opened) are closed. None to keep the first window and
+                            navigate it to a blank page
+        :return:
+        """
+        self.logger.log_enter("BrowserPool: reset")
+
+        # storage is per origin, clear it from the application page before closing it
+        driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        driver.delete_all_cookies()
+        handles = driver.window_handles
+        keep = base_handle if base_handle in handles else handles[0]
+        for handle in handles:
+            if handle != keep:
+                driver.switch_to.window(handle)
+                driver.close()
+        driver.switch_to.window(keep)
+        if keep != base_handle:
+            driver.get("about:blank")
+
+        self.logger.log_exit("BrowserPool: reset")
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            self.logger.log_error("BrowserPool: quit Exception: %s", e)
+
+    def close(self):
+        """
+        Method to quit all browser sessions of the pool
+        :return:
+        """
+        self.logger.log_enter("BrowserPool: close")
+
+        with self._lock:
+            pooled_drivers = [pooled for idle in self._idle.values() for pooled in idle]
+            pooled_drivers.extend(self._checked_out.values())
+            self._idle = {}
+            self._checked_out = {}
+        for pooled in pooled_drivers:
+            self._quit(pooled.driver)
+
+        self.logger.log_info("BrowserPool: close worker: %s stats: %s", self.worker, self.stats)
+        self.logger.log_exit("BrowserPool: close")
@@ -0,0 +1,265 @@
+"""
+Seeds the Document Explorer with generated collections and documents through the HTTP API.
+
+Names are generated from --seed, so a run always produces the same plan: plain names, Unicode,
+case collisions of other names and long names. Collections and documents are created concurrently,
+existing ones are skipped and finished items are recorded in --state-file, so an interrupted run
+resumes where it stopped.
+
+Usage:
+    python -m utils.data_seeder --app-url http://127.0.0.1:8080 --collections 2000 --documents 50
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.api_client import DocumentExplorerApiClient
+from utils.document_explorer import Documents
+from utils.synthetic_documents import write_pdf
+
+WORDS = ["invoice", "contract", "receipt", "claim", "report", "statement", "policy", "archive", "scan", "letter",
+         "quarterly", "payroll", "audit", "tax", "insurance", "shipping", "customs", "medical", "legal", "hr"]
+UNICODE_WORDS = ["Übersicht", "café", "Straße", "facture", "документы", "αρχεία", "文档", "請求書", "ファイル",
+                 "smörgåsbord", "naïve", "Ελλάδα", "😀 emoji"]
+
+# Share of generated names per kind, the remaining names are plain
+NAME_DISTRIBUTION = (("unicode", 0.15), ("case_collision", 0.1), ("long", 0.05), ("spaces", 0.1))
+LONG_NAME_LENGTH = 200
+
+
+def generate_names(count, rng, suffix=""):
+    """
+    Method to generate unique names with a realistic mix of plain, Unicode, case colliding and long names
+    :param count: number of names
+    :param rng: random.Random object, the names only depend on its seed
+    :param suffix: suffix of every name, e.g. ".pdf"
+    :return: (List) list of names
+    """
+    names = []
+    seen = set()
+    while len(names) < count:
+        roll = rng.random()
+        kind = "plain"
+        for name_kind, share in NAME_DISTRIBUTION:
+            if roll < share:
+                kind = name_kind
+                break
+            roll -= share
+
+        number = len(names)
+        if kind == "unicode":
+            name = "{}_{}_{}".format(rng.choice(UNICODE_WORDS), rng.choice(WORDS), number)
+        elif kind == "case_collision" and names:
+            stem = rng.choice(names)
+            stem = stem[:len(stem) - len(suffix)] if suffix else stem
+            name = stem.upper() if stem != stem.upper() else stem.lower()
+        elif kind == "long":
+            name = "_".join(rng.choice(WORDS) for _ in range(LONG_NAME_LENGTH // 4))
+            name = "{}_{}".format(number, name)[:LONG_NAME_LENGTH - len(suffix)]
+        elif kind == "spaces":
+            name = "{} {} ({}) - v{}".format(rng.choice(WORDS).title(), rng.choice(WORDS), number, rng.randint(1, 9))
+        else:
+            name = "{}_{}_{:05d}".format(rng.choice(WORDS), rng.choice(WORDS), number)
+
+        name += suffix
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def build_plan(collections, documents, seed=0):
+    """
+    Method to build the seeding plan
+    :param collections: number of collections
+    :param documents: number of documents per collection
+    :param seed: random seed of the names
+    :return: (Dict) collection name -> list of document names
+    """
+    rng = random.Random(seed)
+    return {collection_name: generate_names(documents, rng, suffix=".pdf")
+            for collection_name in generate_names(collections, rng)}
+
+
+class DataSeeder:
+    """
+    Creates the collections and documents of a plan concurrently through the API client.
+    The synthetic PDF is generated once and uploaded under every document name.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, api_client, state_file=None, workers=8, document_size=32 * 1024, pages=1,
+                 document_dir=None, checkpoint_every=100):
+        """
+        :param api_client: logged in DocumentExplorerApiClient object, its connection pool should hold workers
+                           connections
+        :param state_file: JSON file recording the finished items to resume from, None to not record them
+        :param workers: number of concurrent requests
+        :param document_size: size in bytes of the uploaded synthetic PDF
+        :param pages: number of pages of the synthetic PDF
+        :param document_dir: directory of the synthetic PDF, None for a temporary directory
+        :param checkpoint_every: number of finished items between writes of the state file
+        """
+        self.logger.log_enter("DataSeeder: __init__")
+
+        self.api_client = api_client
+        self.state_file = state_file
+        self.workers = workers
+        self.document_size = document_size
+        self.pages = pages
+        self.document_dir = document_dir
+        self.checkpoint_every = checkpoint_every
+        self.lock = threading.Lock()
+        self.done = set()
+        self.stats = {"created": 0, "uploaded": 0, "skipped": 0, "failed": 0}
+        self._unsaved = 0
+        self.load_state()
+
+        self.logger.log_exit("DataSeeder: __init__")
+
+    # State
+
+    def load_state(self):
+        """
+        Method to load the finished items of an interrupted run
+        :return:
+        """
+        if self.state_file and os.path.exists(str(self.state_file)):
+            with open(str(self.state_file), encoding="utf-8") as state:
+                self.done = set(json.load(state).get("done", []))
+            self.logger.log_info("DataSeeder: resuming with %s finished items", len(self.done))
+
+    def save_state(self):
+        """
+        Method to write the finished items, replacing the state file atomically
+        :return:
+        """
+        if not self.state_file:
+            return
+        with self.lock:
+            self._unsaved = 0
+            temporary = "{}.tmp".format(self.state_file)
+            with open(temporary, "w", encoding="utf-8") as state:
+                json.dump({"done": sorted(self.done)}, state, ensure_ascii=False)
+            os.replace(temporary, str(self.state_file))
+
+    def _finish(self, key, stat):
+        with self.lock:
+            self.done.add(key)
+            self.stats[stat] += 1
+            self._unsaved += 1
+            checkpoint = self._unsaved >= self.checkpoint_every
+        if checkpoint:
+            self.save_state()
+
+    def _fail(self, key, error):
+        with self.lock:
+            self.stats["failed"] += 1
+        self.logger.log_error("DataSeeder: %s failed: %s", key, error)
+
+    # Seeding
+
+    def _run(self, tasks):
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="seeder") as executor:
+            futures = {executor.submit(task, *args): args for task, args in tasks}
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is not None:
+                    self._fail(futures[future], error)
+
+    def _create_collection(self, collection_name, existing):
+        key = "collection:" + collection_name
+        if collection_name in existing:
+            self._finish(key, "skipped")
+        elif self.api_client.create_collection(collection_name):
+            self._finish(key, "created")
+        else:
+            self._fail(key, "not created")
+
+    def _upload_documents(self, collection_name, document_names, document_path):
+        existing = set(self.api_client.get_document_names(collection_name))
+        for document_name in document_names:
+            key = "document:{}/{}".format(collection_name, document_name)
+            if key in self.done:
+                continue
+            if document_name in existing:
+                self._finish(key, "skipped")
+                continue
+            status = self.api_client.upload_document(collection_name, document_path, document_name=document_name)
+            if status == Documents.document_upload_success_msg:
+                self._finish(key, "uploaded")
+            else:
+                self._fail(key, status)
+
+    def seed(self, plan):
+        """
+        Method to create the collections and upload the documents of a plan, skipping finished and existing items
+        :param plan: dict of collection name -> list of document names
+        :return: (Dict) stats: created, uploaded, skipped, failed, elapsed (secs)
+        """
+        self.logger.log_enter("DataSeeder: seed")
+
+        start = time.monotonic()
+        try:
+            pending = [name for name in plan if "collection:" + name not in self.done]
+            existing = set(self.api_client.get_collection_names()) if pending else set()
+            self._run([(self._create_collection, (name, existing)) for name in pending])
+
+            uploads = [(name, [document_name for document_name in documents
+                               if "document:{}/{}".format(name, document_name) not in self.done])
+                       for name, documents in plan.items()]
+            uploads = [(name, documents) for name, documents in uploads if documents]
+            if uploads:
+                with tempfile.TemporaryDirectory(dir=self.document_dir) as directory:
+                    document_path = Path(directory).joinpath("synthetic.pdf")
+                    write_pdf(document_path, self.document_size, pages=self.pages, title="Seeded document")
+                    # one task per collection, its documents are checked against one listing
+                    self._run([(self._upload_documents, (name, documents, document_path))
+                               for name, documents in uploads])
+        finally:
+            self.save_state()
+
+        stats = dict(self.stats, elapsed=time.monotonic() - start)
+        self.logger.log_info("DataSeeder: seed %s", stats)
+        self.logger.log_exit("DataSeeder: seed")
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-url", default=os.environ.get("DE_APP_URL", "http://127.0.0.1:8080"))
+    parser.add_argument("--username", default=os.environ.get("DE_USER_NAME", "test_user"))
+    parser.add_argument("--password", default=os.environ.get("DE_PASSWORD", "test_password"))
+    parser.add_argument("--collections", type=int, default=1000)
+    parser.add_argument("--documents", type=int, default=20, help="documents per collection")
+    parser.add_argument("--document-size", type=int, default=32 * 1024, help="size of the synthetic PDFs (bytes)")
+    parser.add_argument("--pages", type=int, default=1, help="pages of the synthetic PDFs")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the generated names")
+    parser.add_argument("--state-file", default=".seed_state.json", help="state file to resume from")
+    args = parser.parse_args()
+
+    client = DocumentExplorerApiClient(args.app_url, maxsize=args.workers)
+    if not client.login_form(args.app_url + "/auth/login", args.username, args.password):
+        parser.exit(1, "login to {} failed\n".format(args.app_url))
+    try:
+        seeder = DataSeeder(client, state_file=args.state_file, workers=args.workers,
+                            document_size=args.document_size, pages=args.pages)
+        stats = seeder.seed(build_plan(args.collections, args.documents, args.seed))
+    finally:
+        client.close()
+    print("created {created} collections, uploaded {uploaded} documents, skipped {skipped}, failed {failed} "
+          "in {elapsed:.1f}s".format(**stats))
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Time budgets for tests and DriverUtils operations.
+
+A Deadline is opened per test (conftest test_deadline fixture) and per DriverUtils operation (operation_deadline),
+nested in the test's. Every wait shrinks its timeout to the remaining budget of the innermost deadline, and
+once the budget is spent DeadlineExceeded is raised. It is not a WebDriverException, so the exception handlers
+of the operations let it through instead of carrying on into the next wait.
+Cleanup steps (page reset, pager rewind) run under a detached deadline of their own, so they still run once the
+budget of their operation is spent.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.logs_util import DocumentExplorerLogger
+
+logger = DocumentExplorerLogger()
+
+_local = threading.local()
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when a wait is started or timed out after the budget of its deadline was spent.
+    """
+
+
+class Deadline:
+    """
+    Time budget of a test or operation, never ending after the deadline it is nested in.
+    """
+
+    def __init__(self, budget, name="deadline", parent=None):
+        """
+        :param budget: time (secs) allowed
+        :param name: name of the test or operation, for messages and the report
+        :param parent: Deadline this one is nested in
+        """
+        self.name = name
+        self.budget = budget
+        self.parent = parent
+        self.start = time.monotonic()
+        self.expires = self.start + budget
+        if parent is not None:
+            self.expires = min(self.expires, parent.expires)
+        self.exceeded = False
+
+    def __repr__(self):
+        return "Deadline({}, budget={:.1f}s, remaining={:.1f}s)".format(self.name, self.budget, self.remaining())
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return time.monotonic() >= self.expires
+
+    def _mark_exceeded(self):
+        now = time.monotonic()
+        deadline = self
+        while deadline is not None:
+            if now >= deadline.expires:
+                deadline.exceeded = True
+            deadline = deadline.parent
+
+    def exceeded_error(self, operation):
+        """
+        Method to mark the spent deadlines as exceeded and build the exception to raise
+        :param operation: name of the wait or step which could not run
+        :return: DeadlineExceeded object
+        """
+        self._mark_exceeded()
+        # name the outermost spent deadline, the one whose budget actually ran out
+        spent = self
+        deadline = self.parent
+        while deadline is not None:
+            if deadline.exceeded:
+                spent = deadline
+            deadline = deadline.parent
+        return DeadlineExceeded("{}: budget of {:.1f}s spent after {:.1f}s, aborting {}".format(
+            spent.name, spent.budget, spent.elapsed(), operation))
+
+    def timeout(self, timeout, operation="wait"):
+        """
+        Method to shrink the timeout of a wait to the remaining budget
+        :param timeout: timeout (secs) the wait would use without a deadline
+        :param operation: name of the wait, for the exception message
+        :return: (float) timeout (secs) to use
+        :raises DeadlineExceeded: if the budget is spent
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise self.exceeded_error(operation)
+        return min(timeout, remaining)
+
+    def summary(self):
+        """
+        Method to get the budget consumption, e.g. for the test report
+        :return: (Dict) name, budget (secs), elapsed (secs), consumed (fraction of the budget), exceeded
+        """
+        elapsed = self.elapsed()
+        return {"name": self.name, "budget": self.budget, "elapsed": elapsed,
+                "consumed": elapsed / self.budget if self.budget else 0.0, "exceeded": self.exceeded}
+
+
+def current_deadline():
+    """
+    Method to get the innermost deadline of the current thread
+    :return: Deadline object, None if no deadline is open
+    """
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def clamp_timeout(timeout, operation="wait"):
+    """
+    Method to shrink a timeout to the remaining budget of the current deadline
+    :param timeout: timeout (secs) without a deadline
+    :param operation: name of the wait, for the exception message
+    :return: (float) timeout (secs) to use
+    :raises DeadlineExceeded: if the budget is spent
+    """
+    deadline = current_deadline()
+    return timeout if deadline is None else deadline.timeout(timeout, operation)
+
+
+@contextmanager
+def deadline_scope(budget, name="deadline", detached=False):
+    """
+    Context manager opening a deadline nested in the current one
+    :param budget: time (secs) allowed, None or 0 to not open a deadline
+    :param name: name of the test or operation
+    :param detached: do not inherit the expiry of the current deadline, for the cleanup after an operation whose
+                     budget may be spent (e.g. resetting the page for the next test)
+    :return: the opened Deadline object, the current one (or None) if no deadline is opened
+    """
+    if not budget:
+        yield current_deadline()
+        return
+    deadline = Deadline(budget, name, parent=None if detached else current_deadline())
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    _local.stack.append(deadline)
+    try:
+        yield deadline
+    except DeadlineExceeded:
+        logger.log_debug("Deadline: %s exceeded after %.3fs", name, deadline.elapsed())
+        raise
+    finally:
+        _local.stack.remove(deadline)
+
+
+def operation_deadline(method):
+    """
+    Decorator running a DriverUtils method under a deadline of self.operation_budget secs
+    :param method: method to decorate
+    :return: decorated method
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with deadline_scope(self.operation_budget, "{}: {}".format(type(self).__name__, method.__name__)):
+            return method(self, *args, **kwargs)
+    return wrapper
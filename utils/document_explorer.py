@@ -1,19 +1,24 @@
+import os
 from pathlib import Path
 
 from utils.logs_util import DocumentExplorerLogger
+from utils.table_snapshot import TableSnapshot
 
 
 class DocumentExplorer:
     logger = DocumentExplorerLogger()
 
+    # Common CSS elements
+    loading_spinner_css = ".picnicSpinner"
+
     def __init__(self):
         self.logger.log_enter("DocumentExplorer: __init__")
 
-        self.app_url = "<ENTER_APP_URL>"
+        self.app_url = os.environ.get("DE_APP_URL", "<ENTER_APP_URL>")
         self.document_explorer_url = self.app_url + '/document-explorer'
 
-        self.test_user_name = "<ENTER_USER_NAME>"
-        self.test_user_password = "<ENTER_PASSWORD>"
+        self.test_user_name = os.environ.get("DE_USER_NAME", "<ENTER_USER_NAME>")
+        self.test_user_password = os.environ.get("DE_PASSWORD", "<ENTER_PASSWORD>")
 
         self.logger.log_exit("DocumentExplorer: __init__")
 
@@ -21,7 +26,7 @@ class DocumentExplorer:
         """
         Method to check if collection/document name exists in list
         :param name: name of item
-        :param item_list: list of items to check the name
+        :param item_list: list of items to check the name, or TableSnapshot checked with its names index
         :return: (boolean) True: if name exists
                          False: if name does not exists
         """
@@ -32,14 +37,16 @@ class DocumentExplorer:
     def get_name_list(self, item_dict, col_num=0):
         """
         Method to extract list of names from parsed table data
-        :param item_dict: parsed table data with row as key and list of cols as values
-        :param col_num: the column number for names attribute
+        :param item_dict: TableSnapshot, or parsed table data with row as key and list of cols as values
+        :param col_num: the column number or header name for names attribute
         :return: (List) list of names
         """
         self.logger.log_enter("DocumentExplorer: get_name_list")
 
         name_list = []
-        if item_dict:
+        if isinstance(item_dict, TableSnapshot):
+            name_list = list(item_dict.column(col_num)) if item_dict.headers else []
+        elif item_dict:
             for key, values in item_dict.items():
                 name_list.append(values[col_num])
 
@@ -61,9 +68,9 @@ class DocumentExplorer:
 
         item_list = [item.lower() for item in item_list]
         sorted_list = item_list.copy()
-        self.logger.log_debug("Collections: validate_list_order: collection_list: {}".format(item_list))
+        self.logger.log_debug("Collections: validate_list_order: collection_list: %s", item_list)
         sorted_list = sorted(sorted_list, reverse=reverse_flag)
-        self.logger.log_debug("Collections: validate_list_order: sorted_list: {}".format(sorted_list))
+        self.logger.log_debug("Collections: validate_list_order: sorted_list: %s", sorted_list)
 
         if sort_order in ["ascending", "descending"]:
             assert item_list == sorted_list
@@ -87,7 +94,9 @@ class Collections(DocumentExplorer):
                                   "input:nth-child(1)"
     collection_table_css = ".echoTableHeightFull > main:nth-child(2) > table:nth-child(1)"
     collection_table_sort_css = ".tableHeaderIconSort"
-    collection_table_page_size_css = "select.ng-pristine"
+    collection_table_page_size_css = ".echoTableHeightFull > footer:nth-child(3) > select"
+    collection_table_next_page_css = ".echoTableHeightFull > footer:nth-child(3) > pager > button.pagerNext"
+    collection_table_previous_page_css = ".echoTableHeightFull > footer:nth-child(3) > pager > button.pagerPrevious"
 
     # Error messages
     create_error_message = "Something went unexpectedly wrong. Try again. If the problem persists contact your " \
@@ -104,16 +113,25 @@ class Documents(DocumentExplorer):
     document_upload_button_css = "button.picnicButtonColorGreen:nth-child(1)"
     document_file_input_css = ".picnicGridColumn3 > heading:nth-child(1) > " \
                               "echo-floating-expandable-uploader-standalone:nth-child(2) > input:nth-child(2)"
-    document_search_css = "input.ng-pristine"
+    document_search_css = ".picnicGridColumn3 > search:nth-child(2) > input:nth-child(1)"
     document_table_css = ".picnicTableReactiveRows"
+    document_table_next_page_css = ".picnicTableReactive > footer > pager > button.pagerNext"
+    document_table_previous_page_css = ".picnicTableReactive > footer > pager > button.pagerPrevious"
     document_clear_finished_css = ".picnicTextUnderline"
     document_upload_status_css = ".picnicGridColumn7 > chunk:nth-child(1)"
     document_upload_floating_css = ".picnicFloatingExpandableMainGapsNo"
+    document_upload_row_css = ".picnicFloatingExpandableMainGapsNo > row"
+    document_upload_row_name_css = ".uploadRowName"
+    document_upload_row_status_css = ".uploadRowStatus"
+    # Index of the Name column of the document table, after the State column
+    document_table_name_column = 1
 
     # Error/Success messages
     document_upload_failure_msg = "Rejected (because of type)"
     document_upload_finished_msg = "finished uploading"
     document_upload_success_msg = "Succeeded"
+    document_upload_pending_msgs = ("Queued", "Uploading")
+    document_upload_timeout_msg = "timed out"
 
     # Test files
     BASEDIR = Path(__file__).resolve().parent
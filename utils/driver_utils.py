@@ -1,25 +1,342 @@
+import os
 import time
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import ElementClickInterceptedException, NoSuchElementException, TimeoutException, \
-    StaleElementReferenceException, ElementNotInteractableException
+    StaleElementReferenceException, ElementNotInteractableException, WebDriverException
 
-from utils.logs_util import DocumentExplorerLogger
+from utils.logs_util import DocumentExplorerLogger, LazyValue
 from utils.document_explorer import Collections
 from utils.document_explorer import Documents
+from utils.wait_utils import WaitUtils
+from utils.session_cache import get_origin
+from utils.upload_watcher import UploadWatcher
+from utils.locator_cache import LocatorCache
+from utils.network_monitor import NetworkMonitor
+from utils.table_snapshot import TableSnapshot
+from utils.table_diff import TableDiffer
+from utils.deadline import DeadlineExceeded, deadline_scope, operation_deadline
+from utils.artifacts import FailureArtifacts
+
+# Extracts all table rows (header rows without td cells are skipped) in a single round trip as
+# [row text, [cell values]] pairs. With headers set returns {headers: [header texts], rows: [[cell values]]}
+# instead, without the row texts.
+# arguments: table CSS selector, optional list of column indexes, optional list of attribute names, headers
+TABLE_EXTRACT_SCRIPT = """
+var table = document.querySelector(arguments[0]);
+if (!table) {
+    return null;
+}
+var columns = arguments[1];
+var attributes = arguments[2];
+var withHeaders = arguments[3];
+var rows = table.getElementsByTagName('tr');
+var headers = null;
+var result = [];
+for (var i = 0; i < rows.length; i++) {
+    var cells = rows[i].getElementsByTagName('td');
+    if (!cells.length) {
+        // header row, the first one names the columns
+        var names = rows[i].getElementsByTagName('th');
+        if (withHeaders && headers === null && names.length) {
+            headers = [];
+            for (var h = 0; h < names.length; h++) {
+                headers.push((names[h].innerText || names[h].textContent || '').trim());
+            }
+            if (columns) {
+                headers = columns.map(function (index) {
+                    return index < headers.length ? headers[index] : String(index);
+                });
+            }
+        }
+        continue;
+    }
+    var indexes = columns;
+    if (!indexes) {
+        indexes = [];
+        for (var j = 0; j < cells.length; j++) {
+            indexes.push(j);
+        }
+    }
+    var values = [];
+    for (var k = 0; k < indexes.length; k++) {
+        var cell = cells[indexes[k]];
+        if (!cell) {
+            values.push(null);
+            continue;
+        }
+        var text = (cell.innerText || '').trim();
+        if (attributes) {
+            var value = {text: text};
+            for (var a = 0; a < attributes.length; a++) {
+                value[attributes[a]] = cell.getAttribute(attributes[a]);
+            }
+            values.push(value);
+        } else {
+            values.push(text);
+        }
+    }
+    result.push(withHeaders ? values : [(rows[i].innerText || '').trim(), values]);
+}
+return withHeaders ? {headers: headers || [], rows: result} : result;
+"""
+
+# Clicks a pager (next or previous) button if it is present and enabled, returns true if the page was turned
+NEXT_PAGE_SCRIPT = """
+var button = document.querySelector(arguments[0]);
+if (!button || button.disabled || button.getAttribute('aria-disabled') === 'true'
+        || button.classList.contains('disabled')) {
+    return false;
+}
+button.click();
+return true;
+"""
+
+# Returns the Document Explorer to its baseline without a page load: closes the create collection
+# dialogs, clears the collection and document searches and finished uploads, and resets page size
+# and sort. Returns the names of the parts which had to be reset.
+# arguments: dict of selectors, see DriverUtils.app_state_selectors
+RESET_APP_STATE_SCRIPT = """
+var s = arguments[0];
+var actions = [];
+var sortState = function (sort) {
+    return sort.getAttribute('data-sort') || sort.getAttribute('aria-sort');
+};
+var clearInput = function (css, name) {
+    var input = document.querySelector(css);
+    if (input && input.value) {
+        input.value = '';
+        input.dispatchEvent(new Event('input', {bubbles: true}));
+        input.dispatchEvent(new Event('change', {bubbles: true}));
+        actions.push(name);
+    }
+};
+Array.prototype.forEach.call(document.querySelectorAll(s.dialog_cancel), function (button) {
+    button.click();
+    actions.push('dialog');
+});
+clearInput(s.collection_search, 'collection_search');
+clearInput(s.document_search, 'document_search');
+var clearFinished = document.querySelector(s.clear_finished);
+if (clearFinished && document.querySelector(s.upload_row)) {
+    clearFinished.click();
+    actions.push('upload_panel');
+}
+var select = document.querySelector(s.page_size);
+if (select && select.options.length) {
+    var baseline = select.options[0];
+    for (var i = 0; i < select.options.length; i++) {
+        if (select.options[i].defaultSelected) {
+            baseline = select.options[i];
+        }
+    }
+    if (select.value !== baseline.value) {
+        select.value = baseline.value;
+        select.dispatchEvent(new Event('change', {bubbles: true}));
+        actions.push('page_size');
+    }
+}
+var sort = document.querySelector(s.sort);
+for (var clicks = 0; sort && clicks < 2 && sortState(sort) && sortState(sort) !== 'none'; clicks++) {
+    sort.click();
+    actions.push('sort');
+}
+return actions;
+"""
+
+# Returns the names of the parts of the application which are not at their baseline,
+# including baseline selectors which no longer match. The selectors must not depend on the form state
+# (e.g. ng-pristine), a control turns ng-dirty once used and stays so when it is cleared.
+# arguments: dict of selectors, see DriverUtils.app_state_selectors
+CHECK_APP_STATE_SCRIPT = """
+var s = arguments[0];
+var failures = [];
+var checkEmpty = function (css, name) {
+    var input = document.querySelector(css);
+    if (!input || input.value) {
+        failures.push(name);
+    }
+};
+if (document.querySelector(s.dialog_cancel)) {
+    failures.push('dialog');
+}
+checkEmpty(s.collection_search, 'collection_search');
+checkEmpty(s.document_search, 'document_search');
+var statuses = document.querySelectorAll(s.upload_row + ' ' + s.upload_row_status);
+for (var i = 0; i < statuses.length; i++) {
+    if (s.pending_statuses.indexOf(statuses[i].textContent.trim()) >= 0) {
+        failures.push('upload_pending');
+        break;
+    }
+}
+var select = document.querySelector(s.page_size);
+if (!select) {
+    failures.push('page_size');
+} else {
+    for (var j = 0; j < select.options.length; j++) {
+        if (select.options[j].defaultSelected && select.value !== select.options[j].value) {
+            failures.push('page_size');
+        }
+    }
+}
+var sort = document.querySelector(s.sort);
+var sortState = sort && (sort.getAttribute('data-sort') || sort.getAttribute('aria-sort'));
+if (sortState && sortState !== 'none') {
+    failures.push('sort');
+}
+return failures;
+"""
+
+
+def upload_chunks(document_paths, chunk_size):
+    """
+    Method to split document paths into upload chunks of at most chunk_size files, starting a new chunk
+    when a file name is already in the current one
+    :param document_paths: list of local document paths
+    :param chunk_size: max number of files per chunk
+    :return: (List) list of lists of document paths, in upload order
+    """
+    chunks = []
+    names = set()
+    for document_path in document_paths:
+        name = os.path.basename(document_path)
+        if not chunks or len(chunks[-1]) >= chunk_size or name in names:
+            chunks.append([])
+            names = set()
+        chunks[-1].append(document_path)
+        names.add(name)
+    return chunks
+
+
+class UploadBatchResult:
+    """
+    Result of a batch document upload: status message and latency per document path, and aggregate throughput.
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.latencies = {}
+        self.total_bytes = 0
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return "UploadBatchResult(files={}, succeeded={}, elapsed={:.3f}s, files_per_second={:.2f})".format(
+            len(self.results), self.count(DriverUtils.document.document_upload_success_msg), self.elapsed,
+            self.files_per_second)
+
+    def count(self, status):
+        """
+        Method to count the files with a status message
+        :param status: status message
+        :return: (int) number of files
+        """
+        return sum(1 for result in self.results.values() if result == status)
+
+    @property
+    def files_per_second(self):
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def megabytes_per_second(self):
+        return self.total_bytes / (1024 * 1024) / self.elapsed if self.elapsed else 0.0
 
 
 class DriverUtils:
     logger = DocumentExplorerLogger()
     collection = Collections()
     document = Documents()
+    waits = WaitUtils()
+    locators = LocatorCache(waits)
+    network = NetworkMonitor(waits)
+    table_diff = TableDiffer(waits)
+    artifacts = FailureArtifacts()
+    upload_watcher = UploadWatcher(document.document_upload_status_css, document.document_upload_row_css,
+                                   document.document_upload_row_name_css, document.document_upload_row_status_css)
+    app_state_selectors = {
+        "collection_search": collection.collection_search_input_css,
+        "document_search": document.document_search_css,
+        "dialog_cancel": collection.collection_cancel_button_css,
+        "clear_finished": document.document_clear_finished_css,
+        "upload_row": document.document_upload_row_css,
+        "upload_row_status": document.document_upload_row_status_css,
+        "pending_statuses": list(document.document_upload_pending_msgs),
+        "page_size": collection.collection_table_page_size_css,
+        "sort": collection.collection_table_sort_css,
+    }
+    # Number of in-app state resets and of refresh fallbacks, with the failed checks causing them
+    reset_stats = {"reset": 0, "refresh": 0, "failed_checks": {}}
+    # Time budget (secs) of an operation, its waits abort with DeadlineExceeded once it is spent
+    operation_budget = 120
+    # Time budget (secs) of a cleanup step, independent of the budget left to the operation it runs after
+    cleanup_budget = 30
 
     def __init__(self):
         self.logger.log_enter("DriverUtils: __init__")
-        self.logger.log_exit("DriverUtils: __init")
+        self.logger.log_exit("DriverUtils: __init__")
+
+    def reset_app_state(self, driver):
+        """
+        Method to return the application to its baseline (no searches, dialogs, finished uploads,
+        default page size and sort) without reloading the page.
+        Falls back to a refresh when the state check after the reset fails. Errors are logged and not raised,
+        as it runs in the finally of the operations and must not replace their outcome.
+        :param driver: webdriver object to use
+        :return: (boolean) True: if the state was reset in-app
+                         False: if the page was refreshed, or the refresh failed
+        """
+        self.logger.log_enter("DriverUtils: reset_app_state")
+
+        failures = ["reset_error"]
+        with deadline_scope(self.cleanup_budget, "DriverUtils: reset_app_state", detached=True):
+            try:
+                actions = driver.execute_script(RESET_APP_STATE_SCRIPT, self.app_state_selectors)
+                self.logger.log_debug("DriverUtils: reset_app_state actions: %s", actions)
+                if actions:
+                    self.waits.wait_for_page_ready(driver, self.collection.loading_spinner_css)
+                failures = driver.execute_script(CHECK_APP_STATE_SCRIPT, self.app_state_selectors)
+            except TimeoutException as e:
+                self.logger.log_error("DriverUtils: reset_app_state Exception: %s", e)
+            except WebDriverException as e:
+                self.logger.log_error("DriverUtils: reset_app_state Exception: %s", e)
+            except DeadlineExceeded as e:
+                self.logger.log_error("DriverUtils: reset_app_state Exception: %s", e)
+
+        if failures:
+            self.logger.log_info("DriverUtils: reset_app_state refreshing, failed checks: %s", failures)
+            for failure in failures:
+                self.reset_stats["failed_checks"][failure] = self.reset_stats["failed_checks"].get(failure, 0) + 1
+            self.reset_stats["refresh"] += 1
+            # the elements of the page are gone with the refresh, also if it fails
+            self.locators.invalidate(driver)
+            with deadline_scope(self.cleanup_budget, "DriverUtils: reset_app_state refresh", detached=True):
+                try:
+                    driver.refresh()
+                    self.artifacts.install(driver)
+                    self.waits.wait_for_page_ready(driver, self.collection.loading_spinner_css)
+                except TimeoutException as e:
+                    self.logger.log_error("DriverUtils: reset_app_state refresh Exception: %s", e)
+                except WebDriverException as e:
+                    self.logger.log_error("DriverUtils: reset_app_state refresh Exception: %s", e)
+                except DeadlineExceeded as e:
+                    self.logger.log_error("DriverUtils: reset_app_state refresh Exception: %s", e)
+        else:
+            self.reset_stats["reset"] += 1
+
+        self.logger.log_exit("DriverUtils: reset_app_state", refreshed=bool(failures))
+        return not failures
+
+    def step_failed(self, driver, step, error):
+        """
+        Method to log the failure of a step and capture its artifacts, written in the background
+        :param driver: webdriver object to use
+        :param step: name of the failed step
+        :param error: exception of the failure
+        :return:
+        """
+        self.logger.log_error("DriverUtils: %s Exception: %s", step, error)
+        self.artifacts.capture(driver, step, error)
 
     def login(self, driver, url, username, password):
         """
@@ -28,28 +345,101 @@ class DriverUtils:
         :param url: url of document explorer application
         :param username: username for login
         :param password: password for login
-        :return:
+        :return: (string) url of the login page
         """
         self.logger.log_enter("DriverUtils: login")
 
         driver.get(url)
+        self.locators.invalidate(driver)
+        login_page_url = driver.current_url
         driver.find_element_by_id("username").send_keys(username)
         driver.find_element_by_id("password").send_keys(password)
         driver.find_element_by_id("kc-login").click()
 
         self.logger.log_exit("DriverUtils: login")
+        return login_page_url
+
+    def is_logged_in(self, driver, url):
+        """
+        Method to check if driver is on the Document Explorer Application and not on the login page
+        :param driver: webdriver object to use
+        :param url: url of document explorer application
+        :return: (boolean) True: if logged in
+                         False: if not logged in
+        """
+        self.logger.log_enter("DriverUtils: is_logged_in")
+
+        logged_in = False
+        try:
+            self.waits.wait_for_page_ready(driver, self.collection.loading_spinner_css)
+            logged_in = get_origin(driver.current_url) == get_origin(url) and \
+                not driver.find_elements_by_id("username")
+        except TimeoutException as e:
+            self.logger.log_error("DriverUtils: is_logged_in Exception: %s", e)
+
+        self.logger.log_exit("DriverUtils: is_logged_in")
+        return logged_in
+
+    def login_with_session(self, driver, url, username, password, session_cache):
+        """
+        Method to login into Document Explorer Application reusing a saved session.
+        Falls back to a full login if there is no saved session or it is rejected,
+        and saves the new session for the next driver.
+        :param driver: webdriver object to use
+        :param url: url of document explorer application
+        :param username: username for login
+        :param password: password for login
+        :param session_cache: SessionCache object to use
+        :return: (boolean) True: if the saved session was reused
+                         False: if a full login was done
+        """
+        self.logger.log_enter("DriverUtils: login_with_session")
+
+        self.locators.invalidate(driver)
+        reused = False
+        if session_cache.restore(driver, url, username):
+            reused = self.is_logged_in(driver, url)
+            if not reused:
+                self.logger.log_info("DriverUtils: login_with_session saved session rejected")
+                session_cache.invalidate()
+                driver.delete_all_cookies()
+
+        if not reused:
+            login_page_url = self.login(driver, url, username, password)
+            try:
+                self.waits.until(driver, "wait_for_login",
+                                 lambda driver: get_origin(driver.current_url) == get_origin(url))
+                extra_urls = None
+                if get_origin(login_page_url) != get_origin(url):
+                    # identity provider session, read on the login page path for the realm scoped cookies
+                    extra_urls = [login_page_url]
+                session_cache.save(driver, url, username, extra_urls=extra_urls)
+            except TimeoutException as e:
+                self.logger.log_error("DriverUtils: login_with_session Exception: %s", e)
+            except WebDriverException as e:
+                # the session could not be saved, e.g. the cookies of the identity provider origin could not
+                # be read. The next driver logs in again, this one continues with a plain login.
+                self.logger.log_error("DriverUtils: login_with_session save Exception: %s", e)
+                session_cache.invalidate()
+                driver.get(url)
+                self.locators.invalidate(driver)
+                if not self.is_logged_in(driver, url):
+                    self.login(driver, url, username, password)
+
+        self.logger.log_exit("DriverUtils: login_with_session")
+        return reused
 
     def click_button(self, driver, button_css):
         self.logger.log_enter("DriverUtils: click_button")
 
         # click on button
         try:
-            button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, button_css)))
-            self.logger.log_debug("DriverUtils: click_button button {}".format(button))
+            button = self.locators.find(driver, button_css, clickable=True)
+            self.logger.log_debug("DriverUtils: click_button button %s", button)
             if button:
                 button.click()
         except TimeoutException as e:
-            self.logger.log_debug("DriverUtils: click_button Exception: {}".format(e))
+            self.logger.log_debug("DriverUtils: click_button Exception: %s", e)
 
         self.logger.log_exit("DriverUtils: click_button")
 
@@ -63,50 +453,268 @@ class DriverUtils:
 
         search_element = None
         try:
-            search_element = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                By.CSS_SELECTOR, self.collection.collection_search_input_css)))
-            self.logger.log_debug("DriverUtils: get_collection_search_element search_element: {}".format(
-                search_element))
+            search_element = self.locators.find(driver, self.collection.collection_search_input_css)
+            self.logger.log_debug("DriverUtils: get_collection_search_element search_element: %s", search_element)
         except NoSuchElementException as e:
-            self.logger.log_error("DriverUtils: search_document Exception: {}".format(e))
+            self.step_failed(driver, "get_collection_search_element", e)
 
         self.logger.log_exit("DriverUtils: get_collection_search_element")
         return search_element
 
-    def parse_table(self, driver, table_css):
+    def wait_for_requests(self, driver, since, start_ms=None):
+        """
+        Method to wait for the backend requests fired by an action, e.g. the query of a search
+        :param driver: webdriver object to use
+        :param since: request count returned by NetworkMonitor.install before the action
+        :param start_ms: time (ms) for the first request to start, longer than the debounce of the action.
+                         Defaults to NetworkMonitor.start_ms
+        :return: (boolean) True: if requests of the action were seen and finished
+                         False: if none was seen within start_ms, or requests are still in flight after
+                                change_timeout. The caller has to keep waiting for the table change.
+        """
+        start_ms = self.network.start_ms if start_ms is None else start_ms
+        idle = self.network.wait_for_network_idle(driver, since=since, timeout=self.waits.change_timeout,
+                                                  start_ms=start_ms)
+        # a debounce longer than start_ms looks like an action without request, the table may still change
+        records = self.network.requests(driver, since)
+        return idle and bool(records)
+
+    def clear_search(self, driver, search_element, table_css, spinner_css):
+        """
+        Method to clear a search input and wait for the table to reload, nothing is done if it is empty
+        :param driver: webdriver object to use
+        :param search_element: search input element
+        :param table_css: CSS selector of the table filtered by the search
+        :param spinner_css: CSS selector of the loading spinner
+        :return:
+        """
+        if not search_element.get_attribute("value"):
+            return
+        fingerprint = self.waits.table_fingerprint(driver, table_css)
+        since = self.network.install(driver)
+        search_element.clear()
+        if self.wait_for_requests(driver, since):
+            fingerprint = None
+        self.waits.wait_for_table_update(driver, table_css, spinner_css, fingerprint=fingerprint)
+
+    def extract_table(self, driver, table_css, columns=None, attributes=None):
+        """
+        Method to extract the table in the UI with a single execute_script round trip.
+        :param driver: webdriver object to use
+        :param table_css: CSS selector for table element
+        :param columns: list of column indexes to extract, None for all columns
+        :param attributes: list of cell attribute names to capture, None for text only.
+                           When given each cell is a dict with "text" and the attribute values.
+        :return: (List) list of [row text, list of cell values], None if table is not present
+        """
+        self.logger.log_enter("DriverUtils: extract_table", selector=table_css)
+
+        rows = driver.execute_script(TABLE_EXTRACT_SCRIPT, table_css, columns, attributes)
+        row_count = len(rows) if rows is not None else None
+        self.logger.log_debug("DriverUtils: extract_table rows: %s", row_count)
+
+        self.logger.log_exit("DriverUtils: extract_table", rows=row_count)
+        return rows
+
+    def extract_snapshot(self, driver, table_css, columns=None, name_column=0):
+        """
+        Method to extract the table in the UI with its headers as a TableSnapshot, in a single round trip.
+        :param driver: webdriver object to use
+        :param table_css: CSS selector for table element
+        :param columns: list of column indexes to extract, None for all columns
+        :param name_column: index (among the extracted columns) or header name of the names column
+        :return: TableSnapshot object, None if table is not present
+        """
+        self.logger.log_enter("DriverUtils: extract_snapshot", selector=table_css)
+
+        snapshot = None
+        table = driver.execute_script(TABLE_EXTRACT_SCRIPT, table_css, columns, None, True)
+        if table is not None:
+            snapshot = TableSnapshot.from_rows(table["rows"], headers=table["headers"], name_column=name_column)
+            self.logger.log_debug("DriverUtils: extract_snapshot %s", snapshot)
+
+        self.logger.log_exit("DriverUtils: extract_snapshot", rows=len(snapshot) if snapshot is not None else None)
+        return snapshot
+
+    def parse_table(self, driver, table_css, fingerprint=None, bulk=True, columns=None, name_column=0):
         """
         Method to parse the table in the UI.
         :param driver: webdriver object to use
         :param table_css: CSS selector for table element
-        :return: (Dict) dictionary of parsed element in the table
+        :param fingerprint: table fingerprint taken before the action that updates the table
+        :param bulk: extract the table in a single round trip, falls back to per element parsing on failure
+        :param columns: list of column indexes to extract in bulk mode, None for all columns
+        :param name_column: index or header name of the names column, e.g. Documents.document_table_name_column
+        :return: TableSnapshot of the table rows, empty if the table is not present
+        """
+        self.logger.log_enter("DriverUtils: parse_table", selector=table_css, bulk=bulk)
+
+        table_contents = None
+        try:
+            # wait for table items to get loaded
+            self.waits.wait_for_table_update(driver, table_css, self.collection.loading_spinner_css,
+                                             fingerprint=fingerprint)
+        except TimeoutException as e:
+            self.logger.log_error("DriverUtils: parse_table Exception: %s", e)
+
+        if bulk:
+            try:
+                table_contents = self.extract_snapshot(driver, table_css, columns=columns, name_column=name_column)
+            except WebDriverException as e:
+                self.logger.log_error("DriverUtils: parse_table bulk extraction Exception: %s", e)
+
+        if table_contents is None:
+            # fallback to per element parsing
+            table_contents = self.parse_table_elements(driver, table_css, name_column=name_column)
+
+        self.logger.log_exit("DriverUtils: parse_table", rows=len(table_contents))
+        return table_contents
+
+    def iter_table_rows(self, driver, table_css, next_page_css, columns=None, previous_page_css=None):
+        """
+        Generator to lazily iterate over the rows of a paginated table.
+        Rows are extracted one page at a time and the pager is only advanced
+        when the caller consumes past the end of the current page.
+        With previous_page_css the pager is turned back to the first page once the iteration ends or the
+        generator is closed, otherwise it is left on the last page read and the caller has to reset it.
+        :param driver: webdriver object to use
+        :param table_css: CSS selector for table element
+        :param next_page_css: CSS selector for the pager next button
+        :param columns: list of column indexes to extract, None for all columns
+        :param previous_page_css: CSS selector for the pager previous button
+        :return: (Generator) list of cell values per row
+        """
+        self.logger.log_enter("DriverUtils: iter_table_rows", selector=table_css)
+
+        page = 0
+        try:
+            while True:
+                rows = self.extract_table(driver, table_css, columns=columns) or []
+                self.logger.log_debug("DriverUtils: iter_table_rows page: %s rows: %s", page, len(rows))
+                for row_text, columns_list in rows:
+                    yield columns_list
+                del rows
+
+                # turn the page, stop at the last page
+                fingerprint = self.waits.table_fingerprint(driver, table_css)
+                if not driver.execute_script(NEXT_PAGE_SCRIPT, next_page_css):
+                    break
+                page += 1
+                self.waits.wait_for_table_update(driver, table_css, self.collection.loading_spinner_css,
+                                                 fingerprint=fingerprint)
+        finally:
+            if previous_page_css and page:
+                self.rewind_pager(driver, table_css, previous_page_css, page)
+            self.logger.log_exit("DriverUtils: iter_table_rows", pages=page + 1)
+
+    def rewind_pager(self, driver, table_css, previous_page_css, pages):
+        """
+        Method to turn the pager of a table back by pages, to the first page after a walk over all pages
+        :param driver: webdriver object to use
+        :param table_css: CSS selector for table element
+        :param previous_page_css: CSS selector for the pager previous button
+        :param pages: number of pages to turn back
+        :return:
+        """
+        self.logger.log_enter("DriverUtils: rewind_pager", pages=pages)
+
+        with deadline_scope(self.cleanup_budget, "DriverUtils: rewind_pager", detached=True):
+            try:
+                for _ in range(pages):
+                    fingerprint = self.waits.table_fingerprint(driver, table_css)
+                    if not driver.execute_script(NEXT_PAGE_SCRIPT, previous_page_css):
+                        break
+                    self.waits.wait_for_table_update(driver, table_css, self.collection.loading_spinner_css,
+                                                     fingerprint=fingerprint)
+            except TimeoutException as e:
+                self.logger.log_error("DriverUtils: rewind_pager Exception: %s", e)
+            except WebDriverException as e:
+                self.logger.log_error("DriverUtils: rewind_pager Exception: %s", e)
+            except DeadlineExceeded as e:
+                self.logger.log_error("DriverUtils: rewind_pager Exception: %s", e)
+
+        self.logger.log_exit("DriverUtils: rewind_pager")
+
+    def get_table_names(self, driver, table_css, next_page_css, col_num=0, fingerprint=None,
+                        previous_page_css=None):
+        """
+        Method to collect the names column over all pages of a table.
+        Only the names column is extracted, rows are not kept in memory.
+        :param driver: webdriver object to use
+        :param table_css: CSS selector for table element
+        :param next_page_css: CSS selector for the pager next button
+        :param col_num: the column number for names attribute
+        :param fingerprint: table fingerprint taken before the action that updates the table
+        :param previous_page_css: CSS selector for the pager previous button, to return the pager to the first
+                                  page afterwards. None leaves it on the last page.
+        :return: (List) list of names
         """
-        self.logger.log_enter("DriverUtils: parse_table")
+        self.logger.log_enter("DriverUtils: get_table_names", selector=table_css)
 
-        table_contents = {}
+        name_list = []
+        try:
+            # wait for table items to get loaded
+            self.waits.wait_for_table_update(driver, table_css, self.collection.loading_spinner_css,
+                                             fingerprint=fingerprint)
+            for columns_list in self.iter_table_rows(driver, table_css, next_page_css, columns=[col_num],
+                                                     previous_page_css=previous_page_css):
+                if columns_list[0] is not None:
+                    name_list.append(columns_list[0])
+        except TimeoutException as e:
+            self.logger.log_error("DriverUtils: get_table_names Exception: %s", e)
+        except WebDriverException as e:
+            self.logger.log_error("DriverUtils: get_table_names Exception: %s", e)
+
+        self.logger.log_exit("DriverUtils: get_table_names", rows=len(name_list))
+        return name_list
+
+    def parse_table_elements(self, driver, table_css, name_column=0):
+        """
+        Method to parse the table in the UI element by element.
+        This costs WebDriver round trips per row and per cell, prefer parse_table in bulk mode.
+        :param driver: webdriver object to use
+        :param table_css: CSS selector for table element
+        :param name_column: index or header name of the names column
+        :return: TableSnapshot of the table rows, empty if the table is not present
+        """
+        self.logger.log_enter("DriverUtils: parse_table_elements", selector=table_css)
+
+        headers = None
+        rows_list = []
         try:
-            # TODO: Use better logic to wait for table items to get loaded instead of static sleep
-            time.sleep(10)
             table = driver.find_element_by_css_selector(table_css)
-            self.logger.log_debug("DriverUtils: parse_table table: {}".format(table))
+            self.logger.log_debug("DriverUtils: parse_table_elements table: %s", table)
 
             if table:
                 rows = table.find_elements(By.TAG_NAME, "tr")
                 for row in rows:
-                    self.logger.log_info("DriverUtils: parse_table row: {}".format(row.text))
+                    # the row text is only read for the sampled records
+                    self.logger.log_sampled("DriverUtils: parse_table_elements",
+                                            "DriverUtils: parse_table_elements row: %s", LazyValue(lambda: row.text))
                     cols = row.find_elements(By.TAG_NAME, "td")
+                    if not cols:
+                        # header row, the first one names the columns
+                        if headers is None:
+                            headers = [header.text.strip() for header in row.find_elements(By.TAG_NAME, "th")]
+                        continue
                     columns_list = []
                     for col in cols:
-                        self.logger.log_info("DriverUtils: parse_table col: {}".format(col.text))
-                        columns_list.append(col.text)
-                    table_contents[row.text] = columns_list
+                        text = col.text
+                        self.logger.log_sampled("DriverUtils: parse_table_elements",
+                                                "DriverUtils: parse_table_elements col: %s", text)
+                        columns_list.append(text)
+                    rows_list.append(columns_list)
         except NoSuchElementException as e:
-            self.logger.log_error("DriverUtils: parse_table Exception: {}".format(e))
+            self.logger.log_error("DriverUtils: parse_table_elements Exception: %s", e)
         except StaleElementReferenceException as e:
-            self.logger.log_error("DriverUtils: parse_table Exception: {}".format(e))
+            self.logger.log_error("DriverUtils: parse_table_elements Exception: %s", e)
 
-        self.logger.log_exit("DriverUtils: parse_table")
+        table_contents = TableSnapshot.from_rows(rows_list, headers=headers, name_column=name_column)
+
+        self.logger.log_exit("DriverUtils: parse_table_elements", rows=len(table_contents))
         return table_contents
 
+    @operation_deadline
     def change_collection_page_size(self, driver, page_size):
         """
         Method to change collection table page size
@@ -117,70 +725,96 @@ class DriverUtils:
         self.logger.log_enter("DriverUtils: change_collection_page_size")
 
         try:
-            time.sleep(5)
-            collection_page_size_select = Select(driver.find_element_by_css_selector(
-                self.collection.collection_table_page_size_css))
+            collection_page_size_select = Select(self.waits.wait_for_element(
+                driver, self.collection.collection_table_page_size_css))
             self.logger.log_debug(
-                "DriverUtils: change_collection_page_size collection_page_size_select: {}".format(
-                    collection_page_size_select))
+                "DriverUtils: change_collection_page_size collection_page_size_select: %s", collection_page_size_select)
             if collection_page_size_select:
+                fingerprint = self.waits.table_fingerprint(driver, self.collection.collection_table_css)
                 collection_page_size_select.select_by_value(page_size)
+                self.waits.wait_for_table_update(driver, self.collection.collection_table_css,
+                                                 self.collection.loading_spinner_css, fingerprint=fingerprint)
         except NoSuchElementException as e:
-            self.logger.log_error("DriverUtils: change_collection_page_size Exception: {}".format(e))
+            self.step_failed(driver, "change_collection_page_size", e)
+        except TimeoutException as e:
+            self.step_failed(driver, "change_collection_page_size", e)
 
         self.logger.log_exit("DriverUtils: change_collection_page_size")
 
+    @operation_deadline
     def create_collection(self, driver, collection_name, expected_error=None):
         """
         Method to create a collection
         :param driver: webdriver object to use
         :param collection_name: name of the collection to create
         :param expected_error: expected error message
-        :return:
+        :return: TableDiff of the collection table rows changed by the create, None if it could not be taken
         """
         self.logger.log_enter("DriverUtils: create_collection")
 
+        before = None
+        requests_done = False
         try:
-            # wait for some time to page to get load
-            time.sleep(10)
+            # wait for page to get load
+            self.waits.wait_for_page_ready(driver, self.collection.loading_spinner_css)
             # click on create collection button
             self.click_button(driver, self.collection.collection_create_button_css)
 
             # enter the collection name
-            text_box = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                By.CSS_SELECTOR, self.collection.collection_name_text_box_css)))
-            self.logger.log_debug("DriverUtils: create_collection text_box {}".format(text_box))
+            text_box = self.locators.find(driver, self.collection.collection_name_text_box_css)
+            self.logger.log_debug("DriverUtils: create_collection text_box %s", text_box)
             if text_box:
                 text_box.send_keys(collection_name)
 
+            # hash the collection table rows to verify the create against
+            before = self.table_diff.fingerprint(driver, self.collection.collection_table_css)
+            since = self.network.install(driver)
             # click on submit button
             self.click_button(driver, self.collection.collection_create_submit_button_css)
+            # wait for the create request and the table reload it triggers
+            requests_done = self.wait_for_requests(driver, since)
 
-            # parse error message box text
-            error_message_para = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                By.CSS_SELECTOR, self.collection.collection_create_error_para_css)))
-            self.logger.log_debug("DriverUtils: create_collection error_message_para {}".format(error_message_para))
-            if error_message_para:
+            # parse error message box text, the create response is in so it is not waited for:
+            # no error message means the collection was created
+            error_message_paras = driver.find_elements_by_css_selector(
+                self.collection.collection_create_error_para_css)
+            self.logger.log_debug("DriverUtils: create_collection error_message_paras %s", error_message_paras)
+            if error_message_paras:
+                # nothing was created, there is no table change to verify
+                before = None
                 if expected_error:
                     # validate error message with expected error
-                    assert expected_error == error_message_para.text
+                    assert expected_error == error_message_paras[0].text
 
                 # click on cancel button to close the collection frame
-                cancel_button = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                    By.CSS_SELECTOR, self.collection.collection_cancel_button_css)))
-                self.logger.log_debug("DriverUtils: create_collection cancel_button {}".format(cancel_button))
+                cancel_button = self.locators.find(driver, self.collection.collection_cancel_button_css)
+                self.logger.log_debug("DriverUtils: create_collection cancel_button %s", cancel_button)
                 if cancel_button:
                     cancel_button.click()
+            elif expected_error:
+                self.step_failed(driver, "create_collection",
+                                 NoSuchElementException("expected error not shown: {}".format(expected_error)))
 
         except NoSuchElementException as e:
-            self.logger.log_error("DriverUtils: create_collection Exception: {}".format(e))
+            self.step_failed(driver, "create_collection", e)
         except ElementClickInterceptedException as e:
-            self.logger.log_error("DriverUtils: create_collection Exception: {}".format(e))
+            self.step_failed(driver, "create_collection", e)
         except TimeoutException as e:
-            self.logger.log_error("DriverUtils: create_collection Exception: {}".format(e))
+            self.step_failed(driver, "create_collection", e)
+
+        table_diff = None
+        if before is not None:
+            try:
+                # the table only has to be waited for when its reload is still in flight
+                table_diff = self.table_diff.diff(driver, before,
+                                                  None if requests_done else self.collection.loading_spinner_css)
+            except WebDriverException as e:
+                self.logger.log_error("DriverUtils: create_collection diff Exception: %s", e)
 
         self.logger.log_exit("DriverUtils: create_collection")
+        return table_diff
 
+    @operation_deadline
     def search_collection(self, driver, collection_name):
         """
         Method to search a collection
@@ -190,26 +824,35 @@ class DriverUtils:
         """
         self.logger.log_enter("DriverUtils: search_collection")
 
-        results = {}
+        results = []
         try:
             # get collection search bar
             search_element = self.get_collection_search_element(driver)
             if search_element:
                 # clear the search input in collection search bar
-                search_element.clear()
-                time.sleep(5)
+                self.clear_search(driver, search_element, self.collection.collection_table_css,
+                                  self.collection.loading_spinner_css)
                 # input collection name
+                fingerprint = self.waits.table_fingerprint(driver, self.collection.collection_table_css)
+                since = self.network.install(driver)
                 search_element.send_keys(collection_name)
-                # parse results from collection table
-                results = self.parse_table(driver, self.collection.collection_table_css)
+                if self.wait_for_requests(driver, since):
+                    # the query finished, the table does not have to change
+                    fingerprint = None
+                # parse results from all pages of collection table
+                results = self.get_table_names(driver, self.collection.collection_table_css,
+                                               self.collection.collection_table_next_page_css,
+                                               fingerprint=fingerprint,
+                                               previous_page_css=self.collection.collection_table_previous_page_css)
         except NoSuchElementException as e:
-            self.logger.log_error("DriverUtils: search_collection Exception: {}".format(e))
+            self.step_failed(driver, "search_collection", e)
         except TimeoutException as e:
-            self.logger.log_error("DriverUtils: search_collection Exception: {}".format(e))
+            self.step_failed(driver, "search_collection", e)
 
         self.logger.log_exit("DriverUtils: search_collection")
-        return self.collection.get_name_list(results)
+        return results
 
+    @operation_deadline
     def sort_collection(self, driver, sort_order):
         """
         Method to sort the collection list
@@ -219,64 +862,86 @@ class DriverUtils:
         """
         self.logger.log_enter("DriverUtils: sort_collection")
 
-        results = None
+        results = []
+        fingerprint = None
         try:
-            # TODO: Use better logic to parse all collections by parsing each page
+            # use the largest page size to keep the number of pages to walk low
             self.change_collection_page_size(driver, "100")
             # get collection sort button
-            collection_sort_button = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                By.CSS_SELECTOR, self.collection.collection_table_sort_css)))
+            collection_sort_button = self.locators.find(driver, self.collection.collection_table_sort_css)
             self.logger.log_debug(
-                "DriverUtils: sort_collection collection_sort_button: {}".format(collection_sort_button))
+                "DriverUtils: sort_collection collection_sort_button: %s", collection_sort_button)
 
-            # TODO: Click on sort button only update table, after scrolling into table or clicking on screen
-            if collection_sort_button:
-                time.sleep(5)
+            # the default order needs no click, and no table change is waited for
+            if collection_sort_button and sort_order in ("ascending", "descending"):
+                # the sort click is only taken once the page is settled, the sort request then verifies it
+                self.waits.wait_for_page_ready(driver, self.collection.loading_spinner_css)
+                fingerprint = self.waits.table_fingerprint(driver, self.collection.collection_table_css)
+                since = self.network.install(driver)
                 if sort_order == "ascending":
                     # click once for ascending
                     collection_sort_button.click()
                 elif sort_order == "descending":
                     # click twice for descending
                     collection_sort_button.click()
-                    collection_sort_button = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                        By.CSS_SELECTOR, self.collection.collection_table_sort_css)))
-                    time.sleep(5)
+                    if self.wait_for_requests(driver, since):
+                        fingerprint = None
+                    self.waits.wait_for_table_update(driver, self.collection.collection_table_css,
+                                                     self.collection.loading_spinner_css, fingerprint=fingerprint)
+                    fingerprint = self.waits.table_fingerprint(driver, self.collection.collection_table_css)
+                    since = self.network.install(driver)
+                    collection_sort_button = self.locators.find(driver, self.collection.collection_table_sort_css)
                     collection_sort_button.click()
+                if self.wait_for_requests(driver, since):
+                    fingerprint = None
 
-            # parse results from collection table
-            results = self.parse_table(driver, self.collection.collection_table_css)
+            # parse results from all pages of collection table
+            results = self.get_table_names(driver, self.collection.collection_table_css,
+                                           self.collection.collection_table_next_page_css,
+                                           fingerprint=fingerprint,
+                                           previous_page_css=self.collection.collection_table_previous_page_css)
 
         except NoSuchElementException as e:
-            self.logger.log_error("DriverUtils: sort_collection Exception: {}".format(e))
+            self.step_failed(driver, "sort_collection", e)
         except ElementClickInterceptedException as e:
-            self.logger.log_error("DriverUtils: sort_collection Exception: {}".format(e))
+            self.step_failed(driver, "sort_collection", e)
         except StaleElementReferenceException as e:
-            self.logger.log_error("DriverUtils: sort_collection Exception: {}".format(e))
+            self.step_failed(driver, "sort_collection", e)
+        except TimeoutException as e:
+            self.step_failed(driver, "sort_collection", e)
         finally:
-            try:
-                # reset collection sort button state
-                # get collection sort button
-                collection_sort_button = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                    By.CSS_SELECTOR, self.collection.collection_table_sort_css)))
-                if collection_sort_button:
-                    time.sleep(5)
-                    if sort_order == "ascending":
-                        # click twice for ascending
-                        collection_sort_button.click()
-                        collection_sort_button = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                            By.CSS_SELECTOR, self.collection.collection_table_sort_css)))
-                        time.sleep(5)
-                        collection_sort_button.click()
-                    elif sort_order == "descending":
-                        # click once for descending
-                        collection_sort_button.click()
-            except NoSuchElementException as e:
-                self.logger.log_error("DriverUtils: sort_collection finally Exception: {}".format(e))
-            except ElementClickInterceptedException as e:
-                self.logger.log_error("DriverUtils: sort_collection finally Exception: {}".format(e))
+            # the budget of the operation may be spent, the reset runs under a budget of its own
+            with deadline_scope(self.cleanup_budget, "DriverUtils: sort_collection reset", detached=True):
+                try:
+                    # reset collection sort button state
+                    # get collection sort button
+                    collection_sort_button = self.locators.find(driver, self.collection.collection_table_sort_css)
+                    if collection_sort_button:
+                        self.waits.wait_for_page_ready(driver, self.collection.loading_spinner_css)
+                        if sort_order == "ascending":
+                            # click twice for ascending
+                            fingerprint = self.waits.table_fingerprint(driver, self.collection.collection_table_css)
+                            collection_sort_button.click()
+                            self.waits.wait_for_table_update(driver, self.collection.collection_table_css,
+                                                             self.collection.loading_spinner_css,
+                                                             fingerprint=fingerprint)
+                            collection_sort_button = self.locators.find(driver,
+                                                                        self.collection.collection_table_sort_css)
+                            collection_sort_button.click()
+                        elif sort_order == "descending":
+                            # click once for descending
+                            collection_sort_button.click()
+                except NoSuchElementException as e:
+                    self.logger.log_error("DriverUtils: sort_collection finally Exception: %s", e)
+                except ElementClickInterceptedException as e:
+                    self.logger.log_error("DriverUtils: sort_collection finally Exception: %s", e)
+                except TimeoutException as e:
+                    self.logger.log_error("DriverUtils: sort_collection finally Exception: %s", e)
+                except DeadlineExceeded as e:
+                    self.logger.log_error("DriverUtils: sort_collection finally Exception: %s", e)
 
         self.logger.log_exit("DriverUtils: sort_collection")
-        return self.collection.get_name_list(results)
+        return results
 
     def select_collection_for_document(self, driver, search_element, collection_name):
         """
@@ -291,13 +956,18 @@ class DriverUtils:
         try:
             if search_element:
                 # input collection names in collection search bar
-                search_element.clear()
-                time.sleep(5)
+                self.clear_search(driver, search_element, self.collection.collection_table_css,
+                                  self.collection.loading_spinner_css)
+                fingerprint = self.waits.table_fingerprint(driver, self.collection.collection_table_css)
+                since = self.network.install(driver)
                 search_element.send_keys(collection_name)
-                time.sleep(5)
+                if self.wait_for_requests(driver, since):
+                    fingerprint = None
+                self.waits.wait_for_table_update(driver, self.collection.collection_table_css,
+                                                 self.collection.loading_spinner_css, fingerprint=fingerprint)
                 collection_table = driver.find_element_by_css_selector(self.collection.collection_table_css)
                 self.logger.log_debug(
-                    "DriverUtils: select_collection_for_document collection_table: {}".format(collection_table))
+                    "DriverUtils: select_collection_for_document collection_table: %s", collection_table)
 
                 if collection_table:
                     # click on collection name row
@@ -305,112 +975,203 @@ class DriverUtils:
                     rows[0].find_elements(By.TAG_NAME, "td")[0].click()
 
         except NoSuchElementException as e:
-            self.logger.log_error("DriverUtils: select_collection_for_document Exception: {}".format(e))
+            self.step_failed(driver, "select_collection_for_document", e)
         except ElementClickInterceptedException as e:
-            self.logger.log_error("DriverUtils: select_collection_for_document Exception: {}".format(e))
+            self.step_failed(driver, "select_collection_for_document", e)
         except TimeoutException as e:
-            self.logger.log_error("DriverUtils: select_collection_for_document Exception: {}".format(e))
+            self.step_failed(driver, "select_collection_for_document", e)
         except ElementNotInteractableException as e:
-            self.logger.log_error("DriverUtils: select_collection_for_document Exception: {}".format(e))
+            self.step_failed(driver, "select_collection_for_document", e)
 
         self.logger.log_exit("DriverUtils: select_collection_for_document")
 
-    def wait_for_document_upload(self, driver):
+    def wait_for_document_upload(self, driver, since=-1, timeout=30):
         """
         Method to wait for document upload operation completion.
         :param driver: webdriver object to use
-        :return: (string) document upload operation message
+        :param since: upload watcher event index taken before the upload was triggered,
+                      -1 to also accept an upload which finished already
+        :param timeout: time (secs) to wait for the upload to finish
+        :return: (string) document upload operation message, None if the message could not be read
         """
         self.logger.log_enter("DriverUtils: wait_for_document_upload")
         upload_result = None
         try:
-            upload_status = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                By.CSS_SELECTOR, self.document.document_upload_status_css)))
-            self.logger.log_debug("DriverUtils: wait_for_document_upload upload_status {}".format(upload_status))
-
-            wait_poll_count = 10
-            wait_sleep_time = 3
-            # poll for 30 secs to check document upload status
-            for i in range(wait_poll_count):
-                if self.document.document_upload_finished_msg not in upload_status.text:
-                    time.sleep(wait_sleep_time)
-                else:
-                    break
+            upload_status = self.locators.find(driver, self.document.document_upload_status_css)
+            self.logger.log_debug("DriverUtils: wait_for_document_upload upload_status %s", upload_status)
+
+            # block until the upload watcher sees the upload finish
+            start = time.monotonic()
+            finished_event = self.upload_watcher.wait_for_status(
+                driver, self.document.document_upload_finished_msg, since=since, timeout=timeout)
+            self.waits.record_wait("wait_for_document_upload", time.monotonic() - start, finished_event is not None)
+            if finished_event is None:
+                self.logger.log_error("DriverUtils: wait_for_document_upload not finished after %ss", timeout)
+            elif since >= 0:
+                for name, timings in self.upload_watcher.row_latencies(driver, since).items():
+                    self.logger.log_info("DriverUtils: wait_for_document_upload %s latency: %.3fs %s", name,
+                                         timings["latency"], timings["transitions"])
 
             hover = ActionChains(driver).move_to_element(upload_status)
             hover.perform()
-            upload_floating = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
+            upload_floating = self.waits.until(driver, "wait_for_upload_floating", EC.presence_of_element_located((
                 By.CSS_SELECTOR, self.document.document_upload_floating_css)))
-            self.logger.log_debug("DriverUtils: wait_for_document_upload upload_floating {}".format(upload_floating))
-            self.logger.log_info("DriverUtils: wait_for_document_upload upload_floating text {}".format(
-                upload_floating.text))
+            self.logger.log_debug("DriverUtils: wait_for_document_upload upload_floating %s", upload_floating)
+            self.logger.log_info("DriverUtils: wait_for_document_upload upload_floating text %s", upload_floating.text)
             upload_result = upload_floating.text
 
             # click on clear_finished button
-            clear_finished = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                By.CSS_SELECTOR, self.document.document_clear_finished_css)))
-            self.logger.log_debug("DriverUtils: wait_for_document_upload clear_finished {}".format(clear_finished))
+            clear_finished = self.locators.find(driver, self.document.document_clear_finished_css)
+            self.logger.log_debug("DriverUtils: wait_for_document_upload clear_finished %s", clear_finished)
             clear_finished.click()
         except NoSuchElementException as e:
-            self.logger.log_error("DriverUtils: wait_for_document_upload Exception: {}".format(e))
+            self.step_failed(driver, "wait_for_document_upload", e)
+        except TimeoutException as e:
+            self.step_failed(driver, "wait_for_document_upload", e)
+        except StaleElementReferenceException as e:
+            # the upload status was re-rendered since it was cached
+            self.locators.invalidate(driver)
+            self.step_failed(driver, "wait_for_document_upload", e)
 
         self.logger.log_exit("DriverUtils: wait_for_document_upload")
-        return upload_result.split('\n')[-1]
+        return upload_result.split('\n')[-1] if upload_result is not None else None
 
-    def upload_document(self, driver, collection_name, document_path, expected_error=None):
+    def upload_documents(self, driver, collection_name, document_paths, chunk_size=50, timeout=300):
+        """
+        Method to upload many documents in a collection through the file input, chunk_size files at a time.
+        The status of every file of a chunk is tracked by the upload watcher from the upload panel rows, which
+        are named by the file name, so files with the same name are sent in separate chunks.
+        :param driver: webdriver to use
+        :param collection_name: name of the collection to use
+        :param document_paths: list of local paths of the document files to upload
+        :param chunk_size: max number of files sent through the file input at once
+        :param timeout: time (secs) to wait for the files of a chunk to finish uploading
+        :return: UploadBatchResult object keyed by document path, files still pending after timeout are
+                 reported as "timed out"
+        """
+        self.logger.log_enter("DriverUtils: upload_documents")
+
+        batch_result = UploadBatchResult()
+        document_paths = [str(document_path) for document_path in document_paths]
+        start = time.monotonic()
+        try:
+            self.waits.wait_for_page_ready(driver, self.collection.loading_spinner_css)
+            self.select_collection_for_document(driver, self.get_collection_search_element(driver), collection_name)
+            self.waits.wait_for_element(driver, self.document.document_upload_button_css, clickable=True)
+
+            # throughput is measured from the first file sent
+            start = time.monotonic()
+            for chunk in upload_chunks(document_paths, chunk_size):
+                # upload row name -> document path, unique within a chunk
+                paths = {os.path.basename(document_path): document_path for document_path in chunk}
+                for document_path in chunk:
+                    batch_result.total_bytes += os.path.getsize(document_path)
+
+                since = self.upload_watcher.install(driver)
+                file_input = self.locators.find(driver, self.document.document_file_input_css)
+                file_input.send_keys("\n".join(chunk))
+
+                # block until every file of the chunk finished
+                chunk_result = self.upload_watcher.wait_for_rows(
+                    driver, list(paths), self.document.document_upload_pending_msgs, since, timeout=timeout)
+                if chunk_result["timed_out"]:
+                    self.logger.log_error("DriverUtils: upload_documents chunk timed out after %ss", timeout)
+                for name, document_path in paths.items():
+                    status = chunk_result["rows"].get(name)
+                    if not status or status in self.document.document_upload_pending_msgs:
+                        status = self.document.document_upload_timeout_msg
+                    batch_result.results[document_path] = status
+                for name, timings in self.upload_watcher.row_latencies(driver, since).items():
+                    if name in paths:
+                        batch_result.latencies[paths[name]] = timings["latency"]
+
+                # clear finished rows so the panel only holds the next chunk
+                self.click_button(driver, self.document.document_clear_finished_css)
+                self.logger.log_info("DriverUtils: upload_documents %s of %s files done", len(batch_result.results),
+                                     len(document_paths))
+
+        except NoSuchElementException as e:
+            self.step_failed(driver, "upload_documents", e)
+        except TimeoutException as e:
+            self.step_failed(driver, "upload_documents", e)
+        except ElementNotInteractableException as e:
+            self.step_failed(driver, "upload_documents", e)
+
+        batch_result.elapsed = time.monotonic() - start
+        self.logger.log_info("DriverUtils: upload_documents %s", batch_result)
+        self.logger.log_exit("DriverUtils: upload_documents")
+        return batch_result
+
+    @operation_deadline
+    def upload_document(self, driver, collection_name, document_path, expected_error=None, timeout=30):
         """
         Method to upload document in a collection
         :param driver: webdriver to use
         :param collection_name: name of the collection to use
         :param document_path: the local path of the document file to upload
         :param expected_error: expected error message
-        :return:
+        :param timeout: time (secs) to wait for the upload to finish
+        :return: TableDiff of the document table rows changed by the upload, None if it was not taken
         """
         self.logger.log_enter("DriverUtils: upload_document")
-        time.sleep(10)
+        self.waits.wait_for_page_ready(driver, self.collection.loading_spinner_css)
         # get collection search bar element
         search_element = self.get_collection_search_element(driver)
+        since = -1
+        before = None
+        table_diff = None
         try:
             # select collection element
             self.select_collection_for_document(driver, search_element, collection_name)
-            upload_button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((
-                By.CSS_SELECTOR, self.document.document_upload_button_css)))
-            self.logger.log_debug("DriverUtils: upload_document upload_button {}".format(upload_button))
+            # the button is re-rendered on every upload and only enabled once the collection is selected,
+            # so it is always resolved fresh
+            upload_button = self.waits.wait_for_element(driver, self.document.document_upload_button_css,
+                                                        clickable=True)
+            self.logger.log_debug("DriverUtils: upload_document upload_button %s", upload_button)
 
-            file_input = driver.find_element_by_css_selector(self.document.document_file_input_css)
-            self.logger.log_debug("DriverUtils: upload_document file_input {}".format(file_input))
+            file_input = self.locators.find(driver, self.document.document_file_input_css)
+            self.logger.log_debug("DriverUtils: upload_document file_input %s", file_input)
 
             if upload_button:
+                # watch upload status transitions from before the upload starts
+                since = self.upload_watcher.install(driver)
+                # hash the document table rows, names are in the second column
+                before = self.table_diff.fingerprint(driver, self.document.document_table_css, key_column=1)
                 # send file path to file input element
                 file_input.send_keys(document_path)
                 # click on upload button
                 upload_button.click()
         # collection create button going in stale state
         except StaleElementReferenceException as e:
-            self.logger.log_error("DriverUtils: upload_document Exception: {}".format(e))
-            time.sleep(5)
+            self.logger.log_error("DriverUtils: upload_document Exception: %s", e)
             # wait for document upload operation
-            upload_result = self.wait_for_document_upload(driver)
-            self.logger.log_info("DriverUtils: upload_document upload_result: {}".format(upload_result))
+            upload_result = self.wait_for_document_upload(driver, since=since, timeout=timeout)
+            self.logger.log_info("DriverUtils: upload_document upload_result: %s", upload_result)
             if expected_error:
                 assert expected_error == upload_result
             else:
                 assert self.document.document_upload_success_msg == upload_result
+            if before is not None:
+                try:
+                    table_diff = self.table_diff.diff(driver, before, self.document.loading_spinner_css)
+                except WebDriverException as e:
+                    self.logger.log_error("DriverUtils: upload_document diff Exception: %s", e)
 
         except NoSuchElementException as e:
-            self.logger.log_error("DriverUtils: upload_document Exception: {}".format(e))
+            self.step_failed(driver, "upload_document", e)
         except ElementClickInterceptedException as e:
-            self.logger.log_error("DriverUtils: upload_document Exception: {}".format(e))
+            self.step_failed(driver, "upload_document", e)
         except TimeoutException as e:
-            self.logger.log_error("DriverUtils: upload_document Exception: {}".format(e))
+            self.step_failed(driver, "upload_document", e)
         except ElementNotInteractableException as e:
-            self.logger.log_error("DriverUtils: upload_document Exception: {}".format(e))
+            self.step_failed(driver, "upload_document", e)
         finally:
-            driver.refresh()
-            time.sleep(10)
+            self.reset_app_state(driver)
 
         self.logger.log_exit("DriverUtils: upload_document")
+        return table_diff
 
+    @operation_deadline
     def search_document(self, driver, collection_name, document_name):
         """
         Method to search a document in a collection
@@ -421,33 +1182,39 @@ class DriverUtils:
         """
         self.logger.log_enter("DriverUtils: search_document")
 
-        results = {}
+        results = []
         # get collection search bar element
         search_element = self.get_collection_search_element(driver)
         try:
             # select collection
             self.select_collection_for_document(driver, search_element, collection_name)
-            doc_search_element = WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                By.CSS_SELECTOR, self.document.document_search_css)))
-            self.logger.log_debug("DriverUtils: search_document upload_button {}".format(doc_search_element))
+            doc_search_element = self.locators.find(driver, self.document.document_search_css)
+            self.logger.log_debug("DriverUtils: search_document upload_button %s", doc_search_element)
 
             if doc_search_element:
                 # clear document search bar
-                doc_search_element.clear()
-                time.sleep(5)
+                self.clear_search(driver, doc_search_element, self.document.document_table_css,
+                                  self.document.loading_spinner_css)
                 # input document name in document search bar
+                fingerprint = self.waits.table_fingerprint(driver, self.document.document_table_css)
+                since = self.network.install(driver)
                 doc_search_element.send_keys(document_name)
-                # parse results from document table
-                results = self.parse_table(driver, self.document.document_table_css)
+                if self.wait_for_requests(driver, since):
+                    fingerprint = None
+                # parse results from all pages of document table
+                results = self.get_table_names(driver, self.document.document_table_css,
+                                               self.document.document_table_next_page_css,
+                                               col_num=self.document.document_table_name_column,
+                                               fingerprint=fingerprint,
+                                               previous_page_css=self.document.document_table_previous_page_css)
         except NoSuchElementException as e:
-            self.logger.log_error("DriverUtils: search_document Exception: {}".format(e))
+            self.step_failed(driver, "search_document", e)
         except ElementClickInterceptedException as e:
-            self.logger.log_error("DriverUtils: search_document Exception: {}".format(e))
+            self.step_failed(driver, "search_document", e)
         except TimeoutException as e:
-            self.logger.log_error("DriverUtils: search_document Exception: {}".format(e))
+            self.step_failed(driver, "search_document", e)
         finally:
-            driver.refresh()
-            time.sleep(10)
+            self.reset_app_state(driver)
 
         self.logger.log_exit("DriverUtils: search_document")
-        return self.document.get_name_list(results, col_num=1)
+        return results
@@ -0,0 +1,244 @@
+import heapq
+import json
+import os
+import time
+from pathlib import Path
+
+from utils.logs_util import DocumentExplorerLogger
+
+BASEDIR = Path(__file__).resolve().parent.parent
+
+# Predicted duration (secs) of a test without history, when the history is empty
+DEFAULT_TEST_DURATION = 1.0
+
+
+def group_key(item):
+    """
+    Method to get the scheduling group of a test. Tests of a class share the class scoped driver_init
+    browser and login, so a class (per browser parameter) is scheduled as a whole.
+    :param item: pytest item
+    :return: (string) group key, the class node id or the test node id for a test outside a class
+    """
+    if item.cls is None:
+        return item.nodeid
+    key = item.parent.nodeid
+    callspec = getattr(item, "callspec", None)
+    if callspec is not None and "driver_init" in callspec.params:
+        key += "[{}]".format(callspec.params["driver_init"])
+    return key
+
+
+def nodeid_group_key(nodeid):
+    """
+    Method to get the scheduling group of a test from its node id, for reports without the pytest item
+    :param nodeid: pytest node id
+    :return: (string) group key, the class node id or the test node id for a test outside a class
+    """
+    parts = nodeid.split("::")
+    return "::".join(parts[:2]) if len(parts) > 2 else nodeid
+
+
+def lpt_schedule(durations, workers):
+    """
+    Method to assign groups to workers longest processing time first: every group, longest first,
+    goes to the worker with the least assigned time
+    :param durations: dict of group key -> predicted duration (secs)
+    :param workers: number of workers
+    :return: (List) per worker [predicted load (secs), list of group keys]
+    """
+    bins = [[0.0, []] for _ in range(max(1, workers))]
+    heap = [(0.0, index) for index in range(len(bins))]
+    for key, duration in sorted(durations.items(), key=lambda item: (-item[1], item[0])):
+        load, index = heapq.heappop(heap)
+        bins[index][0] = load + duration
+        bins[index][1].append(key)
+        heapq.heappush(heap, (bins[index][0], index))
+    return bins
+
+
+def parse_shard(value):
+    """
+    Method to parse a --shard value
+    :param value: "index/count" with index starting at 1, e.g. "2/4"
+    :return: (tuple) (index starting at 0, count)
+    :raises ValueError: if the value is not a valid shard
+    """
+    index, _, count = value.partition("/")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError("invalid shard {}, expected index/count with 1 <= index <= count".format(value))
+    return index - 1, count
+
+
+class DurationHistory:
+    """
+    Per test durations of previous runs, kept as an exponential moving average in a JSON file.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, history_file=None, alpha=0.5):
+        """
+        :param history_file: JSON file the durations are kept in, defaults to DE_DURATION_HISTORY_FILE
+                             environment variable or .test_durations.json in the project directory
+        :param alpha: weight of the latest run in the moving average
+        """
+        self.logger.log_enter("DurationHistory: __init__")
+
+        self.history_file = Path(history_file or os.environ.get("DE_DURATION_HISTORY_FILE",
+                                                                BASEDIR.joinpath(".test_durations.json")))
+        self.alpha = alpha
+        self.durations = {}
+        self.load()
+
+        self.logger.log_exit("DurationHistory: __init__")
+
+    def load(self):
+        try:
+            with open(str(self.history_file)) as history:
+                self.durations = json.load(history)
+        except FileNotFoundError:
+            self.logger.log_debug("DurationHistory: load no history file %s", self.history_file)
+        except ValueError as e:
+            self.logger.log_error("DurationHistory: load Exception: %s", e)
+
+    def save(self):
+        # write atomically, parallel runs may read the history file at the same time
+        temporary = self.history_file.with_name(self.history_file.name + ".{}.tmp".format(os.getpid()))
+        with open(str(temporary), "w") as history:
+            json.dump(self.durations, history, indent=1, sort_keys=True)
+        os.replace(str(temporary), str(self.history_file))
+
+    def record(self, nodeid, duration):
+        """
+        Method to add the duration of a run of a test
+        :param nodeid: pytest node id
+        :param duration: duration (secs) of setup, call and teardown
+        :return:
+        """
+        previous = self.durations.get(nodeid)
+        self.durations[nodeid] = duration if previous is None else \
+            self.alpha * duration + (1 - self.alpha) * previous
+
+    def default_duration(self):
+        """
+        Method to get the duration predicted for a test without history
+        :return: (float) median duration of the known tests, DEFAULT_TEST_DURATION without history
+        """
+        if not self.durations:
+            return DEFAULT_TEST_DURATION
+        durations = sorted(self.durations.values())
+        return durations[len(durations) // 2]
+
+    def predict(self, nodeid, default=None):
+        return self.durations.get(nodeid, self.default_duration() if default is None else default)
+
+
+class DurationScheduler:
+    """
+    Orders and shards the collected tests by their predicted durations and compares the predicted
+    makespan (run time of the busiest worker) to the actual one.
+    Groups are ordered longest first, so a dynamic scheduler handing the next group to the first idle
+    worker (pytest-xdist --dist loadscope) schedules them longest processing time first. With a shard
+    the groups are split between the shards with lpt_schedule and the other shards' tests are deselected.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, history, workers=1, shard=None):
+        """
+        :param history: DurationHistory object
+        :param workers: number of parallel workers of this run
+        :param shard: (index starting at 0, count) to run only one shard of the groups, None for all
+        """
+        self.logger.log_enter("DurationScheduler: __init__")
+
+        self.history = history
+        self.workers = workers
+        self.shard = shard
+        self.predicted = {}
+        self.test_durations = {}
+        self.worker_durations = {}
+        self.start = time.monotonic()
+
+        self.logger.log_exit("DurationScheduler: __init__")
+
+    def predict_groups(self, items):
+        default = self.history.default_duration()
+        durations = {}
+        for item in items:
+            key = group_key(item)
+            durations[key] = durations.get(key, 0.0) + self.history.predict(item.nodeid, default)
+        return durations
+
+    def order(self, items):
+        """
+        Method to order the items longest group first, keeping the order within a group
+        :param items: list of pytest items, reordered in place
+        :return: (List) items deselected because they belong to another shard
+        """
+        self.logger.log_enter("DurationScheduler: order")
+
+        durations = self.predict_groups(items)
+        deselected = []
+        if self.shard is not None:
+            index, count = self.shard
+            keep = set(lpt_schedule(durations, count)[index][1])
+            deselected = [item for item in items if group_key(item) not in keep]
+            items[:] = [item for item in items if group_key(item) in keep]
+            durations = {key: duration for key, duration in durations.items() if key in keep}
+
+        position = {}
+        for item in items:
+            position.setdefault(group_key(item), len(position))
+        items.sort(key=lambda item: (-durations[group_key(item)], position[group_key(item)]))
+        self.predicted = durations
+        self.logger.log_info("DurationScheduler: order %s groups, predicted makespan %.3fs on %s workers",
+                             len(durations), self.predicted_makespan(), self.workers)
+
+        self.logger.log_exit("DurationScheduler: order")
+        return deselected
+
+    def predicted_makespan(self, durations=None):
+        durations = self.predicted if durations is None else durations
+        return max(load for load, _ in lpt_schedule(durations, self.workers)) if durations else 0.0
+
+    def record_report(self, report, worker="master"):
+        """
+        Method to add the duration of a setup/call/teardown report
+        :param report: pytest TestReport object
+        :param worker: id of the worker the report comes from
+        :return:
+        """
+        self.test_durations[report.nodeid] = self.test_durations.get(report.nodeid, 0.0) + report.duration
+        self.worker_durations[worker] = self.worker_durations.get(worker, 0.0) + report.duration
+
+    def update_history(self):
+        """
+        Method to record the durations of this run in the history and save it
+        :return:
+        """
+        for nodeid, duration in self.test_durations.items():
+            self.history.record(nodeid, duration)
+        if self.test_durations:
+            self.history.save()
+
+    def summary(self):
+        """
+        Method to compare the predicted and actual makespan.
+        Without a prediction from order() (e.g. on the pytest-xdist controller, which does not collect)
+        the prediction is made for the tests that ran, from the history before this run.
+        :return: (Dict) workers, predicted and actual makespan (secs), wall time (secs), tests without history
+        """
+        predicted = self.predicted
+        if not predicted:
+            default = self.history.default_duration()
+            predicted = {}
+            for nodeid in self.test_durations:
+                key = nodeid_group_key(nodeid)
+                predicted[key] = predicted.get(key, 0.0) + self.history.predict(nodeid, default)
+        return {
+            "workers": self.workers,
+            "predicted": self.predicted_makespan(predicted),
+            "actual": max(self.worker_durations.values()) if self.worker_durations else 0.0,
+            "wall": time.monotonic() - self.start,
+            "unknown": sum(1 for nodeid in self.test_durations if nodeid not in self.history.durations),
+        }
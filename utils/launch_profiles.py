@@ -0,0 +1,210 @@
+import os
+import shutil
+import time
+from selenium import webdriver
+from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+
+from utils.logs_util import DocumentExplorerLogger
+
+DEFAULT_LAUNCH_PROFILE = "debug"
+
+# Driver executable names looked up on the PATH
+DRIVER_EXECUTABLES = {"firefox": "geckodriver", "chrome": "chromedriver"}
+
+# Firefox preferences turning off background traffic (telemetry, updates, prefetch, safe browsing)
+FIREFOX_QUIET_PREFS = {
+    "app.update.auto": False,
+    "app.update.enabled": False,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "browser.search.update": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "extensions.update.enabled": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    "network.prefetch-next": False,
+    "toolkit.telemetry.enabled": False,
+}
+
+# Chrome switches turning off background traffic, extensions and first run work
+CHROME_QUIET_ARGUMENTS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--no-first-run",
+]
+
+
+class LaunchProfile:
+    """
+    Named set of browser launch options.
+    """
+
+    def __init__(self, name, headless=False, page_load_strategy="normal", block_images=False, block_media=False,
+                 disable_background_networking=False, window_size=(1280, 800)):
+        """
+        :param name: name of the profile
+        :param headless: launch the browser without a window
+        :param page_load_strategy: WebDriver page load strategy [normal, eager, none]
+        :param block_images: do not load images
+        :param block_media: do not load web fonts and do not autoplay audio/video
+        :param disable_background_networking: turn off telemetry, updates, prefetch and extensions traffic
+        :param window_size: (width, height) of the browser window
+        """
+        self.name = name
+        self.headless = headless
+        self.page_load_strategy = page_load_strategy
+        self.block_images = block_images
+        self.block_media = block_media
+        self.disable_background_networking = disable_background_networking
+        self.window_size = window_size
+
+    def __repr__(self):
+        return "LaunchProfile({})".format(self.name)
+
+    def firefox_options(self):
+        """
+        Method to build Firefox options for the profile
+        :return: FirefoxOptions object
+        """
+        options = webdriver.FirefoxOptions()
+        options.headless = self.headless
+        if self.block_images:
+            options.set_preference("permissions.default.image", 2)
+        if self.block_media:
+            options.set_preference("media.autoplay.default", 5)
+            options.set_preference("gfx.downloadable_fonts.enabled", False)
+        if self.disable_background_networking:
+            for name, value in FIREFOX_QUIET_PREFS.items():
+                options.set_preference(name, value)
+        return options
+
+    def chrome_options(self):
+        """
+        Method to build Chrome options for the profile
+        :return: ChromeOptions object
+        """
+        options = webdriver.ChromeOptions()
+        options.headless = self.headless
+        options.add_argument("--window-size={},{}".format(*self.window_size))
+        if self.block_images:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        if self.block_media:
+            options.add_argument("--autoplay-policy=user-gesture-required")
+            options.add_argument("--disable-remote-fonts")
+        if self.disable_background_networking:
+            for argument in CHROME_QUIET_ARGUMENTS:
+                options.add_argument(argument)
+        return options
+
+    def capabilities(self, browser):
+        """
+        Method to build the desired capabilities for the profile
+        :param browser: browser name [firefox, chrome]
+        :return: (Dict) desired capabilities
+        """
+        if browser == "firefox":
+            capabilities = DesiredCapabilities.FIREFOX.copy()
+        else:
+            capabilities = DesiredCapabilities.CHROME.copy()
+        capabilities["pageLoadStrategy"] = self.page_load_strategy
+        return capabilities
+
+
+LAUNCH_PROFILES = {
+    # fastest start, for CI runs
+    "ci-fast": LaunchProfile("ci-fast", headless=True, page_load_strategy="eager", block_images=True,
+                             block_media=True, disable_background_networking=True),
+    # headed browser with everything loaded, for watching/debugging a run
+    "debug": LaunchProfile("debug"),
+    # everything loaded as a user would see it, without background traffic
+    "fidelity": LaunchProfile("fidelity", headless=True, disable_background_networking=True,
+                              window_size=(1920, 1080)),
+}
+
+
+def get_launch_profile(name=None):
+    """
+    Method to get a launch profile by name
+    :param name: name of the profile, defaults to DE_LAUNCH_PROFILE environment variable or "debug"
+    :return: LaunchProfile object
+    """
+    name = name or os.environ.get("DE_LAUNCH_PROFILE", DEFAULT_LAUNCH_PROFILE)
+    if name not in LAUNCH_PROFILES:
+        raise ValueError("Unknown launch profile {}, use one of {}".format(name, sorted(LAUNCH_PROFILES)))
+    return LAUNCH_PROFILES[name]
+
+
+def find_driver_executable(browser, driver_path=None):
+    """
+    Method to locate the driver executable of a browser
+    :param browser: browser name [firefox, chrome]
+    :param driver_path: configured driver path, used if it is an executable file
+    :return: (string) path of the driver executable, None if it is not found
+    """
+    if driver_path and os.path.isfile(str(driver_path)) and os.access(str(driver_path), os.X_OK):
+        return str(driver_path)
+    return shutil.which(DRIVER_EXECUTABLES[browser])
+
+
+class BrowserLauncher:
+    """
+    Launches web drivers with a launch profile and records their cold start times.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, profile, driver_paths):
+        """
+        :param profile: LaunchProfile object
+        :param driver_paths: dict of browser name -> driver executable path
+        """
+        self.logger.log_enter("BrowserLauncher: __init__")
+
+        self.profile = profile
+        self.driver_paths = driver_paths
+        self.cold_start_times = {}
+
+        self.logger.log_exit("BrowserLauncher: __init__")
+
+    def launch(self, browser):
+        """
+        Method to launch a web driver
+        :param browser: browser name [firefox, chrome]
+        :return: webdriver object
+        """
+        self.logger.log_enter("BrowserLauncher: launch")
+
+        start = time.monotonic()
+        driver = None
+        if browser == "firefox":
+            driver = webdriver.Firefox(executable_path=str(self.driver_paths[browser]),
+                                       options=self.profile.firefox_options(),
+                                       desired_capabilities=self.profile.capabilities(browser))
+            driver.set_window_size(*self.profile.window_size)
+        elif browser == "chrome":
+            driver = webdriver.Chrome(executable_path=str(self.driver_paths[browser]),
+                                      options=self.profile.chrome_options(),
+                                      desired_capabilities=self.profile.capabilities(browser))
+        elapsed = time.monotonic() - start
+
+        self.cold_start_times.setdefault(browser, []).append(elapsed)
+        self.logger.log_info("BrowserLauncher: launch profile: %s browser: %s cold start: %.3fs", self.profile.name,
+                             browser, elapsed)
+        self.logger.log_exit("BrowserLauncher: launch")
+        return driver
+
+    def cold_start_summary(self):
+        """
+        Method to summarise the measured cold start times
+        :return: (Dict) browser -> {count, min, mean, max}
+        """
+        summary = {}
+        for browser, times in self.cold_start_times.items():
+            summary[browser] = {"count": len(times), "min": min(times), "mean": sum(times) / len(times),
+                                "max": max(times)}
+        return summary
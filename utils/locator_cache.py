@@ -0,0 +1,139 @@
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import StaleElementReferenceException, ElementNotInteractableException, \
+    ElementClickInterceptedException
+
+from utils.logs_util import DocumentExplorerLogger
+
+# WebDriver calls made by a fresh lookup: find for presence, find + is_displayed + is_enabled for clickable
+LOOKUP_CALLS = {False: 1, True: 3}
+
+# WebDriver calls made by a cache hit: none for presence, the CLICKABLE_SCRIPT check for clickable
+HIT_CALLS = {False: 0, True: 1}
+
+# Returns true if the element is rendered and not disabled
+CLICKABLE_SCRIPT = """
+var element = arguments[0];
+return !!(element.offsetWidth || element.offsetHeight || element.getClientRects().length) && !element.disabled;
+"""
+
+
+class CachedElement(WebElement):
+    """
+    WebElement kept by the LocatorCache.
+    A command failing with StaleElementReferenceException (element re-rendered or detached), or for
+    clickable elements with a not interactable/intercepted click, re-resolves the element through the
+    cache and is retried once, so checking for staleness costs no round trip.
+    """
+
+    def __init__(self, cache, css, clickable, heal, element):
+        super().__init__(element.parent, element.id, w3c=element._w3c)
+        self._cache = cache
+        self._css = css
+        self._clickable = clickable
+        self._heal = heal
+
+    def __repr__(self):
+        return "CachedElement({}, {})".format(self._css, self._id)
+
+    def _execute(self, command, params=None):
+        try:
+            return super()._execute(command, params)
+        except StaleElementReferenceException:
+            if not self._heal:
+                raise
+        except (ElementNotInteractableException, ElementClickInterceptedException):
+            # a cached clickable element may be hidden or covered for now, wait for it again
+            if not (self._heal and self._clickable):
+                raise
+        self._id = self._cache.heal(self._parent, self._css, self._clickable).id
+        return super()._execute(command, params)
+
+
+class LocatorCache:
+    """
+    Per driver cache of the elements resolved from the CSS selector constants of Collections and Documents.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, waits, timeout=10):
+        """
+        :param waits: WaitUtils object used to resolve elements
+        :param timeout: timeout (secs) to resolve an element
+        """
+        self.logger.log_enter("LocatorCache: __init__")
+
+        self.waits = waits
+        self.timeout = timeout
+        self._elements = {}
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "healed": 0, "saved_calls": 0}
+
+        self.logger.log_exit("LocatorCache: __init__")
+
+    def _is_clickable(self, driver, element):
+        # a cached button may be disabled or hidden for now, it is then waited for again like a new lookup
+        try:
+            return driver.execute_script(CLICKABLE_SCRIPT, element)
+        except StaleElementReferenceException:
+            return False
+
+    def _resolve(self, driver, css, clickable):
+        return self.waits.wait_for_element(driver, css, clickable=clickable, timeout=self.timeout)
+
+    def find(self, driver, css, clickable=False, heal=True):
+        """
+        Method to get an element, resolving it only if it is not cached for the driver
+        :param driver: webdriver object to use
+        :param css: CSS selector of the element
+        :param clickable: wait for the element to be clickable when resolving it. A cached element is checked
+                          to be displayed and enabled, and waited for again if it is not.
+        :param heal: re-resolve the element when it goes stale, False to let StaleElementReferenceException
+                     through (e.g. when the caller relies on it)
+        :return: CachedElement object
+        :raises TimeoutException: if the element can not be resolved
+        """
+        self.stats["lookups"] += 1
+        elements = self._elements.setdefault(driver.session_id, {})
+        key = (css, clickable, heal)
+        element = elements.get(key)
+        if element is not None and (not clickable or self._is_clickable(driver, element)):
+            self.stats["hits"] += 1
+            self.stats["saved_calls"] += LOOKUP_CALLS[clickable] - HIT_CALLS[clickable]
+            return element
+
+        self.stats["misses"] += 1
+        element = CachedElement(self, css, clickable, heal, self._resolve(driver, css, clickable))
+        elements[key] = element
+        self.logger.log_debug("LocatorCache: find resolved %s", element)
+        return element
+
+    def heal(self, driver, css, clickable):
+        """
+        Method to re-resolve a stale element
+        :param driver: webdriver object to use
+        :param css: CSS selector of the element
+        :param clickable: wait for the element to be clickable
+        :return: WebElement
+        """
+        self.stats["healed"] += 1
+        self.logger.log_debug("LocatorCache: heal stale element %s", css)
+        return self._resolve(driver, css, clickable)
+
+    def invalidate(self, driver=None):
+        """
+        Method to drop the cached elements, e.g. after a page load
+        :param driver: webdriver object whose elements are dropped, None for all drivers
+        :return:
+        """
+        if driver is None:
+            self._elements.clear()
+        else:
+            self._elements.pop(driver.session_id, None)
+
+    def summary(self):
+        """
+        Method to summarise the cache statistics
+        :return: (Dict) stats with hit_rate
+        """
+        summary = dict(self.stats)
+        summary["hit_rate"] = self.stats["hits"] / self.stats["lookups"] if self.stats["lookups"] else 0.0
+        return summary
@@ -1,51 +1,206 @@
+import atexit
+import json
 import logging.config
+import logging.handlers
 import os.path
+import queue
+import threading
+import time
+
+from utils.tracing import tracer
+
+BASEDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats log records as one JSON object per line.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "name": record.name,
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler which leaves the %-style message formatting to the listener thread.
+    """
+
+    def prepare(self, record):
+        if record.exc_info and not record.exc_text:
+            # tracebacks are rendered while the frames are alive
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+
+class LogSampler:
+    """
+    Sampling and rate limiting of a high volume log statement: keeps one record out of every
+    `every` and at most `per_second` records per second.
+    """
+
+    def __init__(self, every=1, per_second=None):
+        """
+        :param every: keep one record out of every `every`
+        :param per_second: max number of records kept per second, None for no limit
+        """
+        self.every = max(1, every)
+        self.per_second = per_second
+        self.count = 0
+        self.dropped = 0
+        self._tokens = per_second
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Method to decide if the next record is kept
+        :return: (boolean) True: if kept
+        """
+        with self._lock:
+            self.count += 1
+            if (self.count - 1) % self.every:
+                self.dropped += 1
+                return False
+            if self.per_second is not None:
+                now = time.monotonic()
+                self._tokens = min(self.per_second, self._tokens + (now - self._last) * self.per_second)
+                self._last = now
+                if self._tokens < 1:
+                    self.dropped += 1
+                    return False
+                self._tokens -= 1
+            return True
+
+
+class LazyValue:
+    """
+    Log argument computed only when the record is kept by its sampler, e.g. a WebDriver read.
+    It is resolved in the calling thread, not by the listener.
+    """
+    __slots__ = ("func",)
+
+    def __init__(self, func):
+        """
+        :param func: callable without arguments returning the value
+        """
+        self.func = func
+
+
+def start_queue_listener(log):
+    """
+    Method to move the handlers of a logger behind a queue served by a listener thread,
+    so logging calls do not block on the output streams.
+    :param log: logging.Logger object
+    :return: QueueListener object, None if the logger has no handlers
+    """
+    handlers = list(log.handlers)
+    if not handlers:
+        return None
+    if os.environ.get("DE_LOG_FORMAT") == "json":
+        for handler in handlers:
+            handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(-1)
+    for handler in handlers:
+        log.removeHandler(handler)
+    log.addHandler(DeferredQueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
 
 
 class DocumentExplorerLogger:
     logger_name = 'DocumentExplorerTest'
-    logger_config_file = '/Users/ashukla/PycharmProjects/DocumentExplorerTest/logger.cfg'
+    logger_config_file = os.environ.get('DE_LOGGER_CONFIG', os.path.join(BASEDIR, 'logger.cfg'))
 
     if os.path.isfile(logger_config_file):
-        logging.config.fileConfig(logger_config_file)
+        # keep the loggers created before this import (selenium, urllib3, plugins) enabled
+        logging.config.fileConfig(logger_config_file, disable_existing_loggers=False)
 
     log = logging.getLogger(logger_name)
+    listener = start_queue_listener(log)
+
+    # Sampling of high volume log statements, keyed by statement prefix
+    samplers = {
+        "DriverUtils: parse_table_elements": LogSampler(every=100, per_second=10),
+    }
 
     def __init__(self):
         self.log.info('DocumentExplorerLogger: __init__')
 
-    def log_enter(self, method):
+    @classmethod
+    def configure_sampling(cls, key, every=1, per_second=None):
+        """
+        Method to sample/rate limit the log statements starting with key
+        :param key: statement prefix, e.g. "DriverUtils: parse_table_elements"
+        :param every: keep one record out of every `every`
+        :param per_second: max number of records kept per second, None for no limit
+        :return:
+        """
+        cls.samplers[key] = LogSampler(every, per_second)
+
+    def is_enabled_for(self, level):
+        """
+        Method to guard expensive log arguments
+        :param level: logging level, e.g. logging.DEBUG
+        :return: (boolean) True: if records of level are emitted
+        """
+        return self.log.isEnabledFor(level)
+
+    def log_enter(self, method, **attributes):
+        tracer.start_span(method, attributes)
         self.log.debug('==> %s()', method)
 
-    def log_exit(self, method):
+    def log_exit(self, method, **attributes):
+        tracer.end_span(method, attributes)
         self.log.debug('<== %s()', method)
 
-    def log_debug(self, msg, test_name=None):
-        if test_name is None:
-            self.log.debug(str(msg))
-        else:
-            self.log.debug('test name=%s: %s', test_name, str(msg))
-
-    def log_info(self, msg, test_name=None):
-        if test_name is None:
-            self.log.info(str(msg))
-        else:
-            self.log.info('test name=%s: %s', test_name, str(msg))
-
-    def log_warning(self, msg, test_name=None):
-        if test_name is None:
-            self.log.warning(str(msg))
-        else:
-            self.log.warning('test name=%s: %s', test_name, str(msg))
-
-    def log_error(self, msg, test_name=None):
-        if test_name is None:
-            self.log.error(str(msg))
-        else:
-            self.log.error('test name=%s: %s', test_name, str(msg))
-
-    def log_fatal(self, msg, test_name=None):
-        if test_name is None:
-            self.log.critical(str(msg))
-        else:
-            self.log.critical('test name=%s: %s', test_name, str(msg))
+    def _log(self, level, msg, args, test_name):
+        if not self.log.isEnabledFor(level):
+            return
+        if test_name is not None:
+            msg = 'test name=%s: ' + str(msg)
+            args = (test_name,) + args
+        self.log.log(level, msg, *args)
+
+    def log_sampled(self, key, msg, *args, level=logging.DEBUG):
+        """
+        Method to log a high volume statement through the sampler configured for key
+        :param key: sampler key, see configure_sampling
+        :param msg: %-style message
+        :param args: message arguments, formatted lazily. LazyValue arguments are only computed for kept records.
+        :param level: logging level
+        :return:
+        """
+        if not self.log.isEnabledFor(level):
+            return
+        sampler = self.samplers.get(key)
+        if sampler is None or sampler.allow():
+            self.log.log(level, msg, *[arg.func() if isinstance(arg, LazyValue) else arg for arg in args])
+
+    def log_debug(self, msg, *args, test_name=None):
+        self._log(logging.DEBUG, msg, args, test_name)
+
+    def log_info(self, msg, *args, test_name=None):
+        self._log(logging.INFO, msg, args, test_name)
+
+    def log_warning(self, msg, *args, test_name=None):
+        self._log(logging.WARNING, msg, args, test_name)
+
+    def log_error(self, msg, *args, test_name=None):
+        self._log(logging.ERROR, msg, args, test_name)
+
+    def log_fatal(self, msg, *args, test_name=None):
+        self._log(logging.CRITICAL, msg, args, test_name)
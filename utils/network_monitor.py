@@ -0,0 +1,214 @@
+import time
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.tracing import tracer
+from utils.deadline import clamp_timeout
+from utils.wait_utils import script_timeout
+
+# Wraps window.fetch and XMLHttpRequest to count the requests in flight and record every request
+# with its timing, returns the number of requests started so far.
+# arguments: max number of kept request records
+INSTALL_SCRIPT = """
+if (!window.__deNetwork) {
+    var network = {started: 0, inflight: 0, last: performance.now(), records: [], dropped: 0, max: arguments[0]};
+    var begin = function (method, url) {
+        var record = {id: network.started++, method: (method || 'GET').toUpperCase(), url: String(url),
+                      start: performance.now(), end: null, duration: null, status: null};
+        network.inflight++;
+        network.last = record.start;
+        return record;
+    };
+    var end = function (record, status) {
+        if (record.end !== null) {
+            return;
+        }
+        record.end = performance.now();
+        record.duration = record.end - record.start;
+        record.status = status;
+        network.inflight--;
+        network.last = record.end;
+        network.records.push(record);
+        if (network.records.length > network.max) {
+            network.records.shift();
+            network.dropped++;
+        }
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function (input, init) {
+            var method = (init && init.method) || (input && input.method);
+            var record = begin(method, (input && input.url) || input);
+            return fetch.apply(this, arguments).then(function (response) {
+                end(record, response.status);
+                return response;
+            }, function (error) {
+                end(record, 0);
+                throw error;
+            });
+        };
+    }
+    var open = XMLHttpRequest.prototype.open;
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__deRequest = [method, url];
+        return open.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function () {
+        var xhr = this;
+        var request = xhr.__deRequest || ['GET', ''];
+        var record = begin(request[0], request[1]);
+        xhr.addEventListener('loadend', function () {
+            end(record, xhr.status);
+        });
+        try {
+            return send.apply(this, arguments);
+        } catch (error) {
+            end(record, 0);
+            throw error;
+        }
+    };
+    window.__deNetwork = network;
+}
+return window.__deNetwork.started;
+"""
+
+# Resolves once no request is in flight and none finished for quiet (ms). With since >= 0 a request
+# started after since is awaited first, so a request fired after the action (e.g. a debounced search)
+# is not missed. With start (ms) >= 0 the wait resolves as idle when no request started within start,
+# so an action which fires no request does not block for the whole timeout.
+# Resolves with {idle, fired, started, inflight}.
+# arguments: quiet (ms), since, timeout (ms), start (ms), callback
+WAIT_FOR_IDLE_SCRIPT = """
+var quiet = arguments[0], since = arguments[1], timeoutMs = arguments[2], startMs = arguments[3], done = arguments[4];
+var network = window.__deNetwork;
+var begin = performance.now();
+var deadline = begin + timeoutMs;
+var check = function () {
+    var now = performance.now();
+    var seen = since < 0 || network.started > since;
+    if (seen && network.inflight === 0 && now - network.last >= quiet) {
+        done({idle: true, fired: since >= 0, started: network.started, inflight: 0});
+    } else if (!seen && startMs >= 0 && now - begin >= startMs) {
+        done({idle: true, fired: false, started: network.started, inflight: 0});
+    } else if (now >= deadline) {
+        done({idle: false, fired: seen, started: network.started, inflight: network.inflight});
+    } else {
+        setTimeout(check, Math.max(10, Math.min(50, quiet - (now - network.last))));
+    }
+};
+check();
+"""
+
+# Returns the finished request records with id >= since
+RECORDS_SCRIPT = """
+var network = window.__deNetwork, since = arguments[0];
+if (!network) {
+    return [];
+}
+return network.records.filter(function (record) {
+    return record.id >= since;
+});
+"""
+
+
+class NetworkMonitor:
+    """
+    Tracks the fetch/XMLHttpRequest traffic of the application page with an injected interceptor.
+    Gives the waits an exact completion signal for the backend queries of an action, and records
+    the timing of every request.
+    Selenium 3 has no DevTools/BiDi network events, so the page is instrumented instead.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, waits, quiet_ms=100, start_ms=1000, max_records=1000):
+        """
+        :param waits: WaitUtils object the network waits are recorded in
+        :param quiet_ms: default time (ms) without network activity for the page to count as idle
+        :param start_ms: default time (ms) for the request of an action to start, covers the debounce of a search
+        :param max_records: max number of request records kept in the page
+        """
+        self.logger.log_enter("NetworkMonitor: __init__")
+
+        self.waits = waits
+        self.quiet_ms = quiet_ms
+        self.start_ms = start_ms
+        self.max_records = max_records
+        self.request_timings = []
+
+        self.logger.log_exit("NetworkMonitor: __init__")
+
+    def install(self, driver):
+        """
+        Method to install the interceptor in the current page, install before triggering the action
+        :param driver: webdriver object to use
+        :return: (int) number of requests started so far, to pass as since to the waits
+        """
+        return driver.execute_script(INSTALL_SCRIPT, self.max_records)
+
+    def wait_for_network_idle(self, driver, quiet_ms=None, since=-1, timeout=None, start_ms=None):
+        """
+        Method to block until the page has no request in flight and was quiet for quiet_ms
+        :param driver: webdriver object to use
+        :param quiet_ms: time (ms) without network activity, defaults to self.quiet_ms
+        :param since: request count returned by install, to first wait for a request started after it.
+                      -1 to only wait for idle
+        :param timeout: timeout (secs), defaults to the WaitUtils timeout, shrunk to the remaining budget of the
+                        current deadline
+        :param start_ms: time (ms) for a request to start after since, the network counts as idle when none did.
+                         None to wait for a request until the timeout
+        :return: (boolean) True: if the network went idle, or no request started within start_ms
+                         False: on timeout
+        :raises DeadlineExceeded: if the budget of the current deadline is spent
+        """
+        self.logger.log_enter("NetworkMonitor: wait_for_network_idle")
+
+        quiet_ms = self.quiet_ms if quiet_ms is None else quiet_ms
+        timeout = clamp_timeout(self.waits.timeout if timeout is None else timeout, "wait_for_network_idle")
+
+        start = time.monotonic()
+        with tracer.span("NetworkMonitor: wait_for_network_idle", since=since, quiet_ms=quiet_ms):
+            self.install(driver)
+            with script_timeout(driver, timeout):
+                result = driver.execute_async_script(WAIT_FOR_IDLE_SCRIPT, quiet_ms, since, int(timeout * 1000),
+                                                     -1 if start_ms is None else start_ms)
+        idle = bool(result and result["idle"])
+        self.waits.record_wait("wait_for_network_idle", time.monotonic() - start, idle)
+        if not idle:
+            self.logger.log_info("NetworkMonitor: wait_for_network_idle not idle after %ss: %s", timeout, result)
+        elif since >= 0 and not result["fired"]:
+            self.logger.log_debug("NetworkMonitor: wait_for_network_idle no request started within %sms", start_ms)
+
+        self.logger.log_exit("NetworkMonitor: wait_for_network_idle")
+        return idle
+
+    def requests(self, driver, since=0):
+        """
+        Method to read the finished request records and keep their timings
+        :param driver: webdriver object to use
+        :param since: request count returned by install
+        :return: (List) list of records (id, method, url, start/end/duration in ms, status)
+        """
+        records = driver.execute_script(RECORDS_SCRIPT, since)
+        for record in records:
+            self.request_timings.append({"method": record["method"], "url": record["url"],
+                                         "status": record["status"], "duration": record["duration"] / 1000.0})
+            self.logger.log_debug("NetworkMonitor: request %s %s status: %s %.1fms", record["method"],
+                                  record["url"], record["status"], record["duration"])
+        return records
+
+    def request_summary(self):
+        """
+        Method to aggregate the kept request timings by method and path
+        :return: (Dict) "METHOD path" -> {count, total, max, errors}
+        """
+        summary = {}
+        for timing in self.request_timings:
+            path = timing["url"].split("?", 1)[0]
+            entry = summary.setdefault("{} {}".format(timing["method"], path),
+                                       {"count": 0, "total": 0.0, "max": 0.0, "errors": 0})
+            entry["count"] += 1
+            entry["total"] += timing["duration"]
+            entry["max"] = max(entry["max"], timing["duration"])
+            if not timing["status"] or timing["status"] >= 400:
+                entry["errors"] += 1
+        return summary
@@ -0,0 +1,329 @@
+/*
+ * Document Explorer stand-in application.
+ * Renders the DOM matched by the CSS selectors in utils/document_explorer.py.
+ */
+(function () {
+    'use strict';
+
+    var CREATE_ERROR_MESSAGE = 'Something went unexpectedly wrong. Try again. If the problem persists contact ' +
+        'your administrator.';
+    var UPLOAD_CONCURRENCY = 3;
+
+    var state = {
+        inflight: 0,
+        collections: {search: '', sort: 'none', page: 1, pageSize: 10, total: 0, request: 0},
+        documents: {collection: null, search: '', page: 1, pageSize: 10, total: 0, request: 0},
+        uploads: [],
+        uploadQueue: []
+    };
+
+    function $(selector, root) {
+        return (root || document).querySelector(selector);
+    }
+
+    function updateSpinner() {
+        $('.picnicSpinner').hidden = state.inflight === 0;
+    }
+
+    function api(method, path, body, headers) {
+        state.inflight++;
+        updateSpinner();
+        return fetch(path, {method: method, body: body, headers: headers || {}, credentials: 'same-origin'})
+            .then(function (response) {
+                if (response.status === 401) {
+                    window.location = '/auth/login?redirect=' + encodeURIComponent(window.location.pathname);
+                }
+                return response.text().then(function (text) {
+                    return {status: response.status, data: text ? JSON.parse(text) : null};
+                });
+            })
+            .finally(function () {
+                state.inflight--;
+                updateSpinner();
+            });
+    }
+
+    function query(params) {
+        return '?' + Object.keys(params).map(function (key) {
+            return key + '=' + encodeURIComponent(params[key]);
+        }).join('&');
+    }
+
+    function renderRows(tbody, rows, onClick) {
+        var fragment = document.createDocumentFragment();
+        rows.forEach(function (cells) {
+            var tr = document.createElement('tr');
+            cells.forEach(function (value) {
+                var td = document.createElement('td');
+                td.textContent = value;
+                tr.appendChild(td);
+            });
+            if (onClick) {
+                tr.addEventListener('click', function () {
+                    onClick(cells, tr);
+                });
+            }
+            fragment.appendChild(tr);
+        });
+        tbody.textContent = '';
+        tbody.appendChild(fragment);
+    }
+
+    function renderPager(pager, table) {
+        var pages = Math.max(1, Math.ceil(table.total / table.pageSize));
+        $('.pagerLabel', pager).textContent = table.page + ' / ' + pages;
+        $('.pagerPrevious', pager).disabled = table.page <= 1;
+        $('.pagerNext', pager).disabled = table.page >= pages;
+    }
+
+    function bindPager(pager, table, load) {
+        $('.pagerPrevious', pager).addEventListener('click', function () {
+            if (table.page > 1) {
+                table.page--;
+                load();
+            }
+        });
+        $('.pagerNext', pager).addEventListener('click', function () {
+            if (table.page * table.pageSize < table.total) {
+                table.page++;
+                load();
+            }
+        });
+    }
+
+    function bindSearch(input, table, load) {
+        var onSearch = function () {
+            if (input.value !== table.search) {
+                table.search = input.value;
+                table.page = 1;
+                load();
+            }
+        };
+        input.addEventListener('input', onSearch);
+        input.addEventListener('change', onSearch);
+    }
+
+    // Collections
+
+    function loadCollections() {
+        var table = state.collections;
+        var request = ++table.request;
+        return api('GET', '/api/collections' + query({
+            search: table.search, sort: table.sort, page: table.page, page_size: table.pageSize
+        })).then(function (result) {
+            if (request !== table.request || result.status !== 200) {
+                return;
+            }
+            table.total = result.data.total;
+            renderRows($('#collectionRows'), result.data.items.map(function (item) {
+                return [item.name, String(item.documents), item.created];
+            }), function (cells, tr) {
+                selectCollection(cells[0], tr);
+            });
+            renderPager($('#collectionPager'), table);
+        });
+    }
+
+    function selectCollection(name, tr) {
+        Array.prototype.forEach.call(document.querySelectorAll('#collectionRows tr.selected'), function (row) {
+            row.classList.remove('selected');
+        });
+        tr.classList.add('selected');
+        state.documents.collection = name;
+        state.documents.page = 1;
+        $('#documentsTitle').textContent = name;
+        $('#uploader button').disabled = false;
+        loadDocuments();
+    }
+
+    function openCreateDialog() {
+        var dialog = document.createElement('div');
+        dialog.className = 'picnicDialog picnicDialogSizeWidthSmall';
+        dialog.innerHTML =
+            '<header>New collection</header>' +
+            '<container>' +
+            '<platform-new-collection-dialog>' +
+            '<label>Name</label>' +
+            '<input type="text" class="picnicTextBox">' +
+            '<footer><buttons>' +
+            '<button class="picnicButton">Create</button>' +
+            '<button class="picnicButton">Cancel</button>' +
+            '</buttons></footer>' +
+            '</platform-new-collection-dialog>' +
+            '</container>';
+        var buttons = dialog.querySelectorAll('buttons > button');
+        buttons[0].addEventListener('click', function () {
+            var name = $('.picnicTextBox', dialog).value.trim();
+            api('POST', '/api/collections', JSON.stringify({name: name}), {'Content-Type': 'application/json'})
+                .then(function (result) {
+                    if (result.status === 201) {
+                        dialog.remove();
+                        loadCollections();
+                    } else {
+                        var messenger = $('.picnicMessenger', dialog);
+                        if (!messenger) {
+                            messenger = document.createElement('p');
+                            messenger.className = 'picnicMessenger';
+                            $('platform-new-collection-dialog', dialog).appendChild(messenger);
+                        }
+                        messenger.textContent = (result.data && result.data.error) || CREATE_ERROR_MESSAGE;
+                    }
+                });
+        });
+        buttons[1].addEventListener('click', function () {
+            dialog.remove();
+        });
+        document.body.appendChild(dialog);
+        $('.picnicTextBox', dialog).focus();
+    }
+
+    // Documents
+
+    function loadDocuments() {
+        var table = state.documents;
+        if (!table.collection) {
+            return Promise.resolve();
+        }
+        var request = ++table.request;
+        return api('GET', '/api/collections/' + encodeURIComponent(table.collection) + '/documents' + query({
+            search: table.search, page: table.page, page_size: table.pageSize
+        })).then(function (result) {
+            if (request !== table.request || result.status !== 200) {
+                return;
+            }
+            table.total = result.data.total;
+            renderRows($('#documentRows'), result.data.items.map(function (item) {
+                return [item.state, item.name, String(item.size), item.uploaded];
+            }));
+            renderPager($('#documentPager'), table);
+        });
+    }
+
+    // Uploads
+
+    function renderUploads() {
+        var panel = $('#uploadPanel');
+        var finished = state.uploads.filter(function (upload) {
+            return upload.finished;
+        }).length;
+        panel.hidden = state.uploads.length === 0;
+        if (finished === state.uploads.length) {
+            $('#uploadStatus').textContent = finished + ' of ' + state.uploads.length + ' files finished uploading';
+        } else {
+            $('#uploadStatus').textContent = 'Uploading ' + (finished + 1) + ' of ' + state.uploads.length + ' files';
+        }
+        var rows = $('#uploadRows');
+        rows.textContent = '';
+        state.uploads.forEach(function (upload) {
+            var row = document.createElement('row');
+            row.className = 'uploadRow';
+            row.setAttribute('data-file', upload.name);
+            row.setAttribute('data-status', upload.status);
+            row.innerHTML = '<span class="uploadRowName"></span><span class="uploadRowStatus"></span>';
+            $('.uploadRowName', row).textContent = upload.name;
+            $('.uploadRowStatus', row).textContent = upload.status;
+            rows.appendChild(row);
+        });
+    }
+
+    function uploadNext() {
+        var upload = state.uploadQueue.shift();
+        if (!upload) {
+            return Promise.resolve();
+        }
+        upload.status = 'Uploading';
+        renderUploads();
+        return api('POST', '/api/collections/' + encodeURIComponent(upload.collection) + '/documents' +
+            query({name: upload.name}), upload.file, {'Content-Type': 'application/octet-stream'})
+            .then(function (result) {
+                upload.status = (result.data && result.data.status) || 'Failed';
+            }, function () {
+                upload.status = 'Failed';
+            })
+            .then(function () {
+                upload.finished = true;
+                renderUploads();
+                return uploadNext();
+            });
+    }
+
+    function renderUploaderButton() {
+        // the uploader re-renders its button when files are picked, like the application does
+        var uploader = $('#uploader');
+        var button = document.createElement('button');
+        button.className = 'picnicButtonColorGreen picnicButton';
+        button.textContent = 'Upload';
+        button.disabled = !state.documents.collection;
+        button.addEventListener('click', function () {
+            $('input', uploader).click();
+        });
+        uploader.replaceChild(button, $('button', uploader));
+    }
+
+    function onFilesPicked(event) {
+        var input = event.target;
+        var collection = state.documents.collection;
+        if (!collection || !input.files.length) {
+            return;
+        }
+        Array.prototype.forEach.call(input.files, function (file) {
+            var upload = {name: file.name, file: file, collection: collection, status: 'Queued', finished: false};
+            state.uploads.push(upload);
+            state.uploadQueue.push(upload);
+        });
+        input.value = '';
+        renderUploaderButton();
+        renderUploads();
+
+        var workers = [];
+        for (var i = 0; i < UPLOAD_CONCURRENCY; i++) {
+            workers.push(uploadNext());
+        }
+        Promise.all(workers).then(function () {
+            loadDocuments();
+            loadCollections();
+        });
+    }
+
+    // Bindings
+
+    // like Angular forms, a used control turns ng-dirty and stays so when it is cleared
+    Array.prototype.forEach.call(document.querySelectorAll('.ng-pristine'), function (control) {
+        var markDirty = function () {
+            control.classList.remove('ng-pristine');
+            control.classList.add('ng-dirty');
+        };
+        control.addEventListener('input', markDirty);
+        control.addEventListener('change', markDirty);
+    });
+    bindSearch($('#collectionSearch'), state.collections, loadCollections);
+    bindPager($('#collectionPager'), state.collections, loadCollections);
+    $('#collectionPageSize').addEventListener('change', function (event) {
+        state.collections.pageSize = parseInt(event.target.value, 10);
+        state.collections.page = 1;
+        loadCollections();
+    });
+    $('#collectionSort').addEventListener('click', function (event) {
+        var next = {none: 'asc', asc: 'desc', desc: 'none'};
+        state.collections.sort = next[state.collections.sort];
+        state.collections.page = 1;
+        event.target.setAttribute('data-sort', state.collections.sort);
+        loadCollections();
+    });
+    $('#collectionCreate').addEventListener('click', openCreateDialog);
+
+    bindSearch($('#documentSearch'), state.documents, loadDocuments);
+    bindPager($('#documentPager'), state.documents, loadDocuments);
+    $('#uploader input').addEventListener('change', onFilesPicked);
+    $('#uploader button').addEventListener('click', function () {
+        $('#uploader input').click();
+    });
+    $('#clearFinished').addEventListener('click', function () {
+        state.uploads = state.uploads.filter(function (upload) {
+            return !upload.finished;
+        });
+        renderUploads();
+    });
+
+    loadCollections();
+}());
@@ -0,0 +1,202 @@
+import json
+import os
+import posixpath
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+
+from utils.logs_util import DocumentExplorerLogger
+
+BASEDIR = Path(__file__).resolve().parent.parent
+
+STORAGE_DUMP_SCRIPT = """
+var dump = function (storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+};
+return {local_storage: dump(window.localStorage), session_storage: dump(window.sessionStorage)};
+"""
+
+STORAGE_RESTORE_SCRIPT = """
+var restore = function (storage, items) {
+    Object.keys(items).forEach(function (key) {
+        storage.setItem(key, items[key]);
+    });
+};
+restore(window.localStorage, arguments[0]);
+restore(window.sessionStorage, arguments[1]);
+"""
+
+
+def get_origin(url):
+    """
+    Method to get the origin (scheme://host:port) of a url
+    :param url: the url
+    :return: (string) origin of the url
+    """
+    parts = urlsplit(url)
+    return "{}://{}".format(parts.scheme, parts.netloc)
+
+
+def get_cookie_url(url):
+    """
+    Method to get the url to read the cookies of a page on, including the cookies scoped to its path
+    (e.g. the Keycloak cookies of /auth/realms/<realm>/ for the login page)
+    :param url: url of the page
+    :return: (string) origin and directory of the url path
+    """
+    parts = urlsplit(url)
+    return "{}://{}{}/".format(parts.scheme, parts.netloc, posixpath.dirname(parts.path).rstrip("/"))
+
+
+class SessionCache:
+    """
+    File backed cache of an authenticated browser session (cookies, local and session storage).
+    Cookies are kept per origin so the identity provider session can be restored along with the app session.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, cache_file=None, max_age=1800, restore_path="/favicon.ico"):
+        """
+        :param cache_file: path of the session cache file
+        :param max_age: time (secs) a saved session stays valid
+        :param restore_path: lightweight same origin path loaded to set cookies before navigating to the app
+        """
+        self.logger.log_enter("SessionCache: __init__")
+
+        self.cache_file = Path(cache_file or os.environ.get("DE_SESSION_CACHE_FILE",
+                                                            BASEDIR.joinpath(".session_cache.json")))
+        self.max_age = max_age
+        self.restore_path = restore_path
+
+        self.logger.log_exit("SessionCache: __init__")
+
+    def load(self, url, username):
+        """
+        Method to load the saved session
+        :param url: url of document explorer application
+        :param username: username the session belongs to
+        :return: (Dict) saved session, None if missing, expired or saved for another url/user
+        """
+        self.logger.log_enter("SessionCache: load")
+
+        session = None
+        try:
+            with open(str(self.cache_file)) as cache:
+                session = json.load(cache)
+            if session.get("url") != url or session.get("username") != username:
+                self.logger.log_info("SessionCache: load session saved for another url/user")
+                session = None
+            elif session.get("expires_at", 0) <= time.time():
+                self.logger.log_info("SessionCache: load session expired")
+                session = None
+        except FileNotFoundError:
+            self.logger.log_debug("SessionCache: load no session cache file %s", self.cache_file)
+        except ValueError as e:
+            self.logger.log_error("SessionCache: load Exception: %s", e)
+
+        self.logger.log_exit("SessionCache: load")
+        return session
+
+    def save(self, driver, url, username, extra_urls=None):
+        """
+        Method to save the session of a logged in driver
+        :param driver: webdriver object to use, must be on the application page
+        :param url: url of document explorer application
+        :param username: username the session belongs to
+        :param extra_urls: pages of other origins (e.g. the identity provider login page) whose cookies should be
+                           saved too. The cookies are read on the directory of the page, so cookies scoped to its
+                           path are included.
+        :return:
+        :raises WebDriverException: if the cookies or storage can not be read
+        """
+        self.logger.log_enter("SessionCache: save")
+
+        storage = driver.execute_script(STORAGE_DUMP_SCRIPT)
+        cookies = {get_origin(url): driver.get_cookies()}
+        cookie_urls = {}
+        for extra_url in extra_urls or []:
+            cookie_url = get_cookie_url(extra_url)
+            driver.get(cookie_url)
+            cookies[get_origin(cookie_url)] = driver.get_cookies()
+            cookie_urls[get_origin(cookie_url)] = cookie_url
+        if extra_urls:
+            driver.get(url)
+
+        now = time.time()
+        session = {
+            "url": url,
+            "username": username,
+            "saved_at": now,
+            "expires_at": now + self.max_age,
+            "cookies": cookies,
+            "cookie_urls": cookie_urls,
+            "local_storage": storage["local_storage"],
+            "session_storage": storage["session_storage"],
+        }
+
+        # write atomically, parallel workers may read the cache file at the same time
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.cache_file.parent), prefix=".session_cache")
+        with os.fdopen(fd, "w") as tmp_file:
+            json.dump(session, tmp_file)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, str(self.cache_file))
+        self.logger.log_info("SessionCache: save session saved to %s", self.cache_file)
+
+        self.logger.log_exit("SessionCache: save")
+
+    def restore(self, driver, url, username):
+        """
+        Method to restore the saved session into a driver and navigate to the application
+        :param driver: webdriver object to use
+        :param url: url of document explorer application
+        :param username: username the session belongs to
+        :return: (boolean) True: if a saved session was restored
+                         False: if there is no valid saved session
+        """
+        self.logger.log_enter("SessionCache: restore")
+
+        session = self.load(url, username)
+        restored = False
+        if session:
+            try:
+                app_origin = get_origin(url)
+                for origin, cookies in session["cookies"].items():
+                    # cookies can only be added for the domain currently loaded, path scoped cookies
+                    # are restored on the page they were read on
+                    driver.get(session.get("cookie_urls", {}).get(origin, origin + self.restore_path))
+                    for cookie in cookies:
+                        if "expiry" in cookie:
+                            cookie["expiry"] = int(cookie["expiry"])
+                        driver.add_cookie(cookie)
+                    if origin == app_origin:
+                        driver.execute_script(STORAGE_RESTORE_SCRIPT, session["local_storage"],
+                                              session["session_storage"])
+                driver.get(url)
+                restored = True
+            except WebDriverException as e:
+                self.logger.log_error("SessionCache: restore Exception: %s", e)
+
+        self.logger.log_exit("SessionCache: restore")
+        return restored
+
+    def invalidate(self):
+        """
+        Method to remove the saved session
+        :return:
+        """
+        self.logger.log_enter("SessionCache: invalidate")
+
+        try:
+            self.cache_file.unlink()
+        except FileNotFoundError:
+            pass
+
+        self.logger.log_exit("SessionCache: invalidate")
@@ -0,0 +1,406 @@
+"""
+Local stand-in for the Document Explorer application.
+
+Implements the login form, the collection and document tables (search, sort, paging,
+page size), the create collection dialog and the upload widget with the same DOM as the
+CSS selectors in utils.document_explorer, backed by an in-memory JSON API.
+
+Usage:
+    python -m utils.standin_server --port 8080 --latency 0.2
+"""
+import argparse
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs, quote, unquote
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.document_explorer import Collections, Documents
+
+STATIC_DIR = Path(__file__).resolve().parent.joinpath("resources/standin")
+SESSION_COOKIE = "DE_SESSION"
+ACCEPTED_DOCUMENT_TYPES = (".pdf", ".jpg", ".jpeg", ".png", ".tif", ".tiff")
+
+# Collections and documents the functional tests expect to exist
+DEFAULT_SEED = {
+    "abhishek": [Documents.pdf_test_file_2_name],
+    "invoices": [],
+    "Contracts": [],
+    "receipts_2019": [],
+}
+
+
+class StandinState:
+    """
+    In-memory collections and documents of the stand-in application.
+    """
+
+    def __init__(self, seed=None):
+        """
+        :param seed: dict of collection name -> list of document names to start with
+        """
+        self.lock = threading.Lock()
+        self.collections = {}
+        self.reset(DEFAULT_SEED if seed is None else seed)
+
+    def reset(self, seed=None):
+        """
+        Method to drop all data and load the seed
+        :param seed: dict of collection name -> list of document names
+        :return:
+        """
+        with self.lock:
+            self.collections = {}
+            for collection_name, document_names in (seed or {}).items():
+                documents = {}
+                for document_name in document_names:
+                    documents[document_name] = self._new_document(document_name, 0)
+                self.collections[collection_name] = {"name": collection_name, "created": self._now(),
+                                                     "documents": documents}
+
+    @staticmethod
+    def _now():
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+
+    def _new_document(self, name, size):
+        return {"name": name, "size": size, "state": "Processed", "uploaded": self._now()}
+
+    def list_collections(self, search="", sort="none"):
+        with self.lock:
+            items = [{"name": collection["name"], "documents": len(collection["documents"]),
+                      "created": collection["created"]} for collection in self.collections.values()]
+        return sort_and_filter(items, search, sort)
+
+    def create_collection(self, name):
+        with self.lock:
+            if not name or name in self.collections:
+                return None
+            collection = {"name": name, "created": self._now(), "documents": {}}
+            self.collections[name] = collection
+            return {"name": name, "documents": 0, "created": collection["created"]}
+
+    def delete_collection(self, name):
+        with self.lock:
+            return self.collections.pop(name, None) is not None
+
+    def list_documents(self, collection_name, search="", sort="none"):
+        with self.lock:
+            collection = self.collections.get(collection_name)
+            if collection is None:
+                return None
+            items = [dict(document) for document in collection["documents"].values()]
+        return sort_and_filter(items, search, sort)
+
+    def add_document(self, collection_name, name, size):
+        with self.lock:
+            collection = self.collections.get(collection_name)
+            if collection is None:
+                return None
+            document = self._new_document(name, size)
+            collection["documents"][name] = document
+            return dict(document)
+
+    def delete_document(self, collection_name, name):
+        with self.lock:
+            collection = self.collections.get(collection_name)
+            return collection is not None and collection["documents"].pop(name, None) is not None
+
+
+def sort_and_filter(items, search, sort):
+    """
+    Method to filter items by a case insensitive name search and sort them by name
+    :param items: list of dicts with a "name" key
+    :param search: search text
+    :param sort: sort order [asc, desc, none]
+    :return: (List) filtered and sorted items
+    """
+    if search:
+        search = search.lower()
+        items = [item for item in items if search in item["name"].lower()]
+    if sort in ("asc", "desc"):
+        items.sort(key=lambda item: item["name"].lower(), reverse=sort == "desc")
+    return items
+
+
+def paginate(items, query):
+    """
+    Method to cut a page out of items
+    :param items: list of items
+    :param query: parsed query string with optional page and page_size
+    :return: (Dict) total, page, page_size and items of the page
+    """
+    page_size = int(query.get("page_size", ["10"])[0])
+    page = max(1, int(query.get("page", ["1"])[0]))
+    start = (page - 1) * page_size
+    return {"total": len(items), "page": page, "page_size": page_size, "items": items[start:start + page_size]}
+
+
+class StandinRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "DocumentExplorerStandin/1.0"
+    # headers and body are written separately, avoid Nagle delays on kept alive connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        self.server.logger.log_debug("StandinServer: %s %s", self.address_string(), format % args)
+
+    # Helpers
+
+    def send_body(self, status, body=b"", content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_json(self, status, data=None):
+        self.send_body(status, json.dumps(data).encode("utf-8") if data is not None else b"")
+
+    def redirect(self, location, headers=None):
+        headers = dict(headers or {})
+        headers["Location"] = location
+        self.send_body(302, b"", "text/plain", headers)
+
+    def send_static(self, name, content_type):
+        self.send_body(200, STATIC_DIR.joinpath(name).read_bytes(), content_type)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def discard_body(self):
+        """Reads the request body in chunks without keeping it, returns its size."""
+        remaining = int(self.headers.get("Content-Length", 0))
+        size = 0
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            size += len(chunk)
+            remaining -= len(chunk)
+        return size
+
+    def is_authenticated(self):
+        cookies = self.headers.get("Cookie", "")
+        for cookie in cookies.split(";"):
+            name, _, value = cookie.strip().partition("=")
+            if name == SESSION_COOKIE and value in self.server.sessions:
+                return True
+        return False
+
+    def route(self):
+        parts = urlsplit(self.path)
+        segments = [unquote(segment) for segment in parts.path.split("/") if segment]
+        return segments, parse_qs(parts.query)
+
+    # Dispatch
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        segments, query = self.route()
+        if segments == ["favicon.ico"]:
+            self.send_body(204, b"", "image/x-icon")
+        elif segments == ["auth", "login"]:
+            self.send_static("login.html", "text/html; charset=utf-8")
+        elif segments[:1] == ["static"] and len(segments) == 2 and segments[1] in ("app.js", "app.css"):
+            content_type = "application/javascript" if segments[1].endswith(".js") else "text/css"
+            self.send_static(segments[1], content_type)
+        elif segments == ["document-explorer"]:
+            if self.is_authenticated():
+                self.send_static("app.html", "text/html; charset=utf-8")
+            else:
+                self.redirect("/auth/login?redirect={}".format(quote(self.path)))
+        elif segments[:1] == ["api"]:
+            self.handle_api("GET", segments[1:], query)
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        segments, query = self.route()
+        if segments == ["auth", "login"]:
+            self.handle_login(query)
+        elif segments[:1] == ["api"]:
+            self.handle_api("POST", segments[1:], query)
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_DELETE(self):
+        segments, query = self.route()
+        if segments[:1] == ["api"]:
+            self.handle_api("DELETE", segments[1:], query)
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def handle_login(self, query):
+        self.server.inject_latency()
+        form = parse_qs(self.read_body().decode("utf-8"))
+        username = form.get("username", [""])[0]
+        password = form.get("password", [""])[0]
+        if username == self.server.username and password == self.server.password:
+            token = secrets.token_hex(16)
+            self.server.sessions.add(token)
+            self.redirect(query.get("redirect", ["/document-explorer"])[0],
+                          {"Set-Cookie": "{}={}; Path=/; HttpOnly".format(SESSION_COOKIE, token)})
+        else:
+            self.redirect("/auth/login?error=1&redirect={}".format(
+                quote(query.get("redirect", ["/document-explorer"])[0])))
+
+    def handle_api(self, method, segments, query):
+        if not self.is_authenticated():
+            self.discard_body()
+            self.send_json(401, {"error": "not authenticated"})
+            return
+        self.server.inject_latency()
+
+        state = self.server.state
+        search = query.get("search", [""])[0]
+        sort = query.get("sort", ["none"])[0]
+
+        if segments == ["reset"] and method == "POST":
+            state.reset(json.loads(self.read_body() or b"null"))
+            self.send_json(204)
+        elif segments == ["collections"] and method == "GET":
+            self.send_json(200, paginate(state.list_collections(search, sort), query))
+        elif segments == ["collections"] and method == "POST":
+            name = json.loads(self.read_body() or b"{}").get("name", "").strip()
+            collection = state.create_collection(name)
+            if collection is None:
+                self.send_json(409, {"error": Collections.create_error_message})
+            else:
+                self.send_json(201, collection)
+        elif len(segments) == 2 and segments[0] == "collections" and method == "DELETE":
+            self.send_json(204 if state.delete_collection(segments[1]) else 404)
+        elif len(segments) == 3 and segments[0] == "collections" and segments[2] == "documents":
+            self.handle_documents(method, segments[1], search, sort, query)
+        elif len(segments) == 4 and segments[0] == "collections" and segments[2] == "documents" \
+                and method == "DELETE":
+            self.send_json(204 if state.delete_document(segments[1], segments[3]) else 404)
+        else:
+            self.discard_body()
+            self.send_json(404, {"error": "not found"})
+
+    def handle_documents(self, method, collection_name, search, sort, query):
+        state = self.server.state
+        if method == "GET":
+            documents = state.list_documents(collection_name, search, sort)
+            if documents is None:
+                self.send_json(404, {"error": "collection not found"})
+            else:
+                self.send_json(200, paginate(documents, query))
+        elif method == "POST":
+            name = query.get("name", [""])[0]
+            size = self.discard_body()
+            if not name.lower().endswith(ACCEPTED_DOCUMENT_TYPES):
+                self.send_json(415, {"name": name, "status": Documents.document_upload_failure_msg})
+                return
+            document = state.add_document(collection_name, name, size)
+            if document is None:
+                self.send_json(404, {"error": "collection not found"})
+            else:
+                document["status"] = Documents.document_upload_success_msg
+                self.send_json(201, document)
+        else:
+            self.discard_body()
+            self.send_json(405, {"error": "method not allowed"})
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    Stand-in Document Explorer HTTP server, run in a background thread with start()/stop().
+    """
+    daemon_threads = True
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, username="test_user", password="test_password",
+                 seed=None):
+        """
+        :param host: interface to listen on
+        :param port: port to listen on, 0 for a free port
+        :param latency: delay (secs) injected in every API and login request
+        :param username: username accepted by the login form
+        :param password: password accepted by the login form
+        :param seed: dict of collection name -> list of document names to start with
+        """
+        super().__init__((host, port), StandinRequestHandler)
+        self.latency = latency
+        self.username = username
+        self.password = password
+        self.state = StandinState(seed)
+        self.sessions = set()
+        self._thread = None
+
+    @property
+    def app_url(self):
+        host, port = self.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+    def inject_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def start(self):
+        """
+        Method to serve requests in a background thread
+        :return: self
+        """
+        self.logger.log_enter("StandinServer: start")
+
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="standin-server", daemon=True)
+        self._thread.start()
+        self.logger.log_info("StandinServer: start serving on %s", self.app_url)
+
+        self.logger.log_exit("StandinServer: start")
+        return self
+
+    def stop(self):
+        """
+        Method to stop serving and close the socket
+        :return:
+        """
+        self.logger.log_enter("StandinServer: stop")
+
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+        self.logger.log_exit("StandinServer: stop")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="delay (secs) injected in every API request")
+    parser.add_argument("--username", default="test_user")
+    parser.add_argument("--password", default="test_password")
+    args = parser.parse_args()
+
+    server = StandinServer(args.host, args.port, args.latency, args.username, args.password)
+    print("Document Explorer stand-in on {}/document-explorer (user: {})".format(server.app_url, args.username))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
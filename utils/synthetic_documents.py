@@ -0,0 +1,217 @@
+"""
+Synthetic test documents (PDF, TIFF) of configurable size and page count, written to disk in chunks without
+building them in memory.
+"""
+import random
+import struct
+from pathlib import Path
+
+# Size of the filler block repeated in the padding stream and the TIFF pixel data
+FILLER_BLOCK_SIZE = 64 * 1024
+
+# Width in pixels of the synthetic TIFF pages, 8.5in at 200dpi like a scanned letter page
+TIFF_PAGE_WIDTH = 1700
+TIFF_RESOLUTION = 200
+
+
+def _filler_block(seed=0):
+    rng = random.Random(seed)
+    return bytes(rng.getrandbits(8) for _ in range(FILLER_BLOCK_SIZE))
+
+
+def _pdf_text(text):
+    """
+    Method to escape a text for a PDF string literal, characters outside latin-1 are replaced
+    :param text: text to escape
+    :return: (bytes) escaped text
+    """
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("latin-1", "replace")
+
+
+class CountingWriter:
+    """
+    File wrapper counting the written bytes, used for the PDF object offsets.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.offset = 0
+
+    def write(self, data):
+        self.stream.write(data)
+        self.offset += len(data)
+
+    def write_filler(self, length, block):
+        """
+        Method to write length bytes repeating the filler block
+        :param length: number of bytes
+        :param block: filler block
+        :return:
+        """
+        remaining = length
+        while remaining > 0:
+            chunk = block if remaining >= len(block) else block[:remaining]
+            self.write(chunk)
+            remaining -= len(chunk)
+
+
+def write_pdf(path, size=0, pages=1, title="Synthetic document", seed=0):
+    """
+    Method to write a valid PDF with a text line per page, padded with an unreferenced stream object
+    to reach size. The padding is written in blocks so memory use does not depend on the size.
+    :param path: output file path
+    :param size: target file size in bytes, the file is never smaller than the PDF structure itself
+    :param pages: number of pages
+    :param title: text shown on every page
+    :param seed: seed of the padding bytes
+    :return: (int) size of the written file
+    """
+    pages = max(1, pages)
+    # objects: 1 catalog, 2 pages, 3 font, then page and content stream per page, then the padding stream
+    page_ids = [4 + 2 * i for i in range(pages)]
+    padding_id = 4 + 2 * pages
+
+    with open(str(path), "wb") as output:
+        writer = CountingWriter(output)
+        offsets = {}
+
+        def write_object(object_id, body):
+            offsets[object_id] = writer.offset
+            writer.write(b"%d 0 obj\n" % object_id)
+            writer.write(body)
+            writer.write(b"\nendobj\n")
+
+        writer.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        write_object(2, b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % page_id for page_id in page_ids) +
+                     b"] /Count %d >>" % pages)
+        write_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        for number, page_id in enumerate(page_ids, 1):
+            write_object(page_id, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                                  b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (page_id + 1))
+            content = b"BT /F1 18 Tf 72 720 Td (" + _pdf_text("{} - page {}".format(title, number)) + b") Tj ET"
+            write_object(page_id + 1, b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+        object_count = padding_id + 1
+
+        def tail_size(length):
+            header = b"%d 0 obj\n<< /Length %d >>\nstream\n" % (padding_id, length)
+            startxref = writer.offset + len(header) + length + len(b"\nendstream\nendobj\n")
+            xref = len(b"xref\n0 %d\n" % object_count) + 20 * object_count
+            trailer = len(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (object_count, startxref))
+            return len(header) + length + len(b"\nendstream\nendobj\n") + xref + trailer
+
+        # the padding length changes the digits of startxref, settle it in a few rounds
+        length = 0
+        for _ in range(3):
+            length = max(0, length + size - (writer.offset + tail_size(length)))
+
+        offsets[padding_id] = writer.offset
+        writer.write(b"%d 0 obj\n<< /Length %d >>\nstream\n" % (padding_id, length))
+        writer.write_filler(length, _filler_block(seed))
+        writer.write(b"\nendstream\nendobj\n")
+
+        startxref = writer.offset
+        writer.write(b"xref\n0 %d\n" % object_count)
+        writer.write(b"0000000000 65535 f \n")
+        for object_id in range(1, object_count):
+            writer.write(b"%010d 00000 n \n" % offsets[object_id])
+        writer.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (object_count, startxref))
+        return writer.offset
+
+
+def _tiff_ifd(entries, next_ifd, rational_offset):
+    """
+    Method to build a little endian TIFF image file directory
+    :param entries: list of (tag, type, count, value) sorted by tag, RATIONAL values point at rational_offset
+    :param next_ifd: offset of the next IFD, 0 for the last page
+    :param rational_offset: offset of the resolution rational written after the IFD
+    :return: (bytes) IFD followed by the resolution rational
+    """
+    ifd = struct.pack("<H", len(entries))
+    for tag, field_type, count, value in entries:
+        if field_type == 3 and count == 2:
+            ifd += struct.pack("<HHIHH", tag, field_type, count, *value)
+        elif field_type == 3:
+            ifd += struct.pack("<HHIHH", tag, field_type, count, value, 0)
+        elif field_type == 5:
+            ifd += struct.pack("<HHII", tag, field_type, count, rational_offset)
+        else:
+            ifd += struct.pack("<HHII", tag, field_type, count, value)
+    return ifd + struct.pack("<I", next_ifd) + struct.pack("<II", TIFF_RESOLUTION, 1)
+
+
+def write_tiff(path, size=0, pages=1, seed=0):
+    """
+    Method to write a valid multi-page TIFF of uncompressed 8 bit grayscale pages, like an unprocessed scan.
+    Every page is one strip of noise followed by its IFD, the page height is chosen to reach size and the
+    remainder is padded with unreferenced bytes. The pixels are written in blocks so memory use does not
+    depend on the size.
+    :param path: output file path
+    :param size: target file size in bytes, the file is never smaller than one pixel row per page
+    :param pages: number of pages
+    :param seed: seed of the pixel bytes
+    :return: (int) size of the written file
+    """
+    pages = max(1, pages)
+    entry_count = 13
+    ifd_size = 2 + 12 * entry_count + 4 + 8
+    budget = max(1, (size - 8 - pages * ifd_size) // pages)
+    width = min(TIFF_PAGE_WIDTH, budget)
+    height = max(1, budget // width)
+    # IFDs have to start on a word boundary
+    strip_size = width * height
+    page_size = strip_size + strip_size % 2 + ifd_size
+
+    with open(str(path), "wb") as output:
+        writer = CountingWriter(output)
+        writer.write(b"II*\x00" + struct.pack("<I", 8 + strip_size + strip_size % 2))
+        block = _filler_block(seed)
+        for page in range(pages):
+            strip_offset = writer.offset
+            writer.write_filler(strip_size, block)
+            writer.write(b"\x00" * (strip_size % 2))
+            ifd_offset = writer.offset
+            next_ifd = ifd_offset + page_size if page < pages - 1 else 0
+            writer.write(_tiff_ifd([
+                (254, 4, 1, 2 if pages > 1 else 0),   # NewSubfileType: page of a multi-page image
+                (256, 4, 1, width),                   # ImageWidth
+                (257, 4, 1, height),                  # ImageLength
+                (258, 3, 1, 8),                       # BitsPerSample
+                (259, 3, 1, 1),                       # Compression: none
+                (262, 3, 1, 1),                       # PhotometricInterpretation: BlackIsZero
+                (273, 4, 1, strip_offset),            # StripOffsets
+                (277, 3, 1, 1),                       # SamplesPerPixel
+                (278, 4, 1, height),                  # RowsPerStrip
+                (279, 4, 1, strip_size),              # StripByteCounts
+                (282, 5, 1, None),                    # XResolution
+                (283, 5, 1, None),                    # YResolution
+                (297, 3, 2, (page, pages)),           # PageNumber
+            ], next_ifd, ifd_offset + ifd_size - 8))
+        writer.write_filler(size - writer.offset, block)
+        return writer.offset
+
+
+DOCUMENT_WRITERS = {".pdf": write_pdf, ".tif": write_tiff, ".tiff": write_tiff}
+
+
+def generate_documents(directory, count, size, pages=1, suffix=".pdf", prefix="synthetic", seed=0):
+    """
+    Method to write synthetic documents of one size and type into a directory
+    :param directory: output directory
+    :param count: number of documents
+    :param size: size in bytes of every document
+    :param pages: number of pages of every document
+    :param suffix: file type [.pdf, .tif, .tiff]
+    :param prefix: file name prefix, the file names end with the size and an index
+    :param seed: seed of the filler bytes, every document gets its own so they are not identical uploads
+    :return: (List) list of document paths
+    """
+    writer = DOCUMENT_WRITERS[suffix]
+    paths = []
+    for index in range(count):
+        path = Path(directory).joinpath("{}_{}_{:04d}{}".format(prefix, size, index, suffix))
+        writer(path, size, pages=pages, seed=seed + index)
+        paths.append(path)
+    return paths
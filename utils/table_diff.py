@@ -0,0 +1,241 @@
+from utils.logs_util import DocumentExplorerLogger
+
+# Returns per data row [key cell hash, row hash] (32 bit string hashes of the key cell text and of the
+# tab joined cell texts), and the WaitUtils table fingerprint, or null if the table is not in the DOM.
+# arguments: table CSS selector, key column index
+ROW_HASHES_SCRIPT = """
+var hashText = function (text) {
+    var hash = 0;
+    for (var i = 0; i < text.length; i++) {
+        hash = ((hash * 31) + text.charCodeAt(i)) | 0;
+    }
+    return hash;
+};
+var table = document.querySelector(arguments[0]);
+if (!table) {
+    return null;
+}
+var keyColumn = arguments[1];
+var rows = table.getElementsByTagName('tr');
+var hashes = [];
+for (var i = 0; i < rows.length; i++) {
+    var cells = rows[i].getElementsByTagName('td');
+    if (!cells.length) {
+        continue;
+    }
+    var texts = [];
+    for (var j = 0; j < cells.length; j++) {
+        texts.push((cells[j].innerText || '').trim());
+    }
+    hashes.push([hashText(texts[keyColumn] === undefined ? '' : texts[keyColumn]), hashText(texts.join('\\t'))]);
+}
+return {rows: hashes, fingerprint: rows.length + ':' + hashText(table.innerText || '')};
+"""
+
+# Returns the cell texts of the data rows at the given indexes
+# arguments: table CSS selector, list of data row indexes
+ROWS_BY_INDEX_SCRIPT = """
+var table = document.querySelector(arguments[0]);
+if (!table) {
+    return null;
+}
+var rows = [];
+var all = table.getElementsByTagName('tr');
+for (var i = 0; i < all.length; i++) {
+    if (all[i].getElementsByTagName('td').length) {
+        rows.push(all[i]);
+    }
+}
+return arguments[1].map(function (index) {
+    var row = rows[index];
+    if (!row) {
+        return null;
+    }
+    var cells = row.getElementsByTagName('td');
+    var values = [];
+    for (var j = 0; j < cells.length; j++) {
+        values.push((cells[j].innerText || '').trim());
+    }
+    return values;
+});
+"""
+
+
+class TableFingerprint:
+    """
+    Row hashes of a table taken before an operation.
+    """
+    __slots__ = ("table_css", "key_column", "rows", "fingerprint")
+
+    def __init__(self, table_css, key_column, rows, fingerprint):
+        """
+        :param table_css: CSS selector for table element
+        :param key_column: index of the column identifying a row, e.g. the names column
+        :param rows: list of [key hash, row hash] per data row
+        :param fingerprint: WaitUtils table fingerprint of the same table state
+        """
+        self.table_css = table_css
+        self.key_column = key_column
+        self.rows = rows
+        self.fingerprint = fingerprint
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class TableDiff:
+    """
+    Changed rows of a table between two fingerprints.
+    inserted: list of cell value lists of the new rows
+    removed: list of row indexes in the before table, their values were not fetched
+    modified: list of (before row index, cell values after) for rows with the same key and other cells changed
+    unchanged: number of rows in both tables
+    """
+
+    def __init__(self, inserted, removed, modified, unchanged, key_column=0):
+        self.inserted = inserted
+        self.removed = removed
+        self.modified = modified
+        self.unchanged = unchanged
+        self.key_column = key_column
+
+    def __repr__(self):
+        return "TableDiff(inserted={}, removed={}, modified={}, unchanged={})".format(
+            len(self.inserted), len(self.removed), len(self.modified), self.unchanged)
+
+    def __bool__(self):
+        return bool(self.inserted or self.removed or self.modified)
+
+    def inserted_names(self):
+        """
+        Method to get the key column values of the inserted rows
+        :return: (List) list of names
+        """
+        return [row[self.key_column] for row in self.inserted if row and len(row) > self.key_column]
+
+    def modified_names(self):
+        """
+        Method to get the key column values of the modified rows
+        :return: (List) list of names
+        """
+        return [row[self.key_column] for _, row in self.modified if row and len(row) > self.key_column]
+
+
+def diff_row_hashes(before, after):
+    """
+    Method to match the rows of two tables by their hashes. Identical rows are matched first (as a multiset,
+    so duplicates and moved rows count as unchanged), the remaining rows are paired by key hash in order.
+    :param before: list of [key hash, row hash] before the operation
+    :param after: list of [key hash, row hash] after the operation
+    :return: (Tuple) (inserted after indexes, removed before indexes, list of (before index, after index)
+             modified pairs, number of unchanged rows)
+    """
+    remaining = {}
+    for index, (key, row) in enumerate(before):
+        remaining.setdefault(row, []).append(index)
+
+    unchanged = 0
+    new_rows = []
+    for index, (key, row) in enumerate(after):
+        indexes = remaining.get(row)
+        if indexes:
+            indexes.pop(0)
+            unchanged += 1
+        else:
+            new_rows.append(index)
+
+    old_by_key = {}
+    for indexes in remaining.values():
+        for index in indexes:
+            old_by_key.setdefault(before[index][0], []).append(index)
+    for indexes in old_by_key.values():
+        indexes.sort()
+
+    inserted = []
+    modified = []
+    for index in new_rows:
+        candidates = old_by_key.get(after[index][0])
+        if candidates:
+            modified.append((candidates.pop(0), index))
+        else:
+            inserted.append(index)
+    removed = sorted(index for indexes in old_by_key.values() for index in indexes)
+    return inserted, removed, modified, unchanged
+
+
+class TableDiffer:
+    """
+    Verifies table changes by row hashes instead of re-parsing the table.
+    fingerprint() hashes the rows in the browser before an operation, diff() hashes them again afterwards
+    and only fetches the cell values of the inserted and modified rows, so a verification costs the size
+    of the change instead of the size of the table. Only the rows rendered in the current page are compared.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, waits):
+        """
+        :param waits: WaitUtils object used to wait for the table to change
+        """
+        self.logger.log_enter("TableDiffer: __init__")
+
+        self.waits = waits
+        self.stats = {"diffs": 0, "rows_hashed": 0, "rows_fetched": 0}
+
+        self.logger.log_exit("TableDiffer: __init__")
+
+    def fingerprint(self, driver, table_css, key_column=0):
+        """
+        Method to hash the rows of the table
+        :param driver: webdriver object to use
+        :param table_css: CSS selector for table element
+        :param key_column: index of the column identifying a row, e.g. the names column
+        :return: TableFingerprint object, with no rows if the table is not present
+        """
+        result = driver.execute_script(ROW_HASHES_SCRIPT, table_css, key_column)
+        if result is None:
+            return TableFingerprint(table_css, key_column, [], None)
+        self.stats["rows_hashed"] += len(result["rows"])
+        return TableFingerprint(table_css, key_column, result["rows"], result["fingerprint"])
+
+    def fetch_rows(self, driver, table_css, indexes):
+        """
+        Method to fetch the cell values of some data rows in a single round trip
+        :param driver: webdriver object to use
+        :param table_css: CSS selector for table element
+        :param indexes: list of data row indexes
+        :return: (List) list of cell value lists, None for a missing row
+        """
+        if not indexes:
+            return []
+        self.stats["rows_fetched"] += len(indexes)
+        return driver.execute_script(ROWS_BY_INDEX_SCRIPT, table_css, indexes) or [None] * len(indexes)
+
+    def diff(self, driver, before, spinner_css=None, timeout=None):
+        """
+        Method to diff the table against a fingerprint taken before an operation
+        :param driver: webdriver object to use
+        :param before: TableFingerprint taken before the operation
+        :param spinner_css: CSS selector of the loading spinner, to first wait for the table to update.
+                            None to diff the table as it is
+        :param timeout: timeout (secs) for the table to update
+        :return: TableDiff object
+        """
+        self.logger.log_enter("TableDiffer: diff", selector=before.table_css)
+
+        if spinner_css is not None:
+            self.waits.wait_for_table_update(driver, before.table_css, spinner_css,
+                                             fingerprint=before.fingerprint, timeout=timeout)
+        after = self.fingerprint(driver, before.table_css, before.key_column)
+        inserted, removed, modified, unchanged = diff_row_hashes(before.rows, after.rows)
+
+        # one round trip for the values of all the changed rows
+        values = self.fetch_rows(driver, before.table_css, inserted + [index for _, index in modified])
+        table_diff = TableDiff(values[:len(inserted)], removed,
+                               [(old, row) for (old, _), row in zip(modified, values[len(inserted):])],
+                               unchanged, key_column=before.key_column)
+        self.stats["diffs"] += 1
+        self.logger.log_debug("TableDiffer: diff %s", table_diff)
+
+        self.logger.log_exit("TableDiffer: diff", inserted=len(inserted), removed=len(removed),
+                             modified=len(modified))
+        return table_diff
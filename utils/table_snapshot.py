@@ -0,0 +1,183 @@
+class TableRow:
+    """
+    Read only view of one row of a TableSnapshot, the cell values stay in the snapshot columns.
+    """
+    __slots__ = ("_snapshot", "_index")
+
+    def __init__(self, snapshot, index):
+        self._snapshot = snapshot
+        self._index = index
+
+    def __getitem__(self, key):
+        """
+        :param key: column index or header name
+        :return: cell value
+        """
+        return self._snapshot.column(key)[self._index]
+
+    def __len__(self):
+        return len(self._snapshot.headers)
+
+    def __iter__(self):
+        for column in self._snapshot._columns:
+            yield column[self._index]
+
+    def __eq__(self, other):
+        if isinstance(other, (TableRow, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return "TableRow({}, {})".format(self._index, list(self))
+
+    @property
+    def index(self):
+        return self._index
+
+    def as_dict(self):
+        """
+        Method to get the row keyed by header name
+        :return: (Dict) header -> cell value
+        """
+        return dict(zip(self._snapshot.headers, self))
+
+
+class TableSnapshot:
+    """
+    Column oriented snapshot of a parsed table.
+    Every column is kept as one list and rows are only materialised as TableRow views on access,
+    so the memory per row is one reference per cell. Identical rows are kept as separate rows.
+    Membership on the name column goes through a hash index built on first use.
+    """
+    __slots__ = ("headers", "name_column", "_columns", "_header_index", "_name_index")
+
+    def __init__(self, headers, name_column=0):
+        """
+        :param headers: list of column header texts
+        :param name_column: column index or header name of the names column used by the name index
+        """
+        self.headers = list(headers)
+        self._columns = [[] for _ in self.headers]
+        self._header_index = {}
+        for i, header in enumerate(self.headers):
+            self._header_index.setdefault(self._header_key(header), i)
+        self.name_column = self.column_index(name_column) if self.headers else 0
+        self._name_index = None
+
+    @staticmethod
+    def _header_key(header):
+        return str(header).strip().lower()
+
+    @classmethod
+    def from_rows(cls, rows, headers=None, name_column=0):
+        """
+        Method to build a snapshot from row lists
+        :param rows: iterable of lists of cell values
+        :param headers: list of column header texts, columns of the widest row without a header are named
+                        by their index
+        :param name_column: column index or header name of the names column
+        :return: TableSnapshot object
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        headers = list(headers or [])
+        headers += [str(i) for i in range(len(headers), max((len(row) for row in rows), default=0))]
+        snapshot = cls(headers, name_column=name_column)
+        for row in rows:
+            snapshot.append(row)
+        return snapshot
+
+    def append(self, values):
+        """
+        Method to add a row, short rows are padded with None and extra cells are dropped
+        :param values: list of cell values
+        :return:
+        """
+        width = len(values)
+        for i, column in enumerate(self._columns):
+            column.append(values[i] if i < width else None)
+        self._name_index = None
+
+    def column_index(self, key):
+        """
+        Method to resolve a column
+        :param key: column index or header name (case and surrounding whitespace are ignored)
+        :return: (int) column index
+        :raises KeyError: if there is no column with the header name
+        :raises IndexError: if the column index is out of range
+        """
+        if isinstance(key, int):
+            if not -len(self._columns) <= key < len(self._columns):
+                raise IndexError("column index out of range: {}".format(key))
+            return key % len(self._columns)
+        try:
+            return self._header_index[self._header_key(key)]
+        except KeyError:
+            raise KeyError("no column {!r} in {}".format(key, self.headers))
+
+    def column(self, key):
+        """
+        Method to get the values of a column, the list is shared with the snapshot and must not be modified
+        :param key: column index or header name
+        :return: (List) list of cell values
+        """
+        return self._columns[self.column_index(key)]
+
+    @property
+    def names(self):
+        return self._columns[self.name_column] if self._columns else []
+
+    def _index(self):
+        if self._name_index is None:
+            index = {}
+            for i, name in enumerate(self.names):
+                rows = index.get(name)
+                if rows is None:
+                    index[name] = i
+                elif isinstance(rows, int):
+                    index[name] = [rows, i]
+                else:
+                    rows.append(i)
+            self._name_index = index
+        return self._name_index
+
+    def rows_named(self, name):
+        """
+        Method to get all rows with a name
+        :param name: value of the names column
+        :return: (List) list of TableRow objects, empty if the name does not exist
+        """
+        rows = self._index().get(name)
+        if rows is None:
+            return []
+        if isinstance(rows, int):
+            rows = [rows]
+        return [TableRow(self, i) for i in rows]
+
+    def count(self, name):
+        """
+        Method to count the rows with a name
+        :param name: value of the names column
+        :return: (int) number of rows
+        """
+        rows = self._index().get(name)
+        if rows is None:
+            return 0
+        return 1 if isinstance(rows, int) else len(rows)
+
+    def __contains__(self, name):
+        return name in self._index()
+
+    def __len__(self):
+        return len(self._columns[0]) if self._columns else 0
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("row index out of range: {}".format(index))
+        return TableRow(self, index % len(self))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield TableRow(self, i)
+
+    def __repr__(self):
+        return "TableSnapshot(headers={}, rows={})".format(self.headers, len(self))
@@ -0,0 +1,252 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Span:
+    """
+    A timed unit of work, e.g. a DriverUtils helper, a wait or a WebDriver command.
+    """
+    __slots__ = ("name", "start", "end", "attributes", "test_name", "thread_id", "depth", "child_time")
+
+    def __init__(self, name, start, attributes, test_name, thread_id, depth):
+        self.name = name
+        self.start = start
+        self.end = None
+        self.attributes = attributes
+        self.test_name = test_name
+        self.thread_id = thread_id
+        self.depth = depth
+        self.child_time = 0.0
+
+    def __repr__(self):
+        return "Span({}, {})".format(self.name, self.duration)
+
+    @property
+    def duration(self):
+        return None if self.end is None else self.end - self.start
+
+    @property
+    def self_time(self):
+        return None if self.end is None else self.end - self.start - self.child_time
+
+
+class SpanTracer:
+    """
+    Records nested spans per thread from the log_enter/log_exit brackets of the helpers.
+    Timestamps are taken from a monotonic clock, finished spans are kept for aggregation and export.
+    """
+
+    def __init__(self, enabled=True, max_spans=500000):
+        """
+        :param enabled: record spans
+        :param max_spans: max number of finished spans kept, later spans are counted as dropped
+        """
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.epoch = time.perf_counter()
+        self.spans = []
+        self.dropped = 0
+        self.current_test = None
+        self.test_span_start = 0
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start_span(self, name, attributes=None):
+        """
+        Method to open a span nested in the current span of this thread
+        :param name: name of the span
+        :param attributes: dict of span attributes, e.g. selector
+        :return: Span object, None if tracing is disabled
+        """
+        if not self.enabled:
+            return None
+        stack = self._stack()
+        span = Span(name, time.perf_counter(), dict(attributes or {}), self.current_test, threading.get_ident(),
+                    len(stack))
+        stack.append(span)
+        return span
+
+    def end_span(self, name, attributes=None):
+        """
+        Method to close the innermost open span called name.
+        Spans opened after it and never closed (e.g. skipped by an exception) are closed with it.
+        :param name: name of the span
+        :param attributes: dict of attributes to add to the span, e.g. row count
+        :return: Span object, None if there is no open span called name
+        """
+        if not self.enabled:
+            return None
+        end = time.perf_counter()
+        stack = self._stack()
+        for index in range(len(stack) - 1, -1, -1):
+            if stack[index].name == name:
+                break
+        else:
+            return None
+
+        span = None
+        while len(stack) > index:
+            span = stack.pop()
+            if span.name != name:
+                span.attributes["unclosed"] = True
+            self._finish(span, end, stack)
+        if attributes:
+            span.attributes.update(attributes)
+        return span
+
+    def _finish(self, span, end, stack):
+        span.end = end
+        if stack:
+            stack[-1].child_time += end - span.start
+        if len(self.spans) < self.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+    def set_attributes(self, **attributes):
+        """
+        Method to add attributes to the current span of this thread
+        :return:
+        """
+        stack = self._stack() if self.enabled else None
+        if stack:
+            stack[-1].attributes.update(attributes)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Method to trace a block of code
+        :param name: name of the span
+        :param attributes: span attributes
+        :return: Span object, None if tracing is disabled
+        """
+        span = self.start_span(name, attributes)
+        try:
+            yield span
+        finally:
+            if span is not None:
+                self.end_span(name)
+
+    def trace_driver(self, driver):
+        """
+        Method to record every WebDriver command (HTTP round trip) of a driver as a span
+        :param driver: webdriver object
+        :return: the driver
+        """
+        if getattr(driver, "_traced_execute", None) is not None:
+            return driver
+        execute = driver.execute
+        tracer = self
+
+        def traced_execute(driver_command, params=None):
+            with tracer.span("WebDriver: " + driver_command):
+                return execute(driver_command, params)
+
+        driver._traced_execute = execute
+        driver.execute = traced_execute
+        return driver
+
+    def begin_test(self, test_name):
+        """
+        Method to mark the start of a test, spans opened until end_test are attributed to it
+        :param test_name: name (node id) of the test
+        :return:
+        """
+        self.current_test = test_name
+        self.test_span_start = len(self.spans)
+
+    def end_test(self):
+        """
+        Method to mark the end of the current test, spans left open in this thread are closed
+        :return:
+        """
+        if self.enabled:
+            end = time.perf_counter()
+            stack = self._stack()
+            while stack:
+                span = stack.pop()
+                span.attributes["unclosed"] = True
+                self._finish(span, end, stack)
+        self.current_test = None
+
+    def summary(self, test_name=None):
+        """
+        Method to aggregate the finished spans by name
+        :param test_name: only aggregate the spans of this test, None for all spans
+        :return: (Dict) span name -> {count, total, self, max}
+        """
+        summary = {}
+        for span in self.spans:
+            if test_name is not None and span.test_name != test_name:
+                continue
+            entry = summary.setdefault(span.name, {"count": 0, "total": 0.0, "self": 0.0, "max": 0.0})
+            duration = span.duration
+            entry["count"] += 1
+            entry["total"] += duration
+            entry["self"] += span.self_time
+            entry["max"] = max(entry["max"], duration)
+        return summary
+
+    def test_summary(self):
+        """
+        Method to aggregate the finished spans per test
+        :return: (Dict) test name -> {traced, spans: span name -> {count, total, self, max}}
+        """
+        tests = {}
+        for test_name in {span.test_name for span in self.spans if span.test_name is not None}:
+            spans = self.summary(test_name)
+            tests[test_name] = {"traced": sum(entry["self"] for entry in spans.values()), "spans": spans}
+        return tests
+
+    def chrome_trace(self, process_name=None):
+        """
+        Method to export the finished spans in the Chrome trace event format (chrome://tracing, Perfetto)
+        :param process_name: name shown for the process, e.g. the xdist worker
+        :return: (Dict) trace
+        """
+        pid = os.getpid()
+        events = []
+        if process_name:
+            events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": process_name}})
+        for span in self.spans:
+            args = dict(span.attributes)
+            if span.test_name is not None:
+                args["test"] = span.test_name
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(":", 1)[0],
+                "ph": "X",
+                "ts": round((span.start - self.epoch) * 1e6, 3),
+                "dur": round(span.duration * 1e6, 3),
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"dropped_spans": self.dropped}}
+
+    def write_chrome_trace(self, path, process_name=None):
+        """
+        Method to write the Chrome trace JSON file
+        :param path: path of the trace file
+        :param process_name: name shown for the process
+        :return:
+        """
+        with open(str(path), "w") as trace_file:
+            json.dump(self.chrome_trace(process_name), trace_file, default=str)
+
+    def reset(self):
+        self.spans = []
+        self.dropped = 0
+        self.epoch = time.perf_counter()
+
+
+# Tracer fed by DocumentExplorerLogger.log_enter/log_exit
+tracer = SpanTracer(enabled=os.environ.get("DE_TRACE", "1") != "0")
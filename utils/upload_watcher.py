@@ -0,0 +1,221 @@
+from utils.logs_util import DocumentExplorerLogger
+from utils.deadline import clamp_timeout
+from utils.wait_utils import script_timeout
+
+# Installs a MutationObserver recording every change of the upload status and upload panel rows
+# with a timestamp, returns the number of recorded events so far.
+# arguments: status CSS selector, row CSS selector, row name CSS selector, row status CSS selector
+INSTALL_SCRIPT = """
+if (!window.__deUploadWatcher) {
+    var statusCss = arguments[0], rowCss = arguments[1], nameCss = arguments[2], rowStatusCss = arguments[3];
+    var watcher = {events: [], status: null, rows: {}, waiters: []};
+    var record = function (kind, name, status) {
+        watcher.events.push({time: Date.now(), kind: kind, name: name, status: status});
+    };
+    watcher.scan = function () {
+        var chunk = document.querySelector(statusCss);
+        var status = chunk ? chunk.textContent.trim() : null;
+        if (status !== watcher.status) {
+            watcher.status = status;
+            record('status', null, status);
+        }
+        var rows = document.querySelectorAll(rowCss);
+        for (var i = 0; i < rows.length; i++) {
+            var name = rows[i].querySelector(nameCss);
+            var rowStatus = rows[i].querySelector(rowStatusCss);
+            name = name ? name.textContent.trim() : '';
+            rowStatus = rowStatus ? rowStatus.textContent.trim() : '';
+            if (watcher.rows[name] !== rowStatus) {
+                watcher.rows[name] = rowStatus;
+                record('row', name, rowStatus);
+            }
+        }
+        var waiters = watcher.waiters;
+        watcher.waiters = [];
+        waiters.forEach(function (waiter) {
+            if (!waiter()) {
+                watcher.waiters.push(waiter);
+            }
+        });
+    };
+    new MutationObserver(watcher.scan).observe(document.body,
+        {childList: true, subtree: true, characterData: true, attributes: true});
+    window.__deUploadWatcher = watcher;
+    watcher.scan();
+}
+return window.__deUploadWatcher.events.length;
+"""
+
+# Resolves with the first status event containing the text after event index since, or null on timeout.
+# since < 0 also accepts the current status.
+# arguments: text, since, timeout (ms), callback
+WAIT_FOR_STATUS_SCRIPT = """
+var text = arguments[0], since = arguments[1], timeoutMs = arguments[2], done = arguments[3];
+var watcher = window.__deUploadWatcher;
+if (since < 0) {
+    if (watcher.status && watcher.status.indexOf(text) !== -1) {
+        done({time: Date.now(), kind: 'status', name: null, status: watcher.status});
+        return;
+    }
+    since = watcher.events.length;
+}
+var check = function () {
+    for (var i = since; i < watcher.events.length; i++) {
+        var event = watcher.events[i];
+        if (event.kind === 'status' && event.status && event.status.indexOf(text) !== -1) {
+            done(event);
+            return true;
+        }
+    }
+    return false;
+};
+if (!check()) {
+    watcher.waiters.push(check);
+    setTimeout(function () {
+        watcher.waiters = watcher.waiters.filter(function (waiter) {
+            return waiter !== check;
+        });
+        done(null);
+    }, timeoutMs);
+}
+"""
+
+# Resolves once every named row reached a status which is not pending after event index since,
+# or on timeout, with {timed_out, rows: {name: status}} for the rows seen after since.
+# arguments: names, pending statuses, since, timeout (ms), callback
+WAIT_FOR_ROWS_SCRIPT = """
+var names = arguments[0], pending = arguments[1], since = arguments[2], timeoutMs = arguments[3];
+var done = arguments[4];
+var watcher = window.__deUploadWatcher;
+var rowsSince = function () {
+    var rows = {};
+    for (var i = since; i < watcher.events.length; i++) {
+        if (watcher.events[i].kind === 'row') {
+            rows[watcher.events[i].name] = watcher.events[i].status;
+        }
+    }
+    return rows;
+};
+var check = function () {
+    var rows = rowsSince();
+    for (var i = 0; i < names.length; i++) {
+        var status = rows[names[i]];
+        if (!status || pending.indexOf(status) !== -1) {
+            return false;
+        }
+    }
+    done({timed_out: false, rows: rows});
+    return true;
+};
+if (!check()) {
+    watcher.waiters.push(check);
+    setTimeout(function () {
+        watcher.waiters = watcher.waiters.filter(function (waiter) {
+            return waiter !== check;
+        });
+        done({timed_out: true, rows: rowsSince()});
+    }, timeoutMs);
+}
+"""
+
+EVENTS_SCRIPT = """
+var watcher = window.__deUploadWatcher;
+return watcher ? watcher.events.slice(arguments[0]) : [];
+"""
+
+
+class UploadWatcher:
+    """
+    Push based tracking of document uploads. A MutationObserver injected in the page records the
+    upload status and upload panel row transitions with timestamps, and the driver blocks on
+    execute_async_script until the awaited transition happens instead of polling.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, status_css, row_css, row_name_css, row_status_css):
+        """
+        :param status_css: CSS selector of the upload status element
+        :param row_css: CSS selector of the upload panel rows
+        :param row_name_css: CSS selector of the file name within a row
+        :param row_status_css: CSS selector of the status within a row
+        """
+        self.logger.log_enter("UploadWatcher: __init__")
+
+        self.selectors = (status_css, row_css, row_name_css, row_status_css)
+
+        self.logger.log_exit("UploadWatcher: __init__")
+
+    def install(self, driver):
+        """
+        Method to install the watcher in the current page, install before triggering the upload
+        :param driver: webdriver object to use
+        :return: (int) event index to pass as since to the waits
+        """
+        return driver.execute_script(INSTALL_SCRIPT, *self.selectors)
+
+    def wait_for_status(self, driver, text, since=-1, timeout=30):
+        """
+        Method to block until the upload status contains text
+        :param driver: webdriver object to use
+        :param text: text to wait for
+        :param since: event index returned by install, -1 to accept the current status
+        :param timeout: timeout (secs), shrunk to the remaining budget of the current deadline
+        :return: (Dict) the status event (time, status), None on timeout
+        :raises DeadlineExceeded: if the budget of the current deadline is spent
+        """
+        self.logger.log_enter("UploadWatcher: wait_for_status")
+
+        timeout = clamp_timeout(timeout, "wait_for_status")
+        self.install(driver)
+        with script_timeout(driver, timeout):
+            event = driver.execute_async_script(WAIT_FOR_STATUS_SCRIPT, text, since, int(timeout * 1000))
+
+        self.logger.log_exit("UploadWatcher: wait_for_status")
+        return event
+
+    def wait_for_rows(self, driver, names, pending_statuses, since, timeout=300):
+        """
+        Method to block until every named upload row left the pending statuses
+        :param driver: webdriver object to use
+        :param names: list of file names
+        :param pending_statuses: list of statuses of an upload which is not finished
+        :param since: event index returned by install
+        :param timeout: timeout (secs), shrunk to the remaining budget of the current deadline
+        :return: (Dict) timed_out flag and rows (name -> last status)
+        :raises DeadlineExceeded: if the budget of the current deadline is spent
+        """
+        self.logger.log_enter("UploadWatcher: wait_for_rows")
+
+        timeout = clamp_timeout(timeout, "wait_for_rows")
+        self.install(driver)
+        with script_timeout(driver, timeout):
+            result = driver.execute_async_script(WAIT_FOR_ROWS_SCRIPT, list(names), list(pending_statuses), since,
+                                                 int(timeout * 1000))
+
+        self.logger.log_exit("UploadWatcher: wait_for_rows")
+        return result
+
+    def events(self, driver, since=0):
+        """
+        Method to read the recorded transitions
+        :param driver: webdriver object to use
+        :param since: event index to start from
+        :return: (List) list of events (time in ms, kind [status, row], name, status)
+        """
+        return driver.execute_script(EVENTS_SCRIPT, since)
+
+    def row_latencies(self, driver, since=0):
+        """
+        Method to compute per file upload timings from the recorded row transitions
+        :param driver: webdriver object to use
+        :param since: event index to start from
+        :return: (Dict) file name -> {"transitions": list of (status, time in ms),
+                                      "latency": secs from the first to the last transition}
+        """
+        latencies = {}
+        for event in self.events(driver, since):
+            if event["kind"] == "row":
+                timings = latencies.setdefault(event["name"], {"transitions": [], "latency": 0.0})
+                timings["transitions"].append((event["status"], event["time"]))
+                timings["latency"] = (event["time"] - timings["transitions"][0][1]) / 1000.0
+        return latencies
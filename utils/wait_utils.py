@@ -0,0 +1,266 @@
+import time
+from contextlib import contextmanager
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException, StaleElementReferenceException
+
+from utils.logs_util import DocumentExplorerLogger
+from utils.tracing import tracer
+from utils.deadline import current_deadline
+
+# Script timeout (secs) of a new WebDriver session, the W3C default
+DEFAULT_SCRIPT_TIMEOUT = 30
+
+# Time (secs) added to the script timeout of a blocking async script, for the round trip
+SCRIPT_TIMEOUT_MARGIN = 5
+
+# Installs a MutationObserver on first use and returns milliseconds since the last DOM mutation
+DOM_QUIESCENCE_SCRIPT = """
+if (!window.__deQuiescence) {
+    window.__deQuiescence = {last: Date.now()};
+    new MutationObserver(function () {
+        window.__deQuiescence.last = Date.now();
+    }).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+if (document.readyState !== 'complete') {
+    return -1;
+}
+return Date.now() - window.__deQuiescence.last;
+"""
+
+# Returns a cheap fingerprint (row count and text hash) of the table, or null if it is not in the DOM
+TABLE_FINGERPRINT_SCRIPT = """
+var table = document.querySelector(arguments[0]);
+if (!table) {
+    return null;
+}
+var text = table.innerText || '';
+var hash = 0;
+for (var i = 0; i < text.length; i++) {
+    hash = ((hash * 31) + text.charCodeAt(i)) | 0;
+}
+return table.getElementsByTagName('tr').length + ':' + hash;
+"""
+
+
+@contextmanager
+def script_timeout(driver, timeout):
+    """
+    Context manager raising the script timeout of a session for an execute_async_script call blocking up to
+    timeout secs, and restoring the default afterwards so it does not leak into the next user of a pooled
+    session. Nothing is sent when the default covers the call.
+    :param driver: webdriver object to use
+    :param timeout: time (secs) the script may block
+    :return:
+    """
+    timeout = timeout + SCRIPT_TIMEOUT_MARGIN
+    if timeout <= DEFAULT_SCRIPT_TIMEOUT:
+        yield
+        return
+    driver.set_script_timeout(timeout)
+    try:
+        yield
+    finally:
+        try:
+            driver.set_script_timeout(DEFAULT_SCRIPT_TIMEOUT)
+        except WebDriverException as e:
+            WaitUtils.logger.log_debug("WaitUtils: script_timeout restore Exception: %s", e)
+
+
+class WaitUtils:
+    """
+    Condition based waits used by DriverUtils instead of static sleeps.
+    Every wait is timed and recorded in wait_timings.
+    """
+    logger = DocumentExplorerLogger()
+
+    def __init__(self, timeout=10, poll_interval=0.1, quiet_period=0.3, change_timeout=5):
+        """
+        :param timeout: default timeout (secs) for a wait
+        :param poll_interval: default poll interval (secs) between condition checks
+        :param quiet_period: time (secs) without DOM mutations for the page to count as settled
+        :param change_timeout: timeout (secs) to wait for a table to change before assuming it will not
+        """
+        self.logger.log_enter("WaitUtils: __init__")
+
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.quiet_period = quiet_period
+        self.change_timeout = change_timeout
+        self.wait_timings = []
+
+        self.logger.log_exit("WaitUtils: __init__")
+
+    def record_wait(self, name, elapsed, succeeded):
+        """
+        Method to record the time taken by a wait
+        :param name: name of the wait
+        :param elapsed: time (secs) taken by the wait
+        :param succeeded: True if the condition was met, False on timeout
+        :return:
+        """
+        self.wait_timings.append({"name": name, "elapsed": elapsed, "succeeded": succeeded})
+        self.logger.log_debug("WaitUtils: %s took %.3fs succeeded: %s", name, elapsed, succeeded)
+
+    def wait_summary(self):
+        """
+        Method to aggregate the recorded wait timings by wait name
+        :return: (Dict) wait name -> {count, total, max, timeouts}
+        """
+        summary = {}
+        for timing in self.wait_timings:
+            entry = summary.setdefault(timing["name"], {"count": 0, "total": 0.0, "max": 0.0, "timeouts": 0})
+            entry["count"] += 1
+            entry["total"] += timing["elapsed"]
+            entry["max"] = max(entry["max"], timing["elapsed"])
+            if not timing["succeeded"]:
+                entry["timeouts"] += 1
+        return summary
+
+    def until(self, driver, name, condition, timeout=None, poll_interval=None):
+        """
+        Method to wait until condition returns a truthy value and record how long it took
+        :param driver: webdriver object to use
+        :param name: name of the wait used for timing records
+        :param condition: callable taking the driver
+        :param timeout: timeout (secs), defaults to self.timeout, shrunk to the remaining budget of the
+                        current deadline
+        :param poll_interval: poll interval (secs), defaults to self.poll_interval
+        :return: the value returned by condition
+        :raises TimeoutException: if condition is not met within timeout
+        :raises DeadlineExceeded: if the budget of the current deadline is spent before or during the wait
+        """
+        timeout = self.timeout if timeout is None else timeout
+        poll_interval = self.poll_interval if poll_interval is None else poll_interval
+        deadline = current_deadline()
+        if deadline is not None:
+            timeout = deadline.timeout(timeout, name)
+
+        start = time.monotonic()
+        succeeded = False
+        try:
+            with tracer.span("WaitUtils: " + name, timeout=timeout):
+                result = WebDriverWait(driver, timeout, poll_frequency=poll_interval,
+                                       ignored_exceptions=[StaleElementReferenceException]).until(condition)
+            succeeded = True
+            return result
+        except TimeoutException as e:
+            if deadline is not None and deadline.expired():
+                raise deadline.exceeded_error(name) from e
+            raise
+        finally:
+            self.record_wait(name, time.monotonic() - start, succeeded)
+
+    def wait_for_element(self, driver, css, clickable=False, timeout=None):
+        """
+        Method to wait for an element to be present (or clickable) in the DOM
+        :param driver: webdriver object to use
+        :param css: CSS selector of the element
+        :param clickable: wait for element to be clickable instead of present
+        :param timeout: timeout (secs)
+        :return: WebElement
+        """
+        if clickable:
+            condition = EC.element_to_be_clickable((By.CSS_SELECTOR, css))
+        else:
+            condition = EC.presence_of_element_located((By.CSS_SELECTOR, css))
+        return self.until(driver, "wait_for_element", condition, timeout=timeout)
+
+    def wait_for_text(self, driver, css, text, timeout=None, poll_interval=None):
+        """
+        Method to wait for text to be present in an element
+        :param driver: webdriver object to use
+        :param css: CSS selector of the element
+        :param text: text to wait for
+        :param timeout: timeout (secs)
+        :param poll_interval: poll interval (secs)
+        :return: True
+        """
+        return self.until(driver, "wait_for_text", EC.text_to_be_present_in_element((By.CSS_SELECTOR, css), text),
+                          timeout=timeout, poll_interval=poll_interval)
+
+    def wait_for_dom_quiescence(self, driver, quiet_period=None, timeout=None):
+        """
+        Method to wait until the page is loaded and the DOM has not mutated for quiet_period
+        :param driver: webdriver object to use
+        :param quiet_period: time (secs) without DOM mutations
+        :param timeout: timeout (secs)
+        :return: True
+        """
+        quiet_ms = 1000 * (self.quiet_period if quiet_period is None else quiet_period)
+
+        def dom_is_quiet(driver):
+            return driver.execute_script(DOM_QUIESCENCE_SCRIPT) >= quiet_ms
+
+        return self.until(driver, "wait_for_dom_quiescence", dom_is_quiet, timeout=timeout)
+
+    def wait_for_spinner_gone(self, driver, spinner_css, timeout=None):
+        """
+        Method to wait until no loading spinner is visible
+        :param driver: webdriver object to use
+        :param spinner_css: CSS selector of the loading spinner
+        :param timeout: timeout (secs)
+        :return: True
+        """
+        return self.until(driver, "wait_for_spinner_gone",
+                          EC.invisibility_of_element_located((By.CSS_SELECTOR, spinner_css)), timeout=timeout)
+
+    def table_fingerprint(self, driver, table_css):
+        """
+        Method to take a fingerprint of the table contents
+        :param driver: webdriver object to use
+        :param table_css: CSS selector for table element
+        :return: (string) fingerprint, None if table is not present
+        """
+        try:
+            return driver.execute_script(TABLE_FINGERPRINT_SCRIPT, table_css)
+        except WebDriverException as e:
+            self.logger.log_debug("WaitUtils: table_fingerprint Exception: %s", e)
+            return None
+
+    def wait_for_table_change(self, driver, table_css, fingerprint, timeout=None):
+        """
+        Method to wait until the table contents differ from fingerprint
+        :param driver: webdriver object to use
+        :param table_css: CSS selector for table element
+        :param fingerprint: fingerprint taken before the table was expected to change
+        :param timeout: timeout (secs)
+        :return: (string) the new fingerprint
+        """
+        def table_changed(driver):
+            current = self.table_fingerprint(driver, table_css)
+            return current if current is not None and current != fingerprint else False
+
+        return self.until(driver, "wait_for_table_change", table_changed, timeout=timeout)
+
+    def wait_for_page_ready(self, driver, spinner_css, timeout=None):
+        """
+        Method to wait until no spinner is visible and the DOM is quiet
+        :param driver: webdriver object to use
+        :param spinner_css: CSS selector of the loading spinner
+        :param timeout: timeout (secs)
+        :return:
+        """
+        self.wait_for_spinner_gone(driver, spinner_css, timeout=timeout)
+        self.wait_for_dom_quiescence(driver, timeout=timeout)
+
+    def wait_for_table_update(self, driver, table_css, spinner_css, fingerprint=None, timeout=None):
+        """
+        Method to wait for a table to settle after an action that may change it.
+        A table which does not change within change_timeout is treated as settled, since
+        an action like a search can legitimately leave the contents unchanged.
+        :param driver: webdriver object to use
+        :param table_css: CSS selector for table element
+        :param spinner_css: CSS selector of the loading spinner
+        :param fingerprint: fingerprint taken before the action, None to only wait for the table
+        :param timeout: timeout (secs)
+        :return:
+        """
+        self.wait_for_element(driver, table_css, timeout=timeout)
+        if fingerprint is not None:
+            try:
+                self.wait_for_table_change(driver, table_css, fingerprint, timeout=self.change_timeout)
+            except TimeoutException:
+                self.logger.log_debug("WaitUtils: wait_for_table_update table unchanged: %s", table_css)
+        self.wait_for_page_ready(driver, spinner_css, timeout=timeout)